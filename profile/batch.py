@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Measure building a table on a connected (live) page, with/without batch.
+
+Offline build (table is appended after built) is also shown for reference.
+"""
+
+import time
+
+from wdom.document import get_document
+from wdom.server import _tornado
+from wdom.tag import Table, Td, Tr
+
+N_ROWS = 1000
+N_COLS = 5
+
+
+class _Queue(list):
+    push = list.append
+
+
+class _Connection:
+    """Fake client connection which only stores messages."""
+
+    def __init__(self) -> None:
+        self.queue = _Queue()
+
+
+def add_rows(table: Table) -> None:
+    for i in range(N_ROWS):
+        tr = Tr(parent=table)
+        for j in range(N_COLS):
+            tr.appendChild(Td('{}-{}'.format(i, j)))
+
+
+def offline() -> None:
+    table = Table()
+    add_rows(table)
+    get_document().body.appendChild(table)
+
+
+def live() -> None:
+    add_rows(Table(parent=get_document().body))
+
+
+def live_batch() -> None:
+    with get_document().batch():
+        live()
+
+
+def measure(func, conn: _Connection) -> None:
+    conn.queue.clear()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    size = sum(len(str(msg)) for msg in conn.queue)
+    print('{:<12} {:>10.1f} {:>10} {:>12}'.format(
+        func.__name__, elapsed * 1e3, len(conn.queue), size))
+
+
+def main() -> None:
+    conn = _Connection()
+    _tornado.connections.append(conn)
+    try:
+        print('{:<12} {:>10} {:>10} {:>12}'.format(
+            'build', 'time [ms]', 'messages', 'bytes'))
+        for func in (offline, live, live_batch):
+            measure(func, conn)
+    finally:
+        _tornado.connections.remove(conn)
+
+
+if __name__ == '__main__':
+    main()
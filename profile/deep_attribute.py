@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Measure attribute updates of deeply nested nodes in a connected document.
+
+Each update checks ``connected`` and sends a message to browser, which needs
+the owner document of the node.
+"""
+
+import time
+
+from wdom.document import get_document
+from wdom.server import _tornado
+from wdom.tag import Div
+
+DEPTHS = (1, 10, 100, 1000)
+N_UPDATES = 10000
+
+
+class _Queue(list):
+    push = list.append
+
+
+class _Connection:
+    """Fake client connection which only stores messages."""
+
+    def __init__(self) -> None:
+        self.queue = _Queue()
+
+
+def make_deep_node(depth: int) -> Div:
+    node = get_document().body
+    for _ in range(depth):
+        node = Div(parent=node)
+    return node
+
+
+def measure(depth: int) -> float:
+    """Return time per ``setAttribute`` in micro seconds."""
+    node = make_deep_node(depth)
+    start = time.perf_counter()
+    for i in range(N_UPDATES):
+        node.setAttribute('data-value', str(i))
+    elapsed = time.perf_counter() - start
+    for conn in _tornado.connections:
+        conn.queue.clear()
+    return elapsed / N_UPDATES * 1e6
+
+
+def main() -> None:
+    conn = _Connection()
+    _tornado.connections.append(conn)
+    try:
+        print('{:>6} {:>16}'.format('depth', 'setAttribute [us]'))
+        for depth in DEPTHS:
+            print('{:>6} {:>16.2f}'.format(depth, measure(depth)))
+    finally:
+        _tornado.connections.remove(conn)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Compare element lookups by the document indexes and by walking the tree.
+
+A document has ``n`` elements, and 10 of them have the looked-up tag/class.
+Indexed lookups should not depend on the number of elements.
+"""
+
+import time
+from typing import Callable
+
+from wdom.document import Document
+from wdom.element import Element, getElementsBy
+
+SIZES = (1000, 10000, 100000)
+N_FOUND = 10
+
+
+def make_document(n: int) -> Document:
+    doc = Document()
+    for i in range(n // 10):
+        div = Element('div', parent=doc.body, class_='row')
+        for j in range(9):
+            Element('span', parent=div)
+    step = n // 10 // N_FOUND
+    for div in list(doc.body.childNodes)[::step][:N_FOUND]:
+        div.appendChild(Element('em', class_='found'))
+    return doc
+
+
+def measure(func: Callable[[], int]) -> str:
+    start = time.perf_counter()
+    found = func()
+    elapsed = time.perf_counter() - start
+    assert found == N_FOUND, found
+    return '{:>10.3f}'.format(elapsed * 1e3)
+
+
+def main() -> None:
+    print('{:>8} {:>10} {:>10} {:>10} {:>10}  [ms]'.format(
+        'elements', 'tag', 'tag(walk)', 'class', 'class(walk)'))
+    for n in SIZES:
+        doc = make_document(n)
+        tag = measure(lambda: len(doc.getElementsByTagName('em')))
+        tag_walk = measure(lambda: len(getElementsBy(
+            doc, lambda node: node.tagName == 'EM')))
+        cls = measure(lambda: len(doc.getElementsByClassName('found')))
+        cls_walk = measure(lambda: len(getElementsBy(
+            doc, lambda node: 'found' in node.classList)))
+        print('{:>8} {} {} {} {}'.format(n, tag, tag_walk, cls, cls_walk))
+
+
+if __name__ == '__main__':
+    main()
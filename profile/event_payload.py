@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Measure events per second of ``mousemove`` events on server.
+
+Messages are made as ``wdom.js`` does, with all attributes of ``MouseEvent``
+(default) or only ``clientX`` and ``clientY`` (``fields`` option of
+``addEventListener``), and handled by ``on_websocket_message`` in batches, as
+sent from browser. The listener reads ``clientX`` and ``clientY``.
+``eager`` sets all attributes on event objects at creation, as before.
+"""
+
+import json
+import time
+from typing import Any, Dict, List
+
+from wdom import event
+from wdom.server.handler import on_websocket_message
+from wdom.web_node import WdomElement
+
+N_EVENTS = 100000
+BATCH = 100
+MOUSE_ATTRS = sorted(event.MouseEvent.attrs)
+
+
+class EagerMouseEvent(event.MouseEvent):
+    def __init__(self, type: str, init: Dict[str, Any] = None) -> None:
+        super().__init__(type, init)
+        for attr in self.attrs:
+            setattr(self, attr, self.init.get(attr))
+        self._related = self.relatedTarget
+
+
+def make_batches(elm: WdomElement, fields: List[str]) -> List[str]:
+    batches = []
+    for i in range(0, N_EVENTS, BATCH):
+        msgs = []
+        for j in range(i, i + BATCH):
+            e = {
+                'proto': 'MouseEvent',
+                'type': 'mousemove',
+                'currentTarget': {'id': elm.wdom_id},
+                'target': {'id': elm.wdom_id},
+            }
+            if len(fields) == len(MOUSE_ATTRS):
+                e['relatedTarget'] = None
+            for attr in fields:
+                e[attr] = j % 1000 if attr != 'region' else None
+            msgs.append({'type': 'event', 'event': e, 'id': elm.wdom_id})
+        batches.append(json.dumps(msgs))
+    return batches
+
+
+def measure(fields: List[str], eager: bool = False) -> str:
+    elm = WdomElement('div')
+    total = [0]
+
+    def listener(e: event.MouseEvent) -> None:
+        total[0] += e.clientX + e.clientY
+
+    elm.addEventListener('mousemove', listener)
+    batches = make_batches(elm, fields)
+    size = sum(len(b) for b in batches) / N_EVENTS
+    orig = event.proto_dict['MouseEvent']
+    if eager:
+        event.proto_dict['MouseEvent'] = EagerMouseEvent
+    try:
+        start = time.perf_counter()
+        for batch in batches:
+            on_websocket_message(batch)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.proto_dict['MouseEvent'] = orig
+    return '{:>10.0f} {:>12.1f}'.format(N_EVENTS / elapsed, size)
+
+
+def main() -> None:
+    print('{:>8} {:>6} {:>10} {:>12}'.format(
+        'fields', 'eager', 'events/s', 'bytes/event'))
+    xy = ['clientX', 'clientY']
+    for name, fields in (('all', MOUSE_ATTRS), ('x, y', xy)):
+        for eager in (True, False):
+            print('{:>8} {:>6} {}'.format(name, str(eager),
+                                          measure(fields, eager)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Measure html serialization of a large tree with per-element html cache.
+
+Compares serialization from scratch (all caches cleared) with
+re-serialization after a small change in the tree.
+"""
+
+import time
+
+from wdom.element import HTMLElement
+from wdom.node import Text
+
+N_SECTIONS = 100
+N_ROWS = 50  # 100 sections x 50 rows x 2 nodes = 10k nodes
+N_REPEAT = 20
+
+
+def make_tree() -> HTMLElement:
+    root = HTMLElement('div')
+    for i in range(N_SECTIONS):
+        section = HTMLElement('ul', parent=root, class_='section')
+        for j in range(N_ROWS):
+            li = HTMLElement('li', parent=section,
+                             id='item-{}-{}'.format(i, j))
+            Text('item {} {}'.format(i, j), parent=li)
+    return root
+
+
+def clear_cache(node: HTMLElement) -> None:
+    node._html_cache = None
+    for child in node.childNodes:
+        clear_cache(child)
+
+
+def measure(func) -> float:
+    start = time.perf_counter()
+    for i in range(N_REPEAT):
+        func(i)
+    return (time.perf_counter() - start) / N_REPEAT
+
+
+def main() -> None:
+    root = make_tree()
+    target = root.lastChild.lastChild
+    print('{} nodes, {} bytes'.format(N_SECTIONS * N_ROWS * 2,
+                                      len(root.html)))
+
+    def from_scratch(i: int) -> None:
+        clear_cache(root)
+        root.html
+
+    def small_change(i: int) -> None:
+        target.textContent = 'changed {}'.format(i)
+        root.html
+
+    clear = measure(lambda i: clear_cache(root))
+    print('from scratch:       {:.2f} ms'.format(
+        (measure(from_scratch) - clear) * 1000))
+    print('after small change: {:.2f} ms'.format(
+        measure(small_change) * 1000))
+    print('no change:          {:.4f} ms'.format(
+        measure(lambda i: root.html) * 1000))
+
+
+if __name__ == '__main__':
+    main()
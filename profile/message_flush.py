@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Compare fixed-interval message polling with event-driven flush.
+
+Reports CPU time consumed while idle and latency from ``push_message`` to
+``write_message`` on a fake connection.
+"""
+
+import asyncio
+import random
+import time
+
+from wdom import server
+from wdom.options import config
+
+IDLE_SEC = 2.0
+N_MESSAGES = 200
+POLL_WAIT = 0.005  # previous default of --message-wait
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.sent_at = []
+
+    def write_message(self, msg: str) -> None:
+        self.sent_at.append(time.perf_counter())
+
+
+async def _poll_loop() -> None:
+    # message loop used before event-driven flush
+    while True:
+        server.send_message()
+        await asyncio.sleep(POLL_WAIT)
+
+
+def _push_message_poll(msg: dict) -> None:
+    server._msg_queue.append(msg)
+
+
+async def measure_idle() -> float:
+    start = time.process_time()
+    await asyncio.sleep(IDLE_SEC)
+    return time.process_time() - start
+
+
+async def measure_latency(push) -> float:
+    conn = FakeConnection()
+    server.module.connections.append(conn)
+    latencies = []
+    for _ in range(N_MESSAGES):
+        await asyncio.sleep(random.random() * POLL_WAIT * 2)
+        n_sent = len(conn.sent_at)
+        pushed_at = time.perf_counter()
+        push({'method': 'textContent', 'params': ['a']})
+        while len(conn.sent_at) == n_sent:
+            await asyncio.sleep(0)
+        latencies.append(conn.sent_at[-1] - pushed_at)
+    server.module.connections.remove(conn)
+    return sum(latencies) / len(latencies)
+
+
+async def main() -> None:
+    print('poll interval: {} sec, message_wait: {} sec'.format(
+        POLL_WAIT, config.message_wait))
+
+    task = asyncio.ensure_future(_poll_loop())
+    idle = await measure_idle()
+    latency = await measure_latency(_push_message_poll)
+    task.cancel()
+    print('[poll]  idle CPU: {:.1f} ms / {} sec, mean latency: {:.2f} ms'
+          .format(idle * 1000, IDLE_SEC, latency * 1000))
+
+    idle = await measure_idle()
+    latency = await measure_latency(server.push_message)
+    print('[event] idle CPU: {:.1f} ms / {} sec, mean latency: {:.2f} ms'
+          .format(idle * 1000, IDLE_SEC, latency * 1000))
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
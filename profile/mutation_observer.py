@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Measure cost of mutations with and without ``MutationObserver``.
+
+``n`` elements are appended to a root node, then attribute and text of each
+element are changed. Without any observer, mutation hooks only check that no
+node is observed. With an observer on the root (``subtree``), records are
+queued and delivered in one callback.
+"""
+
+import asyncio
+import time
+
+from wdom.element import Element
+from wdom.node import MutationObserver, Text
+
+SIZES = (1000, 10000, 100000)
+
+
+def mutate(root: Element, n: int) -> None:
+    for i in range(n):
+        elm = Element('div', parent=root)
+        elm.setAttribute('title', str(i))
+        Text('a', parent=elm).data = 'b'
+
+
+def measure(n: int, observe: bool) -> str:
+    loop = asyncio.get_event_loop()
+    root = Element('div')
+    calls = []
+    observer = MutationObserver(lambda records, _: calls.append(records))
+    if observe:
+        observer.observe(root, childList=True, attributes=True,
+                         characterData=True, subtree=True)
+    start = time.perf_counter()
+    mutate(root, n)
+    loop.run_until_complete(asyncio.sleep(0))
+    elapsed = time.perf_counter() - start
+    observer.disconnect()
+    n_records = sum(len(records) for records in calls)
+    return '{:>10.3f} {:>8} {:>8}'.format(elapsed * 1e3, len(calls),
+                                          n_records)
+
+
+def main() -> None:
+    print('{:>8} {:>8} {:>10} {:>8} {:>8}'.format(
+        'elements', 'observed', 'time[ms]', 'calls', 'records'))
+    for n in SIZES:
+        for observe in (False, True):
+            print('{:>8} {:>8} {}'.format(n, str(observe),
+                                          measure(n, observe)))
+
+
+if __name__ == '__main__':
+    main()
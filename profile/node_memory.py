@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Measure memory (bytes) and time (micro seconds) per node in a large tree.
+
+Memory is traced by ``tracemalloc`` while building a tree, including all
+objects allocated for each node (attributes, class list, style, listeners).
+Time is measured separately, without tracing memory.
+"""
+
+import gc
+import time
+import tracemalloc
+from typing import Callable
+
+from wdom.element import Element, HTMLElement
+from wdom.node import Text
+from wdom.tag import Div, Span
+
+N_NODES = 100000
+
+
+def measure_memory(factory: Callable[[Element], None]) -> float:
+    """Return bytes per node allocated by ``factory``."""
+    root = Element('div')
+    gc.collect()
+    tracemalloc.start()
+    for _ in range(N_NODES):
+        factory(root)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # keep ``root`` (and its children) alive until measured
+    assert root.length == N_NODES
+    return size / N_NODES
+
+
+def measure_time(factory: Callable[[Element], None]) -> float:
+    """Return micro seconds per node to build by ``factory``."""
+    root = Element('div')
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(N_NODES):
+        factory(root)
+    return (time.perf_counter() - start) / N_NODES * 1e6
+
+
+def main() -> None:
+    cases = (
+        ('Text', lambda root: Text('text', parent=root)),
+        ('Element', lambda root: Element('p', parent=root)),
+        ('HTMLElement', lambda root: HTMLElement('p', parent=root)),
+        ('Div', lambda root: root.appendChild(Div())),
+        ('Span + Text', lambda root: root.appendChild(Span('text'))),
+        ('Div (attrs)', lambda root: root.appendChild(
+            Div(id='a', class_='b c', style='color: red;'))),
+    )
+    print('{:<14} {:>12} {:>12}'.format('node', 'bytes/node', 'us/node'))
+    for name, factory in cases:
+        print('{:<14} {:>12.0f} {:>12.2f}'.format(
+            name, measure_memory(factory), measure_time(factory)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Compare ``querySelectorAll`` and equivalent ``getElementsBy`` lambdas.
+
+A document has ``n`` rows (``<div class="row">`` with 9 ``<span>``), and 10
+rows have ``<em class="found">`` in it. Selectors starting from an id, a class
+or a tag are looked up by the indexes, and others walk all elements.
+"""
+
+import time
+from typing import Callable, List, Sized, Tuple
+
+from wdom.document import Document
+from wdom.element import Element, getElementsBy
+
+SIZES = (1000, 10000, 100000)
+N_FOUND = 10
+
+
+def make_document(n: int) -> Document:
+    doc = Document()
+    for i in range(n // 10):
+        div = Element('div', parent=doc.body, class_='row')
+        for j in range(9):
+            Element('span', parent=div)
+    step = n // 10 // N_FOUND
+    for i, div in enumerate(list(doc.body.childNodes)[::step][:N_FOUND]):
+        div.appendChild(Element('em', class_='found', id='f{}'.format(i)))
+    div.setAttribute('data-last', 'yes')
+    return doc
+
+
+def _is_em_in_row(node: Element) -> bool:
+    parent = node.parentNode
+    return (node.tagName == 'EM' and parent is not None and
+            'row' in parent.classList)
+
+
+def cases(doc: Document) -> List[Tuple[str, Callable[[], Sized],
+                                       Callable[[], Sized]]]:
+    return [
+        ('#f3', lambda: doc.querySelectorAll('#f3'),
+         lambda: getElementsBy(doc, lambda n: n.getAttribute('id') == 'f3')),
+        ('.found', lambda: doc.querySelectorAll('.found'),
+         lambda: getElementsBy(doc, lambda n: 'found' in n.classList)),
+        ('div.row > em', lambda: doc.querySelectorAll('div.row > em'),
+         lambda: getElementsBy(doc, _is_em_in_row)),
+        ('[data-last]', lambda: doc.querySelectorAll('[data-last]'),
+         lambda: getElementsBy(doc, lambda n: n.hasAttribute('data-last'))),
+    ]
+
+
+def measure(func: Callable[[], Sized]) -> str:
+    start = time.perf_counter()
+    func()
+    return '{:>10.3f}'.format((time.perf_counter() - start) * 1e3)
+
+
+def main() -> None:
+    print('{:>8} {:<14} {:>10} {:>14}  [ms]'.format(
+        'elements', 'selector', 'query', 'getElementsBy'))
+    for n in SIZES:
+        doc = make_document(n)
+        for name, query, lambda_ in cases(doc):
+            assert list(query()) == list(lambda_()), name
+            print('{:>8} {:<14} {} {:>14}'.format(
+                n, name, measure(query), measure(lambda_)))
+
+
+if __name__ == '__main__':
+    main()
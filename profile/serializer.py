@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Compare explicit-stack html serializer with the recursive one.
+
+Html caches of all elements are cleared before each serialization, so both
+serializers build html of the whole tree from scratch.
+"""
+
+import sys
+import time
+
+from wdom.element import Element, HTMLElement
+from wdom.node import Text
+
+N_REPEAT = 10
+
+
+def recursive_html(node) -> str:
+    """Serialize ``node`` in the same way as before (recursive calls)."""
+    if isinstance(node, Element):
+        html = node._html_cache
+        if html is None:
+            html = (node.start_tag +
+                    ''.join(recursive_html(c) for c in node.childNodes) +
+                    node.end_tag)
+            node._html_cache = html
+        return html
+    return node.html
+
+
+def recursive_text(node) -> str:
+    """Get text content of ``node`` in the same way as before."""
+    if isinstance(node, Element):
+        return ''.join(recursive_text(c) for c in node.childNodes)
+    return node.textContent
+
+
+def make_wide_tree() -> HTMLElement:
+    root = HTMLElement('div')
+    for i in range(100):
+        section = HTMLElement('ul', parent=root, class_='section')
+        for j in range(50):
+            li = HTMLElement('li', parent=section)
+            Text('item {} {}'.format(i, j), parent=li)
+    return root
+
+
+def make_deep_tree(depth: int) -> HTMLElement:
+    root = node = HTMLElement('div')
+    for i in range(depth):
+        node = HTMLElement('span', parent=node, class_='level')
+        Text(str(i), parent=node)
+    return root
+
+
+def clear_cache(node) -> None:
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        node._html_cache = None
+        stack.extend(node.childNodes)
+
+
+def measure(root, func) -> float:
+    total = 0.
+    for _ in range(N_REPEAT):
+        clear_cache(root)
+        start = time.perf_counter()
+        func(root)
+        total += time.perf_counter() - start
+    return total / N_REPEAT * 1000
+
+
+def compare(name: str, root) -> None:
+    try:
+        html = recursive_html(root)
+        clear_cache(root)
+        assert html == root.html
+        html_rec = '{:8.2f}'.format(measure(root, recursive_html))
+        text_rec = '{:8.2f}'.format(measure(root, recursive_text))
+    except RecursionError:
+        html_rec = text_rec = '   error'
+    html_it = measure(root, lambda n: n.html)
+    text_it = measure(root, lambda n: n.textContent)
+    print('{:<20} {} {:8.2f}   {} {:8.2f}'.format(
+        name, html_rec, html_it, text_rec, text_it))
+
+
+def main() -> None:
+    limit = sys.getrecursionlimit()
+    print('{:<20} {:>8} {:>8}   {:>8} {:>8}   [ms]'.format(
+        '', 'html', '', 'text', ''))
+    print('{:<20} {:>8} {:>8}   {:>8} {:>8}'.format(
+        'tree', 'rec', 'stack', 'rec', 'stack'))
+    compare('wide (10k nodes)', make_wide_tree())
+    compare('deep ({})'.format(limit // 4), make_deep_tree(limit // 4))
+    compare('deep ({})'.format(limit * 5), make_deep_tree(limit * 5))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Measure sibling navigation and child indexing on wide nodes.
+
+Time per operation should not depend on the number of siblings, also when
+mutations near the first child and navigation are interleaved.
+"""
+
+import time
+
+from wdom.node import Node
+
+SIZES = (1000, 10000, 100000)
+N_OPS = 1000
+
+
+def make_node(n: int) -> Node:
+    parent = Node()
+    for _ in range(n):
+        parent.appendChild(Node())
+    return parent
+
+
+def walk(parent: Node) -> int:
+    node = parent.firstChild
+    while node is not None:
+        node = node.nextSibling
+    return len(parent)
+
+
+def walk_back(parent: Node) -> int:
+    node = parent.lastChild
+    while node is not None:
+        node = node.previousSibling
+    return len(parent)
+
+
+def index_all(parent: Node) -> int:
+    for child in parent.childNodes:
+        parent.index(child)
+    return len(parent)
+
+
+def insert_remove(parent: Node) -> int:
+    # insert before / remove a node near the end of siblings
+    ref = parent.lastChild
+    for _ in range(len(parent)):
+        node = Node()
+        parent.insertBefore(node, ref)
+        parent.removeChild(node)
+    return len(parent)
+
+
+def after_first(parent: Node) -> int:
+    # insert after the first child, then look up the node after it
+    first = parent.firstChild
+    for _ in range(N_OPS):
+        parent.insertBefore(Node(), first.nextSibling)
+    return N_OPS
+
+
+def prepend_next(parent: Node) -> int:
+    # prepend a node, and navigate from a node at the end
+    last = parent.lastChild
+    for _ in range(N_OPS):
+        parent.insertBefore(Node(), parent.firstChild)
+        last.previousSibling.nextSibling
+    return N_OPS
+
+
+def remove_last_after_prepend(parent: Node) -> int:
+    for _ in range(N_OPS):
+        parent.insertBefore(Node(), parent.firstChild)
+        parent.removeChild(parent.lastChild)
+    return N_OPS
+
+
+def measure(func, parent: Node) -> float:
+    """Return time per operation in micro seconds."""
+    start = time.perf_counter()
+    n = func(parent)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main() -> None:
+    funcs = (walk, walk_back, index_all, insert_remove, after_first,
+             prepend_next, remove_last_after_prepend)
+    print('{:>8} '.format('children') +
+          ' '.join('{:>14}'.format(f.__name__[:14]) for f in funcs) +
+          '  [us/op]')
+    for n in SIZES:
+        print('{:>8} '.format(n) + ' '.join(
+            '{:>14.3f}'.format(measure(f, make_node(n))) for f in funcs))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Compare finding the first element by a full list and by lazy traversal.
+
+A document has ``n`` elements (rows of ``<div>`` with 9 ``<span>`` and text),
+and the target element is in the first row. ``getElementsBy(...)[0]`` makes
+the list of all matched elements, while ``iter_descendants`` and
+``NodeIterator`` stop at the first one. Full walks (``textContent`` and a
+``TreeWalker`` over all elements) are also measured.
+"""
+
+import time
+from typing import Any, Callable
+
+from wdom.document import Document
+from wdom.element import Element, getElementsBy
+from wdom.node import Text
+from wdom.traversal import NodeFilter, iter_descendants
+
+SIZES = (1000, 10000, 100000)
+
+
+def make_document(n: int) -> Document:
+    doc = Document()
+    for i in range(n // 10):
+        div = Element('div', parent=doc.body)
+        for j in range(9):
+            span = Element('span', parent=div)
+            span.appendChild(Text(str(j)))
+    doc.body.firstChild.lastChild.setAttribute('data-target', 'yes')
+    return doc
+
+
+def _is_target(node: Any) -> bool:
+    return node.hasAttribute('data-target')
+
+
+def first_by_list(doc: Document) -> Any:
+    return getElementsBy(doc, _is_target)[0]
+
+
+def first_by_generator(doc: Document) -> Any:
+    for node in iter_descendants(doc, NodeFilter.SHOW_ELEMENT):
+        if _is_target(node):
+            return node
+
+
+def first_by_iterator(doc: Document) -> Any:
+    it = doc.createNodeIterator(doc, NodeFilter.SHOW_ELEMENT, _is_target)
+    return it.nextNode()
+
+
+def walk_all(doc: Document) -> int:
+    walker = doc.createTreeWalker(doc, NodeFilter.SHOW_ELEMENT)
+    count = 0
+    while walker.nextNode():
+        count += 1
+    return count
+
+
+def measure(func: Callable[[Document], Any], doc: Document) -> str:
+    start = time.perf_counter()
+    func(doc)
+    return '{:>10.3f}'.format((time.perf_counter() - start) * 1e3)
+
+
+def main() -> None:
+    print('{:>8} {:>10} {:>10} {:>10} {:>12} {:>10}  [ms]'.format(
+        'elements', 'list[0]', 'generator', 'iterator', 'textContent',
+        'walker'))
+    for n in SIZES:
+        doc = make_document(n)
+        assert first_by_list(doc) is first_by_generator(doc)
+        assert first_by_list(doc) is first_by_iterator(doc)
+        print('{:>8} {} {} {} {:>12} {}'.format(
+            n, measure(first_by_list, doc), measure(first_by_generator, doc),
+            measure(first_by_iterator, doc),
+            measure(lambda doc: doc.body.textContent, doc),
+            measure(walk_all, doc)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Compare updating a list on a live page by vdom diff and by ``innerHTML``.
+
+For each number of items and each change, shows time to apply the change and
+total size of the messages sent to browser.
+"""
+
+import time
+from random import Random
+from typing import Callable, List
+
+from wdom.document import get_document
+from wdom.server import _tornado
+from wdom.tag import Ul
+from wdom.vdom import Component, VNode
+
+SIZES = (1000, 10000, 50000)
+
+
+class _Queue(list):
+    push = list.append
+
+
+class _Connection:
+    """Fake client connection which only stores messages."""
+
+    def __init__(self) -> None:
+        self.queue = _Queue()
+
+
+class ItemList(Component):
+    tag = 'ul'
+
+    def __init__(self, items: List[int]) -> None:
+        super().__init__()
+        self.items = items
+
+    def render(self) -> List[VNode]:
+        return [VNode('li', str(i), key=i) for i in self.items]
+
+
+def set_inner_html(ul: Ul, items: List[int]) -> None:
+    ul.innerHTML = ''.join('<li>{}</li>'.format(i) for i in items)
+
+
+def change_one(items: List[int]) -> List[int]:
+    items = list(items)
+    items[len(items) // 2] = -1
+    return items
+
+
+def swap(items: List[int]) -> List[int]:
+    items = list(items)
+    items[1], items[-2] = items[-2], items[1]
+    return items
+
+
+def insert(items: List[int]) -> List[int]:
+    return items[:10] + [-1] + items[10:]
+
+
+def remove(items: List[int]) -> List[int]:
+    return items[:10] + items[11:]
+
+
+def shuffle(items: List[int]) -> List[int]:
+    items = list(items)
+    Random(0).shuffle(items)
+    return items
+
+
+def measure(func: Callable[[], None], conn: _Connection) -> str:
+    conn.queue.clear()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    size = sum(len(str(msg)) for msg in conn.queue)
+    return '{:>9.1f} {:>9}'.format(elapsed * 1e3, size)
+
+
+def main() -> None:
+    conn = _Connection()
+    _tornado.connections.append(conn)
+    body = get_document().body
+    print('{:>6} {:<10} {:>19} {:>19}'.format(
+        '', '', 'vdom', 'innerHTML'))
+    print('{:>6} {:<10} {:>9} {:>9} {:>9} {:>9}'.format(
+        'items', 'change', '[ms]', '[bytes]', '[ms]', '[bytes]'))
+    try:
+        for n in SIZES:
+            items = list(range(n))
+            comp = ItemList(items)
+            ul = Ul()
+            body.append(comp, ul)
+            for change in (None, change_one, swap, insert, remove, shuffle):
+                new_items = change(items) if change else items
+                comp.items = new_items
+                vdom = measure(comp.update, conn)
+                html = measure(lambda: set_inner_html(ul, new_items), conn)
+                name = change.__name__ if change else 'initial'
+                print('{:>6} {:<10} {} {}'.format(n, name, vdom, html))
+                # reset to the original items
+                comp.items = items
+                comp.update()
+            body.removeChild(comp)
+            body.removeChild(ul)
+    finally:
+        _tornado.connections.remove(conn)
+
+
+if __name__ == '__main__':
+    main()
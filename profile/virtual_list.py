@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Compare a list of all rows and ``VirtualList`` on a live page.
+
+For each number of rows, shows number of nodes, time and size of the messages
+to show the list, and to scroll it by a few rows.
+"""
+
+import time
+from typing import Callable
+
+from wdom.document import get_document
+from wdom.event import Event
+from wdom.server import _tornado
+from wdom.tag import Div
+from wdom.virtual import VirtualList
+
+SIZES = (1000, 10000, 100000)
+
+
+class _Queue(list):
+    push = list.append
+
+
+class _Connection:
+    """Fake client connection which only stores messages."""
+
+    def __init__(self) -> None:
+        self.queue = _Queue()
+
+
+def scroll(vlist: VirtualList, top: int) -> None:
+    e = Event('scroll', {
+        'currentTarget': {'id': vlist.wdom_id, 'scrollTop': top,
+                          'clientHeight': vlist.viewport_height},
+    })
+    vlist.on_event_pre(e)
+    vlist.dispatchEvent(e)
+
+
+def measure(func: Callable[[], None], conn: _Connection) -> str:
+    conn.queue.clear()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    size = sum(len(str(msg)) for msg in conn.queue)
+    return '{:>9.1f} {:>10}'.format(elapsed * 1e3, size)
+
+
+def main() -> None:
+    conn = _Connection()
+    _tornado.connections.append(conn)
+    body = get_document().body
+    print('{:>6} {:<8} {:>7} {:>20} {:>20}'.format(
+        'rows', '', 'nodes', 'show', 'scroll'))
+    print('{:>6} {:<8} {:>7} {:>9} {:>10} {:>9} {:>10}'.format(
+        '', '', '', '[ms]', '[bytes]', '[ms]', '[bytes]'))
+    try:
+        for n in SIZES:
+            data = list(range(n))
+            div = Div(*(Div(str(i)) for i in data))
+            show = measure(lambda: body.appendChild(div), conn)
+            print('{:>6} {:<8} {:>7} {} {:>9} {:>10}'.format(
+                n, 'all', div.length, show, '-', '-'))
+            vlist = VirtualList(data)
+            show = measure(lambda: body.appendChild(vlist), conn)
+            move = measure(lambda: scroll(vlist, n * 12), conn)
+            print('{:>6} {:<8} {:>7} {} {}'.format(
+                n, 'virtual', vlist.length, show, move))
+            body.removeChild(div)
+            body.removeChild(vlist)
+    finally:
+        _tornado.connections.remove(conn)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Compare JSON and binary wire protocols.
+
+Reports bytes per frame and encode time for typical message batches.
+"""
+
+import timeit
+
+from wdom.server.protocol import encode_binary, encode_json
+from wdom.tag import Div
+
+N = 10000
+node = Div()
+
+
+def messages(*calls):
+    return [dict(method=method, params=params, target='node',
+                 id=node.wdom_id) for method, params in calls]
+
+
+cases = [
+    ('setAttribute', messages(('setAttribute', ('title', 'a title')))),
+    ('textContent', messages(('textContent', ('12:34:56', )))),
+    ('addClass', messages(('addClass', (['active'], )))),
+    ('10 attr/text updates', messages(*(
+        [('setAttribute', ('value', str(i))) for i in range(5)] +
+        [('textContent', (str(i), )) for i in range(5)]
+    ))),
+    ('insertAdjacentHTML', messages(
+        ('insertAdjacentHTML', ('beforeend', Div('text' * 50).html)))),
+]
+
+if __name__ == '__main__':
+    print('{:<22} {:>10} {:>10} {:>12} {:>12}'.format(
+        '', 'JSON [B]', 'binary [B]', 'JSON [us]', 'binary [us]'))
+    for name, msgs in cases:
+        json_size = len(encode_json(msgs).encode('utf-8'))
+        bin_size = len(encode_binary(msgs))
+        json_time = timeit.timeit(lambda: encode_json(msgs), number=N)
+        bin_time = timeit.timeit(lambda: encode_binary(msgs), number=N)
+        print('{:<22} {:>10} {:>10} {:>12.2f} {:>12.2f}'.format(
+            name, json_size, bin_size, json_time / N * 1e6,
+            bin_time / N * 1e6))
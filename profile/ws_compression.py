@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Measure bytes on the wire and CPU time of WS permessage-deflate.
+
+Messages are compressed in the same way as tornado (persistent context,
+``Z_SYNC_FLUSH``) for several payload sizes and compression levels.
+"""
+
+import time
+import zlib
+
+from wdom.server.protocol import encode_json
+from wdom.tag import Table, Tbody, Td, Tr
+
+N_MESSAGES = 100
+SIZES = (64, 256, 1024, 4096, 16384, 65536)
+LEVELS = (1, 6, 9)
+MEM_LEVEL = 8
+
+
+def _table_html(n_rows: int, offset: int) -> str:
+    rows = [Tr(*(Td('cell {}-{}'.format(offset + i, j)) for j in range(4)))
+            for i in range(n_rows)]
+    return Table(Tbody(*rows)).html
+
+
+def make_message(size: int, offset: int) -> bytes:
+    """Make an ``insertAdjacentHTML`` message of about ``size`` bytes."""
+    n_rows = 1
+    html = _table_html(n_rows, offset)
+    while len(html) < size:
+        n_rows *= 2
+        html = _table_html(n_rows, offset)
+    msg = dict(target='node', id=str(offset), method='insertAdjacentHTML',
+               params=['beforeend', html[:size]])
+    return encode_json([msg]).encode('utf-8')
+
+
+def measure(msgs: list, level: int) -> tuple:
+    """Return mean compressed size and CPU time per message."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS,
+                                  MEM_LEVEL)
+    total = 0
+    start = time.process_time()
+    for data in msgs:
+        out = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        total += len(out) - 4  # tornado strips the last 4 bytes
+    elapsed = time.process_time() - start
+    return total / len(msgs), elapsed / len(msgs)
+
+
+def main() -> None:
+    print('{:>8} {:>5} {:>10} {:>7} {:>10}'.format(
+        'size', 'level', 'wire', 'ratio', 'CPU [us]'))
+    for size in SIZES:
+        msgs = [make_message(size, i * 1000) for i in range(N_MESSAGES)]
+        raw = sum(len(m) for m in msgs) / len(msgs)
+        print('{:>8.0f} {:>5} {:>10.0f} {:>7} {:>10}'.format(
+            raw, '-', raw, '-', '-'))
+        for level in LEVELS:
+            wire, cpu = measure(msgs, level)
+            print('{:>8} {:>5} {:>10.0f} {:>7.2f} {:>10.1f}'.format(
+                '', level, wire, wire / raw, cpu * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+from unittest.mock import MagicMock
+
+from wdom.document import set_app
+from wdom.server import _tornado, send_message
+from wdom.server.base import MessageQueue
+from wdom.server.coalesce import coalesce_messages
+from wdom.server.protocol import encode_binary
+from wdom.web_node import WdomElement
+
+from ..base import TestCase
+
+
+def msg(method, *params, id='1'):
+    return dict(method=method, params=params, target='node', id=id)
+
+
+class TestCoalesceMessages(TestCase):
+    def test_empty(self):
+        self.assertEqual(coalesce_messages([]), [])
+
+    def test_no_redundant(self):
+        msgs = [msg('textContent', 'a', id='1'),
+                msg('textContent', 'b', id='2'),
+                msg('setAttribute', 'a', '1', id='1'),
+                msg('setAttribute', 'b', '1', id='1')]
+        self.assertEqual(coalesce_messages(msgs), msgs)
+
+    def test_text_content(self):
+        msgs = [msg('textContent', 'a'), msg('textContent', 'b'),
+                msg('textContent', 'c')]
+        self.assertEqual(coalesce_messages(msgs), msgs[2:])
+
+    def test_replace_contents(self):
+        msgs = [msg('insertAdjacentHTML', 'beforeend', '<a></a>'),
+                msg('removeChildByIndex', 0),
+                msg('innerHTML', '<b></b>'),
+                msg('empty')]
+        self.assertEqual(coalesce_messages(msgs), msgs[3:])
+
+    def test_replace_keep_siblings(self):
+        msgs = [msg('insertAdjacentHTML', 'afterend', '<a></a>'),
+                msg('setAttribute', 'a', 'b'),
+                msg('textContent', 'a')]
+        self.assertEqual(coalesce_messages(msgs), msgs)
+
+    def test_replace_drop_created(self):
+        msgs = [msg('insertAdjacentHTML', 'beforeend',
+                    '<a wdom_id="2"><b wdom_id="3"></b></a>'),
+                msg('setAttribute', 'c', 'd', id='2'),
+                msg('insertAdjacentHTML', 'afterend', '<c wdom_id="4"></c>',
+                    id='3'),
+                msg('addClass', ['e'], id='4'),
+                msg('textContent', 'a')]
+        self.assertEqual(coalesce_messages(msgs), msgs[4:])
+
+    def test_recreated_after_replace(self):
+        msgs = [msg('innerHTML', '<a wdom_id="2"></a>'),
+                msg('setAttribute', 'a', '1', id='2'),
+                msg('innerHTML', '<a wdom_id="2" a="2"></a>'),
+                msg('setAttribute', 'a', '3', id='2')]
+        self.assertEqual(coalesce_messages(msgs), msgs[2:])
+
+    def test_removed_node(self):
+        msgs = [msg('setAttribute', 'a', 'b', id='2'),
+                msg('textContent', 'a', id='2'),
+                msg('addEventListener', 'click', id='2'),
+                msg('removeChildById', '2', id='1')]
+        self.assertEqual(coalesce_messages(msgs), msgs[3:])
+
+    def test_removed_node_keep_siblings(self):
+        msgs = [msg('insertAdjacentHTML', 'beforebegin', '<a></a>', id='2'),
+                msg('removeChildById', '2', id='1')]
+        self.assertEqual(coalesce_messages(msgs), msgs)
+
+    def test_replaced_node(self):
+        msgs = [msg('setAttribute', 'a', 'b', id='2'),
+                msg('replaceChildById', '<a wdom_id="3"></a>', '2', id='1')]
+        self.assertEqual(coalesce_messages(msgs), msgs[1:])
+
+    def test_reinserted_node(self):
+        msgs = [msg('setAttribute', 'a', '1', id='2'),
+                msg('removeChildById', '2', id='1'),
+                msg('insertAdjacentHTML', 'beforeend',
+                    '<a wdom_id="2" a="1"></a>', id='1'),
+                msg('setAttribute', 'a', '2', id='2')]
+        self.assertEqual(coalesce_messages(msgs), msgs[1:])
+
+    def test_attribute(self):
+        msgs = [msg('setAttribute', 'a', '1'),
+                msg('setAttribute', 'b', '1'),
+                msg('removeAttribute', 'a'),
+                msg('setAttribute', 'a', '2')]
+        self.assertEqual(coalesce_messages(msgs), msgs[1:2] + msgs[3:])
+
+    def test_style(self):
+        msgs = [msg('setAttribute', 'style', 'color: red;'),
+                msg('setAttribute', 'style', 'color: red; top: 0;')]
+        self.assertEqual(coalesce_messages(msgs), msgs[1:])
+
+    def test_class(self):
+        msgs = [msg('addClass', ['a', 'b']),
+                msg('removeClass', ['a']),
+                msg('addClass', ['c'])]
+        self.assertEqual(coalesce_messages(msgs), [
+            msg('addClass', ['b', 'c']),
+            msg('removeClass', ['a']),
+        ])
+
+    def test_class_set_attribute(self):
+        msgs = [msg('addClass', ['a']),
+                msg('setAttribute', 'class', 'b'),
+                msg('addClass', ['c'])]
+        self.assertEqual(coalesce_messages(msgs), msgs)
+
+    def test_class_remove_attribute(self):
+        msgs = [msg('addClass', ['a']),
+                msg('removeClass', ['b']),
+                msg('removeAttribute', 'class'),
+                msg('addClass', ['c']),
+                msg('addClass', ['d'])]
+        self.assertEqual(coalesce_messages(msgs), [
+            msg('addClass', ['a']),
+            msg('removeClass', ['b']),
+            msg('removeAttribute', 'class'),
+            msg('addClass', ['c', 'd']),
+        ])
+
+    def test_class_single(self):
+        msgs = [msg('addClass', ['a']), msg('addClass', ['a'], id='2')]
+        result = coalesce_messages(msgs)
+        self.assertIs(result[0], msgs[0])
+        self.assertIs(result[1], msgs[1])
+
+    def test_barrier(self):
+        msgs = [msg('textContent', 'a'),
+                msg('eval', 'node.textContent'),
+                msg('textContent', 'b'),
+                {'type': 'other'},
+                msg('setAttribute', 'a', '1', id='2'),
+                msg('removeChildById', '2')]
+        self.assertEqual(coalesce_messages(msgs), msgs[:4] + msgs[5:])
+
+    def test_not_modified(self):
+        msgs = [msg('addClass', ['a']), msg('addClass', ['b'])]
+        copied = json.loads(json.dumps(msgs))
+        coalesce_messages(msgs)
+        self.assertEqual(json.loads(json.dumps(msgs)), copied)
+
+
+class TestCoalesceElement(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sent = []
+        self.conn = MagicMock()
+        self.conn.queue = MessageQueue(self.sent.append)
+        _tornado.connections.append(self.conn)
+        self.elm = WdomElement('div')
+        set_app(self.elm)
+        self.conn.queue.clear()
+
+    def tearDown(self):
+        _tornado.connections.remove(self.conn)
+        super().tearDown()
+
+    def test_reduce(self):
+        for i in range(10):
+            self.elm.textContent = str(i)
+            self.elm.style.color = 'red' if i % 2 else 'blue'
+            self.elm.classList.toggle('a')
+            self.elm.setAttribute('n', str(i))
+        child = WdomElement('span')
+        self.elm.appendChild(child)
+        child.setAttribute('a', 'b')
+        child.addEventListener('click', print)
+        self.elm.removeChild(child)
+        msgs = self.conn.queue._queue[:]
+        send_message()
+
+        self.assertEqual(len(self.sent), 1)
+        sent = json.loads(self.sent[0])
+        self.assertEqual(len(msgs), 44)
+        self.assertEqual([m['method'] for m in sent], [
+            'textContent', 'setAttribute', 'removeClass', 'setAttribute',
+            'insertAdjacentHTML', 'removeChildById',
+        ])
+        self.assertEqual(sent[0]['params'], ['9'])
+        self.assertLess(len(self.sent[0]), len(json.dumps(msgs)) // 5)
+        self.assertLess(len(encode_binary(sent)),
+                        len(encode_binary(msgs)) // 5)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+
+from parameterized import parameterized
+
+from wdom.server.protocol import METHODS, decode_binary, encode_binary
+
+from ..base import TestCase
+
+
+def node_msg(method, *params, id='140234567890123'):
+    return dict(method=method, params=params, target='node', id=id)
+
+
+class TestBinaryProtocol(TestCase):
+    def assertRoundTrip(self, msgs):
+        data = encode_binary(msgs)
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(decode_binary(data), json.loads(json.dumps(msgs)))
+        return data
+
+    def test_empty(self):
+        self.assertEqual(encode_binary([]), b'\x01')
+        self.assertEqual(decode_binary(b'\x01'), [])
+
+    @parameterized.expand([(m, ) for m in METHODS])
+    def test_methods(self, method):
+        data = self.assertRoundTrip([node_msg(method)])
+        # version + opcode + id (7 bytes varint) + params count
+        self.assertEqual(len(data), 10)
+
+    def test_unknown_method(self):
+        self.assertRoundTrip([node_msg('unknown', 1)])
+
+    @parameterized.expand([
+        ('document', ),
+        ('window', ),
+        ('1', ),
+        ('my-id', ),
+        ('0123', ),
+        ('99999999999999999999', ),
+    ])
+    def test_node_id(self, id):
+        self.assertRoundTrip([node_msg('click', id=id)])
+
+    @parameterized.expand([
+        (None, ), (True, ), (False, ), ('', ), ('text', ), ('日本語', ),
+        (0, ), (127, ), (128, ), (2 ** 40, ), (-1, ), (-300, ), (1.5, ),
+        (['a', 'b'], ), ([1, [2, None]], ), ({'a': 1}, ),
+    ])
+    def test_params(self, value):
+        self.assertRoundTrip([node_msg('setAttribute', 'attr', value)])
+
+    def test_non_node_message(self):
+        msgs = [{'type': 'other', 'data': [1, 2]}, node_msg('click')]
+        self.assertRoundTrip(msgs)
+
+    def test_multi_messages(self):
+        msgs = [node_msg('textContent', str(i)) for i in range(100)]
+        data = self.assertRoundTrip(msgs)
+        self.assertLess(len(data), len(json.dumps(msgs)) / 5)
+
+    def test_version(self):
+        with self.assertRaises(ValueError):
+            decode_binary(b'\x02')
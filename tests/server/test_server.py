@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import asyncio
+import gzip
 import sys
 import os
 from os import path
@@ -9,14 +11,23 @@ import json
 import time
 import subprocess
 import unittest
+from unittest.mock import MagicMock, patch
 
 from selenium.webdriver.common.utils import free_port
 from syncer import sync
+from tornado.httpclient import AsyncHTTPClient
+from tornado.platform.asyncio import to_asyncio_future
+from tornado.websocket import websocket_connect
 
 from wdom import server
 from wdom.document import get_document
+from wdom.options import config
+from wdom.server.base import MessageQueue
+from wdom.server.protocol import BINARY_PROTOCOL, JSON_PROTOCOL
+from wdom.server.protocol import decode_binary
 from wdom.util import suppress_logging
 
+from ..base import TestCase
 from .base import HTTPTestCase
 
 curdir = path.dirname(__file__)
@@ -176,6 +187,83 @@ class TestMainHandler(HTTPTestCase):
         self.assertIn('testing', res.text)
 
 
+class TestMainHandlerCache(HTTPTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.document = get_document()
+        self.start()
+
+    async def fetch_raw(self, headers=None):
+        with self.assertLogs('wdom', 'INFO'):
+            return await to_asyncio_future(AsyncHTTPClient().fetch(
+                self.url, headers=headers, raise_error=False,
+                decompress_response=False))
+
+    @sync
+    async def test_stream(self) -> None:
+        self.document.body.append('new text')
+        self.assertFalse(self.document.is_cached())
+        res = await self.fetch_raw()
+        self.assertEqual(res.code, 200)
+        self.assertIn(b'new text', res.body)
+        self.assertEqual(res.headers['Transfer-Encoding'], 'chunked')
+        self.assertNotIn('Etag', res.headers)
+        self.assertTrue(self.document.is_cached())
+        self.assertEqual(res.body, self.document.build().encode('utf-8'))
+
+    @sync
+    async def test_cache(self) -> None:
+        await self.fetch_raw()
+        res1 = await self.fetch_raw()
+        res2 = await self.fetch_raw()
+        self.assertEqual(res1.code, 200)
+        self.assertEqual(res1.body, self.document.build().encode('utf-8'))
+        self.assertIsNone(res1.headers.get('Content-Encoding'))
+        self.assertEqual(res1.headers['Etag'], res2.headers['Etag'])
+        self.assertIs(server._tornado._get_page(self.document.build()),
+                      server._tornado._page)
+
+        self.document.body.append('new text')
+        await self.fetch_raw()
+        res3 = await self.fetch_raw()
+        self.assertIn(b'new text', res3.body)
+        self.assertNotEqual(res1.headers['Etag'], res3.headers['Etag'])
+
+    @sync
+    async def test_etag(self) -> None:
+        await self.fetch_raw()
+        res1 = await self.fetch_raw()
+        res2 = await self.fetch_raw({'If-None-Match': res1.headers['Etag']})
+        self.assertEqual(res2.code, 304)
+        self.assertEqual(res2.body, b'')
+
+        self.document.body.setAttribute('class', 'a')
+        res3 = await self.fetch_raw({'If-None-Match': res1.headers['Etag']})
+        self.assertEqual(res3.code, 200)
+        self.assertIn(b'class="a"', res3.body)
+
+        # clearing class also changes the page
+        res4 = await self.fetch_raw()
+        etag = res4.headers['Etag']
+        self.document.body.setAttribute('class', '')
+        self.assertFalse(self.document.is_cached())
+        res5 = await self.fetch_raw({'If-None-Match': etag})
+        self.assertEqual(res5.code, 200)
+        self.assertNotIn(b'class="a"', res5.body)
+        res6 = await self.fetch_raw({'If-None-Match': etag})
+        self.assertEqual(res6.code, 200)
+        self.assertNotEqual(res6.headers['Etag'], etag)
+
+    @sync
+    async def test_gzip(self) -> None:
+        self.document.build()
+        res = await self.fetch_raw({'Accept-Encoding': 'gzip'})
+        self.assertEqual(res.code, 200)
+        self.assertEqual(res.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(res.body),
+                         self.document.build().encode('utf-8'))
+
+
 class TestStaticFileHandler(HTTPTestCase):
     def setUp(self) -> None:
         super().setUp()
@@ -258,6 +346,16 @@ class TestRootWSHandler(HTTPTestCase):
             del _
             await self.wait()
 
+    @sync
+    async def test_push_message(self) -> None:
+        await self.wait()
+        server.push_message({'a': 1})
+        msg = await asyncio.wait_for(self.ws.read_message(), self.timeout)
+        self.assertEqual(json.loads(msg), [{'a': 1}])
+        conn = server.module.connections[0]
+        self.assertEqual(conn.queue.depth, 0)
+        self.assertEqual(conn.queue.flush_count, 1)
+
     @sync
     async def test_logging_error(self) -> None:
         with self.assertLogs('wdom.server', 'INFO'):
@@ -289,3 +387,228 @@ class TestRootWSHandler(HTTPTestCase):
                 [dict(type='log', level='debug', message='test')]
             ))
             await self.wait()
+
+
+class TestWSProtocol(HTTPTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._config = dict(vars(config))
+        self.start()
+        sync(self.wait())
+        self.ws_url = 'ws://localhost:{}/wdom_ws'.format(self.port)
+
+    def tearDown(self) -> None:
+        vars(config).update(self._config)
+        super().tearDown()
+
+    async def connect(self, url, subprotocols=None, compression=None):
+        ws = await websocket_connect(url, subprotocols=subprotocols,
+                                     compression_options=compression)
+        self._ws_connections.append(ws)
+        await self.wait()
+        return ws
+
+    async def read_message(self, ws):
+        server.push_message({'target': 'node', 'id': 'document',
+                             'method': 'click', 'params': []})
+        return await asyncio.wait_for(ws.read_message(), self.timeout)
+
+    @sync
+    async def test_no_subprotocol(self) -> None:
+        config.binary_protocol = True
+        ws = await self.connect(self.ws_url)
+        self.assertIsNone(ws.selected_subprotocol)
+        msg = await self.read_message(ws)
+        self.assertEqual(json.loads(msg)[0]['method'], 'click')
+
+    @sync
+    async def test_binary_disabled(self) -> None:
+        config.binary_protocol = False
+        ws = await self.connect(
+            self.ws_url, [BINARY_PROTOCOL, JSON_PROTOCOL])
+        self.assertEqual(ws.selected_subprotocol, JSON_PROTOCOL)
+        msg = await self.read_message(ws)
+        self.assertEqual(json.loads(msg)[0]['method'], 'click')
+
+    @sync
+    async def test_binary(self) -> None:
+        config.binary_protocol = True
+        ws = await self.connect(
+            self.ws_url, [BINARY_PROTOCOL, JSON_PROTOCOL])
+        self.assertEqual(ws.selected_subprotocol, BINARY_PROTOCOL)
+        msg = await self.read_message(ws)
+        self.assertIsInstance(msg, bytes)
+        self.assertEqual(decode_binary(msg)[0]['method'], 'click')
+
+    @sync
+    async def test_compression_disabled(self) -> None:
+        config.ws_compression = False
+        ws = await self.connect(self.ws_url, compression={})
+        self.assertIsNone(ws.protocol._decompressor)
+        msg = await self.read_message(ws)
+        self.assertEqual(json.loads(msg)[0]['method'], 'click')
+
+    @sync
+    async def test_compression(self) -> None:
+        config.ws_compression = True
+        config.ws_compression_min_size = 100
+        ws = await self.connect(self.ws_url, compression={})
+        self.assertIsNotNone(ws.protocol._decompressor)
+        conn = server._tornado.connections[-1]
+        compressor = conn.ws_connection._compressor
+        compressor.compress = MagicMock(wraps=compressor.compress)
+
+        conn.write_message('a' * 99)
+        msg = await asyncio.wait_for(ws.read_message(), self.timeout)
+        self.assertEqual(msg, 'a' * 99)
+        self.assertEqual(compressor.compress.call_count, 0)
+
+        conn.write_message('a' * 100)
+        msg = await asyncio.wait_for(ws.read_message(), self.timeout)
+        self.assertEqual(msg, 'a' * 100)
+        self.assertEqual(compressor.compress.call_count, 1)
+
+        conn.write_message(b'b' * 10, binary=True)
+        msg = await asyncio.wait_for(ws.read_message(), self.timeout)
+        self.assertEqual(msg, b'b' * 10)
+        self.assertEqual(compressor.compress.call_count, 1)
+        self.assertIs(conn.ws_connection._compressor, compressor)
+
+        # size in bytes, not in characters
+        conn.write_message('\u3042' * 50)
+        msg = await asyncio.wait_for(ws.read_message(), self.timeout)
+        self.assertEqual(msg, '\u3042' * 50)
+        self.assertEqual(compressor.compress.call_count, 2)
+
+    @sync
+    async def test_compression_unknown_tornado(self) -> None:
+        config.ws_compression = True
+        config.ws_compression_min_size = 100
+        ws = await self.connect(self.ws_url, compression={})
+        conn = server._tornado.connections[-1]
+        compressor = conn.ws_connection._compressor
+        compressor.compress = MagicMock(wraps=compressor.compress)
+        # private compressor may be changed, so compress all messages
+        with patch('tornado.version_info', (7, 0, 0, 0)):
+            conn.write_message('a' * 10)
+        msg = await asyncio.wait_for(ws.read_message(), self.timeout)
+        self.assertEqual(msg, 'a' * 10)
+        self.assertEqual(compressor.compress.call_count, 1)
+
+
+class TestMessageQueue(TestCase):
+    def setUp(self):
+        super().setUp()
+        self._config = dict(vars(config))
+        self.write = MagicMock(return_value=None)
+        self.on_overflow = MagicMock()
+        self.queue = MessageQueue(self.write, self.on_overflow)
+
+    def tearDown(self):
+        self.queue.close()
+        vars(config).update(self._config)
+        super().tearDown()
+
+    @sync
+    async def test_no_flush_without_message(self):
+        await asyncio.sleep(0.05)
+        self.write.assert_not_called()
+        self.assertEqual(self.queue.flush_count, 0)
+
+    @sync
+    async def test_flush_once(self):
+        config.message_wait = 0.01
+        self.queue.push({'a': 1})
+        self.queue.push({'b': 2})
+        self.assertEqual(self.queue.depth, 2)
+        self.write.assert_not_called()
+        await asyncio.sleep(0.05)
+        self.write.assert_called_once_with(json.dumps([{'a': 1}, {'b': 2}]))
+        self.assertEqual(self.queue.depth, 0)
+        self.assertEqual(self.queue.flush_count, 1)
+        self.assertGreaterEqual(self.queue.last_flush_delay, 0.01)
+
+    @sync
+    async def test_flush_zero_wait(self):
+        config.message_wait = 0
+        self.queue.push({'a': 1})
+        await asyncio.sleep(0.001)
+        self.write.assert_called_once_with(json.dumps([{'a': 1}]))
+
+    @sync
+    async def test_flush_now(self):
+        config.message_wait = 1
+        self.queue.push({'a': 1})
+        self.queue.flush()
+        self.write.assert_called_once_with(json.dumps([{'a': 1}]))
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.write.call_count, 1)
+
+    @sync
+    async def test_max_wait(self):
+        config.message_wait = 0.03
+        config.message_max_wait = 0.06
+        start = time.perf_counter()
+        while not self.write.called:
+            self.queue.push({'a': 1})
+            await asyncio.sleep(0.005)
+            self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertLess(time.perf_counter() - start, 0.2)
+
+    @sync
+    async def test_wait_previous_write(self):
+        config.message_wait = 0
+        fut = asyncio.Future()
+        self.write.return_value = fut
+        self.queue.push({'a': 1})
+        await asyncio.sleep(0.001)
+        self.assertTrue(self.queue.writing)
+        self.queue.push({'b': 2})
+        self.queue.push({'c': 3})
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.write.call_count, 1)
+        self.assertEqual(self.queue.depth, 2)
+        self.write.return_value = None
+        fut.set_result(None)
+        await asyncio.sleep(0)
+        self.assertFalse(self.queue.writing)
+        self.assertEqual(self.write.call_count, 2)
+        self.write.assert_called_with(json.dumps([{'b': 2}, {'c': 3}]))
+
+    @sync
+    async def test_high_water(self):
+        config.message_wait = 0
+        config.message_high_water = 3
+        self.write.return_value = asyncio.Future()
+        self.queue.push({'a': 1})
+        await asyncio.sleep(0.001)
+        for i in range(3):
+            self.queue.push({'a': 1})
+        self.on_overflow.assert_not_called()
+        with self.assertLogs('wdom.server', 'WARNING'):
+            self.queue.push({'a': 1})
+        self.on_overflow.assert_called_once_with()
+        self.assertEqual(self.queue.depth, 0)
+
+    def test_closed(self):
+        self.queue.close()
+        self.queue.push({'a': 1})
+        self.assertEqual(self.queue.depth, 0)
+
+
+class TestPushMessage(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.conn1 = MagicMock()
+        self.conn2 = MagicMock()
+        server.module.connections.extend([self.conn1, self.conn2])
+
+    def test_push_message(self):
+        server.push_message({'a': 1})
+        self.conn1.queue.push.assert_called_once_with({'a': 1})
+        self.conn2.queue.push.assert_called_once_with({'a': 1})
+
+    def test_send_message(self):
+        server.send_message()
+        self.conn1.queue.flush.assert_called_once_with()
+        self.conn2.queue.flush.assert_called_once_with()
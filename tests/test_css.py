@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from collections import OrderedDict
+
 from parameterized import parameterized
 
 from wdom.css import _normalize_css_property
@@ -61,6 +63,15 @@ class TestCSSStyleDeclaration(TestCase):
         self.assertNotIn('color: red;', self.css.cssText)
         self.assertEqual(self.css.length, 1)
 
+    def test_order(self):
+        # dict does not keep insertion order on python 3.5
+        self.assertIsInstance(self.css, OrderedDict)
+        self.css.setProperty('z-index', '1')
+        self.css.setProperty('color', 'red')
+        self.css.setProperty('margin', '0')
+        self.assertEqual(self.css.cssText,
+                         'z-index: 1; color: red; margin: 0;')
+
     def test_property_access(self):
         self.assertEqual(self.css.color, '')
         self.css.color = 'red'
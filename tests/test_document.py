@@ -142,13 +142,96 @@ class TestDocument(TestCase):
         self.doc.dispatchEvent(e)
         mock.assert_called_once_with(e)
 
+    def test_owner_document(self):
+        self.assertIs(self.doc.ownerDocument, self.doc)
+        self.assertIs(self.doc.body.ownerDocument, self.doc)
+        parent = Element('div')
+        child = Element('p', parent=parent)
+        text = Text('text', parent=child)
+        self.assertIsNone(text.ownerDocument)
+        self.doc.body.appendChild(parent)
+        self.assertIs(parent.ownerDocument, self.doc)
+        self.assertIs(text.ownerDocument, self.doc)
+        # move in the same document
+        self.doc.head.appendChild(child)
+        self.assertIs(text.ownerDocument, self.doc)
+        self.doc.head.removeChild(child)
+        self.assertIsNone(child.ownerDocument)
+        self.assertIsNone(text.ownerDocument)
+        self.assertIs(parent.ownerDocument, self.doc)
+
+    def test_owner_document_fragment(self):
+        df = DocumentFragment()
+        child = Element('p', parent=df)
+        self.assertIsNone(child.ownerDocument)
+        self.doc.body.appendChild(df)
+        self.assertIs(child.ownerDocument, self.doc)
+        other = Document()
+        other.body.appendChild(Text('a'))
+        other.body.insertBefore(child, other.body.firstChild)
+        self.assertIs(child.ownerDocument, other)
+        text = Text('b', parent=self.doc.body)
+        self.doc.body.replaceChild(child, text)
+        self.assertIs(child.ownerDocument, self.doc)
+        self.assertIsNone(text.ownerDocument)
+
+    def test_get_elements_by_tag_name(self):
+        p1 = Element('p', parent=self.doc.body)
+        div = Element('div', parent=self.doc.body)
+        p2 = Element('p', parent=div)
+        p3 = Element('P')
+        self.doc.body.insertBefore(p3, p1)
+        ps = self.doc.getElementsByTagName('p')
+        self.assertEqual(list(ps), [p3, p1, p2])
+        self.assertEqual(list(div.getElementsByTagName('p')), [p2])
+        self.assertEqual(list(self.doc.getElementsByTagName('BODY')),
+                         [self.doc.body])
+        # live collection
+        self.doc.body.removeChild(div)
+        self.assertEqual(list(ps), [p3, p1])
+        self.assertEqual(list(div.getElementsByTagName('p')), [p2])
+        self.doc.head.appendChild(div)
+        self.assertEqual(list(ps), [p2, p3, p1])
+        p1.tag = 'a'
+        self.assertEqual(list(ps), [p2, p3])
+        self.assertEqual(list(self.doc.getElementsByTagName('a')), [p1])
+
+    def test_get_elements_by_class_name(self):
+        a = Element('a', parent=self.doc.body, class_='c1')
+        b = Element('b', parent=a, class_='c1 c2')
+        c = Element('c', parent=self.doc.body)
+        c1 = self.doc.getElementsByClassName('c1')
+        c12 = self.doc.getElementsByClassName('c2 c1')
+        self.assertEqual(list(c1), [a, b])
+        self.assertEqual(list(c12), [b])
+        self.assertEqual(list(a.getElementsByClassName('c1')), [b])
+        c.classList.add('c2', 'c1')
+        self.assertEqual(list(c1), [a, b, c])
+        self.assertEqual(list(c12), [b, c])
+        b.classList.remove('c2')
+        self.assertEqual(list(c12), [c])
+        c.setAttribute('class', 'c2')
+        self.assertEqual(list(c1), [a, b])
+        c.className = 'c1 c2'
+        self.assertEqual(list(c12), [c])
+        c.removeAttribute('class')
+        self.assertEqual(list(c1), [a, b])
+        self.doc.body.removeChild(a)
+        self.assertEqual(list(c1), [])
+        self.assertEqual(self.doc._element_index.classes, {})
+
     def test_query_selector(self):
-        with self.assertRaises(NotImplementedError):
-            self.doc.querySelector('tag')
+        self.assertIs(self.doc.querySelector('html > body'), self.doc.body)
+        self.assertIsNone(self.doc.querySelector('tag'))
 
     def test_query_selector_all(self):
-        with self.assertRaises(NotImplementedError):
-            self.doc.querySelectorAll('tag')
+        p1 = Element('p', parent=self.doc.body, class_='a')
+        p2 = Element('p', parent=self.doc.head, id='p2')
+        self.assertEqual(list(self.doc.querySelectorAll('p')), [p2, p1])
+        self.assertEqual(list(self.doc.querySelectorAll('body .a')), [p1])
+        self.assertEqual(list(self.doc.querySelectorAll('#p2')), [p2])
+        self.assertEqual(list(self.doc.body.querySelectorAll('#p2')), [])
+        self.assertEqual(len(self.doc.querySelectorAll('tag')), 0)
 
 
 class TestWdomDocument(TestCase):
@@ -156,7 +239,7 @@ class TestWdomDocument(TestCase):
         super().setUp()
         self.doc = WdomDocument()
         self.doc.defaultView.customElements.reset()
-        server._tornado.connections = [1]
+        server._tornado.connections = [MagicMock()]
 
     def test_blankpage(self) -> None:
         _re = re.compile(
@@ -381,6 +464,107 @@ class TestWdomDocument(TestCase):
     def test_wdom_id(self):
         self.assertEqual(self.doc.wdom_id, 'document')
 
+    def test_build_cache(self):
+        html = self.doc.build()
+        self.assertIs(self.doc.build(), html)
+
+    def test_build_cache_autoreload(self):
+        self.doc._autoreload = True
+        html = self.doc.build()
+        self.assertIn('WDOM_AUTORELOAD', html)
+        self.assertIs(self.doc.build(), html)
+        self.doc._autoreload = False
+        self.assertNotIn('WDOM_AUTORELOAD', self.doc.build())
+
+    def test_build_cache_invalidate(self):
+        elm = WdomElement('a')
+        text = Text('text')
+        elm.appendChild(text)
+        self.doc.body.appendChild(elm)
+        html = self.doc.build()
+
+        def assert_changed(pattern):
+            nonlocal html
+            new_html = self.doc.build()
+            self.assertIsNot(new_html, html)
+            self.assertRegex(new_html, pattern)
+            self.assertIs(self.doc.build(), new_html)
+            html = new_html
+
+        elm.setAttribute('href', 'b')
+        assert_changed('href="b"')
+        elm.getAttributeNode('href').value = 'c'
+        assert_changed('href="c"')
+        elm.removeAttribute('href')
+        assert_changed('<a wdom_id="\d+">')
+        elm.classList.add('d')
+        assert_changed('class="d"')
+        elm.removeAttribute('class')
+        assert_changed('<a wdom_id="\d+">')
+        elm.style.color = 'red'
+        assert_changed('style="color: red;"')
+        elm.style = 'color: blue'
+        assert_changed('style="color: blue;"')
+        text.data = 'new'
+        assert_changed('>new</a>')
+        elm.appendChild(Comment('comment'))
+        assert_changed('<!--comment--></a>')
+        elm.removeChild(text)
+        assert_changed('"><!--comment--></a>')
+        self.doc.doctype.name = 'xhtml'
+        assert_changed('<!DOCTYPE xhtml>')
+
+    def test_iter_html(self):
+        self.doc.body.appendChild(WdomElement('a'))
+        self.doc.body.appendChild(Text('text'))
+        chunks = list(self.doc.iter_html())
+        self.assertEqual(''.join(chunks), self.doc.build())
+        self.assertEqual(len(chunks), 5)
+        self.assertTrue(chunks[0].startswith('<!DOCTYPE html><html'))
+        self.assertIn('</head>', chunks[0])
+        self.assertTrue(chunks[0].endswith(self.doc.body.start_tag))
+        self.assertTrue(chunks[1].startswith('<script'))
+        self.assertRegex(chunks[2], '<a wdom_id="\d+"></a>')
+        self.assertEqual(chunks[3], 'text')
+        self.assertEqual(chunks[4], '</body></html>')
+
+    def test_iter_html_no_body(self):
+        self.doc.documentElement.removeChild(self.doc.body)
+        chunks = list(self.doc.iter_html())
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0], self.doc.build())
+
+    def test_iter_build(self):
+        self.doc.body.appendChild(WdomElement('a'))
+        self.assertFalse(self.doc.is_cached())
+        html = ''.join(self.doc.iter_build())
+        self.assertTrue(self.doc.is_cached())
+        self.assertEqual(list(self.doc.iter_build()), [html])
+        self.assertEqual(self.doc.build(), html)
+
+    def test_iter_build_changed(self):
+        chunks = self.doc.iter_build()
+        next(chunks)
+        self.doc.body.appendChild(WdomElement('a'))
+        list(chunks)
+        self.assertFalse(self.doc.is_cached())
+
+    def test_build_cache_clear_class(self):
+        elm = WdomElement('a', parent=self.doc.body)
+        elm.setAttribute('class', 'a')
+        self.assertIn('class="a"', self.doc.build())
+        self.assertTrue(self.doc.is_cached())
+        elm.setAttribute('class', '')
+        self.assertFalse(self.doc.is_cached())
+        self.assertNotIn('class="a"', self.doc.build())
+
+    def test_build_cache_other_tree(self):
+        html = self.doc.build()
+        elm = WdomElement('a')
+        elm.setAttribute('href', 'b')
+        elm.appendChild(Text('text'))
+        self.assertIs(self.doc.build(), html)
+
 
 class TestDocumentOptions(TestCase):
     def setUp(self):
@@ -12,7 +12,9 @@ from wdom.element import (
     getElementsBy, getElementsByClassName, getElementsByTagName,
     querySelector, querySelectorAll,
 )
-from wdom.node import Text
+from wdom.node import Comment, DocumentFragment, RawHtml, Text
+from wdom.tag import Div, NestedTag, Script, Table
+from wdom.web_node import remove_wdom_id
 from wdom.window import customElements
 
 from .base import TestCase
@@ -393,12 +395,16 @@ class TestGetElements(TestCase):
         self.assertIn(self.c3, attr_elms)
 
     def test_query_selector(self):
-        with self.assertRaises(NotImplementedError):
-            querySelector(self.elm, 'tag')
+        self.assertIs(querySelector(self.elm, 'c1'), self.c1)
+        self.assertIs(querySelector(self.elm, '[b]'), self.c2)
+        self.assertIsNone(querySelector(self.elm, 'tag'))
 
     def test_query_selector_all(self):
-        with self.assertRaises(NotImplementedError):
-            querySelectorAll(self.elm, 'tag')
+        self.assertEqual(list(querySelectorAll(self.elm, 'c1')),
+                         [self.c1, self.c2])
+        self.assertEqual(list(querySelectorAll(self.elm, 'c1 + c3')),
+                         [self.c3])
+        self.assertEqual(list(querySelectorAll(self.elm, 'tag')), [])
 
 
 class TestElement(TestCase):
@@ -839,12 +845,20 @@ class TestElement(TestCase):
             customElements.define(1, 2, 3)
 
     def test_query_selector(self):
-        with self.assertRaises(NotImplementedError):
-            self.elm.querySelector('tag')
+        self.elm.innerHTML = '<a></a><b class="c"></b><b></b>'
+        self.assertIs(self.elm.querySelector('b'), self.elm.childNodes[1])
+        self.assertIsNone(self.elm.querySelector('tag'))
 
     def test_query_selector_all(self):
-        with self.assertRaises(NotImplementedError):
-            self.elm.querySelectorAll('tag')
+        self.elm.innerHTML = '<a></a><b class="c"></b><b></b>'
+        self.assertEqual(list(self.elm.querySelectorAll('b:not(.c)')),
+                         [self.elm.childNodes[2]])
+        self.assertEqual(len(self.elm.querySelectorAll('tag')), 0)
+
+    def test_matches(self):
+        self.elm.innerHTML = '<a></a><b class="c"></b>'
+        self.assertTrue(self.elm.lastChild.matches('a + b.c'))
+        self.assertFalse(self.elm.lastChild.matches('a > b'))
 
 
 class TestHTMLElement(TestCase):
@@ -1020,6 +1034,179 @@ class TestHTMLElement(TestCase):
         self.assertTrue(isinstance(self.elm.firstChild, HTMLElement))
 
 
+class TestHTMLCache(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = HTMLElement('div')
+        self.c1 = HTMLElement('p', parent=self.root)
+        self.c2 = HTMLElement('p', parent=self.root)
+        self.text = Text('text', parent=self.c1)
+        self.html = self.root.html
+
+    def assertChanged(self, html):
+        self.assertIsNot(self.root.html, self.html)
+        self.assertEqual(self.root.html, html)
+        self.assertIs(self.root.html, self.root.html)
+
+    def test_cache(self):
+        self.assertEqual(self.html, '<div><p>text</p><p></p></div>')
+        self.assertIs(self.root.html, self.html)
+        self.assertIsNotNone(self.c1._html_cache)
+        self.assertIsNotNone(self.c2._html_cache)
+
+    def test_text(self):
+        c2_html = self.c2.html
+        self.text.data = 'new'
+        self.assertIsNone(self.c1._html_cache)
+        self.assertIs(self.c2._html_cache, c2_html)
+        self.assertChanged('<div><p>new</p><p></p></div>')
+        self.text.appendData('<')
+        self.assertChanged('<div><p>new&lt;</p><p></p></div>')
+
+    def test_attributes(self):
+        self.c2.setAttribute('a', 'b')
+        self.assertChanged('<div><p>text</p><p a="b"></p></div>')
+        self.c2.getAttributeNode('a').value = 'c'
+        self.assertChanged('<div><p>text</p><p a="c"></p></div>')
+        self.c2.removeAttribute('a')
+        self.assertChanged('<div><p>text</p><p></p></div>')
+
+    def test_class(self):
+        self.c2.classList.add('a')
+        self.assertChanged('<div><p>text</p><p class="a"></p></div>')
+        self.c2.classList.remove('a')
+        self.assertChanged('<div><p>text</p><p></p></div>')
+        self.c2.setAttribute('class', 'b')
+        self.assertChanged('<div><p>text</p><p class="b"></p></div>')
+        self.c2.removeAttribute('class')
+        self.assertChanged('<div><p>text</p><p></p></div>')
+
+    def test_clear_class(self):
+        self.c2.setAttribute('class', 'a')
+        self.assertChanged('<div><p>text</p><p class="a"></p></div>')
+        self.c2.setAttribute('class', '')
+        self.assertChanged('<div><p>text</p><p></p></div>')
+        self.c2.className = 'b'
+        self.assertChanged('<div><p>text</p><p class="b"></p></div>')
+        self.c2.className = ''
+        self.assertChanged('<div><p>text</p><p></p></div>')
+
+    def test_style(self):
+        self.c2.style.color = 'red'
+        self.assertChanged(
+            '<div><p>text</p><p style="color: red;"></p></div>')
+        self.c2.style = CSSStyleDeclaration('color: blue')
+        self.assertChanged(
+            '<div><p>text</p><p style="color: blue;"></p></div>')
+        self.c2.removeAttribute('style')
+        self.assertChanged('<div><p>text</p><p></p></div>')
+
+    def test_children(self):
+        self.c2.appendChild(self.text)
+        self.assertChanged('<div><p></p><p>text</p></div>')
+        self.c2.insertBefore(HTMLElement('a'), self.text)
+        self.assertChanged('<div><p></p><p><a></a>text</p></div>')
+        self.c2.textContent = 'b'
+        self.assertChanged('<div><p></p><p>b</p></div>')
+        self.c2.innerHTML = '<b>c</b>'
+        self.assertChanged('<div><p></p><p><b>c</b></p></div>')
+        self.root.removeChild(self.c1)
+        self.assertChanged('<div><p><b>c</b></p></div>')
+
+    def test_moved_node(self):
+        other = HTMLElement('div')
+        other_html = other.html
+        c1_html = self.c1.html
+        other.appendChild(self.c1)
+        self.assertIs(self.c1.html, c1_html)
+        self.assertChanged('<div><p></p></div>')
+        self.assertIsNot(other.html, other_html)
+        self.assertEqual(other.html, '<div><p>text</p></div>')
+
+    def test_nested_tag(self):
+        class Nested(NestedTag):
+            tag = 'section'
+            inner_tag_class = Div
+
+        nested = Nested(parent=self.c2)
+        child = HTMLElement('b', parent=nested)
+        self.assertEqual(remove_wdom_id(self.root.html),
+                         '<div><p>text</p><p><section><div><b></b></div>'
+                         '</section></p></div>')
+        child.setAttribute('a', 'b')
+        self.assertIn('<b a="b"></b>', self.root.html)
+        child.textContent = 'c'
+        self.assertIn('<b a="b">c</b>', self.root.html)
+
+
+def _recursive_html(node):
+    if isinstance(node, Element) and type(node).html is Element.html:
+        return (node.start_tag +
+                ''.join(_recursive_html(c) for c in node.childNodes) +
+                node.end_tag)
+    return node.html
+
+
+class TestSerializer(TestCase):
+    def test_same_output(self):
+        root = HTMLElement('div', id='a', class_='b c')
+        Text('<a> & "b"', parent=root)
+        p = HTMLElement('p', parent=root, hidden=True)
+        HTMLElement('img', parent=p, src='a.png')
+        Comment('comment', parent=p)
+        RawHtml('<b>raw</b>', parent=p)
+        Script('if (a < b) {}', parent=root)
+
+        class Nested(NestedTag):
+            tag = 'section'
+            inner_tag_class = Div
+
+        nested = Nested(parent=root)
+        nested.appendChild(HTMLElement('span'))
+        Text('<in nested>', parent=nested.childNodes[0])
+        Table(parent=root).appendChild(HTMLElement('tr'))
+        expected = _recursive_html(root)
+        self.assertIn('&lt;in nested&gt;', expected)
+        self.assertEqual(root.html, expected)
+        p._html_cache = None
+        root._html_cache = None
+        self.assertEqual(root.html, expected)
+        self.assertEqual(root.innerHTML, expected[len(root.start_tag):-6])
+        self.assertEqual(root.textContent,
+                         '<a> & "b"comment<b>raw</b>if (a < b) {}'
+                         '<in nested>')
+
+    def test_deep_tree(self):
+        depth = sys.getrecursionlimit() * 2
+        root = HTMLElement('div')
+        node = root
+        for i in range(depth):
+            node = HTMLElement('b', parent=node)
+        Text('text', parent=node)
+        self.assertEqual(root.html,
+                         '<div>' + '<b>' * depth + 'text' + '</b>' * depth +
+                         '</div>')
+        self.assertEqual(root.textContent, 'text')
+        self.assertEqual(node.parentNode.html, '<b><b>text</b></b>')
+
+    def test_deep_fragment(self):
+        df = DocumentFragment()
+        node = df
+        for i in range(sys.getrecursionlimit() * 2):
+            node = HTMLElement('b', parent=node)
+        self.assertTrue(df.html.startswith('<b><b>'))
+        self.assertTrue(df.html.endswith('</b></b>'))
+
+    def test_fill_cache(self):
+        root = HTMLElement('div')
+        child = HTMLElement('p', parent=root)
+        grand_child = HTMLElement('a', parent=child)
+        root.innerHTML
+        self.assertIsNone(root._html_cache)
+        self.assertEqual(child._html_cache, '<p><a></a></p>')
+        self.assertEqual(grand_child._html_cache, '<a></a>')
+
+
 class TestSelectElement(TestCase):
     def setUp(self):
         self.select = HTMLSelectElement('select')
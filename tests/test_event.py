@@ -9,6 +9,7 @@ from syncer import sync
 
 from wdom.document import get_document
 from wdom.event import Event, EventListener, EventTarget, create_event
+from wdom.event import _browser_options
 from wdom.event import MouseEvent, DataTransfer, DragEvent
 from wdom.server.handler import create_event_from_msg
 from wdom.web_node import WdomElement
@@ -172,6 +173,27 @@ class TestCreateEventMsg(TestCase):
         self.assertTrue(isinstance(e, Event))
         self.assertTrue(isinstance(e, MouseEvent))
 
+    def test_mouse_event_fields(self):
+        # attributes are read from message, and None if not sent
+        other = WdomElement('tag')
+        msg = {
+            'proto': 'MouseEvent',
+            'type': 'mousemove',
+            'currentTarget': {'id': self.elm.wdom_id},
+            'clientX': 10,
+            'relatedTarget': {'id': other.wdom_id},
+        }
+        e = create_event_from_msg(msg)
+        self.assertEqual(e.clientX, 10)
+        self.assertIsNone(e.clientY)
+        self.assertIs(e.relatedTarget, other)
+        with self.assertRaises(AttributeError):
+            e.unknown
+        e.clientY = 1
+        self.assertEqual(e.clientY, 1)
+        del msg['relatedTarget']
+        self.assertIsNone(e.relatedTarget)
+
     def test_event_from_msg_notarget(self):
         msg = {
             'type': 'event',
@@ -210,6 +232,39 @@ class TestEventListener(TestCase):
         self.assertEqual(self._cofunc_call_count, 1)
         self.assertEqual(self._cofunc_calls[0], self.e)
 
+    def test_options(self):
+        self.assertFalse(self.func_listener.has_options)
+        listener = EventListener(self.func, throttle=0.1, passive=True)
+        self.assertEqual(listener.throttle, 0.1)
+        self.assertIsNone(listener.debounce)
+        self.assertTrue(listener.passive)
+        self.assertTrue(listener.has_options)
+        with self.assertRaises(ValueError):
+            EventListener(self.func, throttle=0.1, debounce=0.1)
+        with self.assertRaises(ValueError):
+            EventListener(self.func, debounce=0)
+
+    def test_browser_options(self):
+        def options(*listeners):
+            return _browser_options(
+                EventListener(self.func, **kw) for kw in listeners)
+
+        self.assertEqual(options({}), {})
+        self.assertEqual(options({'throttle': 0.1}), {'throttle': 100})
+        self.assertEqual(options({'debounce': 0.2, 'passive': True}),
+                         {'debounce': 200, 'passive': True})
+        # the most frequent one is used
+        self.assertEqual(options({'throttle': 0.1}, {'throttle': 0.05}),
+                         {'throttle': 50})
+        self.assertEqual(options({'throttle': 0.1}, {'debounce': 0.05}),
+                         {'throttle': 100})
+        self.assertEqual(options({'throttle': 0.1}, {}), {})
+        self.assertEqual(options({'passive': True}, {}), {})
+        # union of fields
+        self.assertEqual(options({'fields': ['x', 'y']}, {'fields': 'key'}),
+                         {'fields': ['key', 'x', 'y']})
+        self.assertEqual(options({'fields': ['x']}, {}), {})
+
 
 class TestEventTarget(TestCase):
     def setUp(self):
@@ -31,7 +31,11 @@ cases = [
     ('wdom', 'themes'),
     ('wdom.themes', 'default'),
     ('wdom.themes', 'bootstrap3'),
+    ('wdom', 'traversal'),
     ('wdom', 'util'),
+    ('wdom', 'vdom'),
+    ('wdom', 'virtual'),
+    ('wdom', 'selector'),
     ('wdom', 'web_node'),
     ('wdom', 'window'),
 ]
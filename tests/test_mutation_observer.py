@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import gc
+
+from syncer import sync
+
+from wdom.element import Element, HTMLElement
+from wdom.node import MutationObserver, MutationRecord, Text
+from wdom.node import _registrations
+
+from .base import TestCase
+
+
+class TestMutationObserver(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.calls = []
+        self.observer = MutationObserver(
+            lambda records, observer: self.calls.append((records, observer)))
+        self.root = HTMLElement('div')
+        self.c1 = HTMLElement('p', parent=self.root)
+        self.text = Text('a', parent=self.c1)
+
+    def test_options(self):
+        with self.assertRaises(TypeError):
+            self.observer.observe(self.root)
+        with self.assertRaises(TypeError):
+            self.observer.observe(self.root, subtree=True)
+        with self.assertRaises(TypeError):
+            self.observer.observe(self.root, childList=True, attributes=False,
+                                  attributeOldValue=True)
+        with self.assertRaises(TypeError):
+            self.observer.observe(self.root, characterData=False,
+                                  characterDataOldValue=True)
+        # attributes/characterData are implied
+        self.observer.observe(self.root, attributeFilter=['id'],
+                              characterDataOldValue=True)
+        self.root.id = 'a'
+        self.assertEqual(len(self.observer.takeRecords()), 1)
+
+    def test_no_observer(self):
+        self.root.appendChild(HTMLElement('a'))
+        self.assertFalse(_registrations)
+
+    def test_deleted_node(self):
+        node = HTMLElement('a')
+        self.observer.observe(node, childList=True)
+        self.assertTrue(_registrations)
+        del node
+        gc.collect()
+        self.assertFalse(_registrations)
+
+    @sync
+    async def test_child_list(self):
+        self.observer.observe(self.root, childList=True)
+        c2 = self.root.appendChild(HTMLElement('a'))
+        c0 = self.root.insertBefore(HTMLElement('b'), self.c1)
+        self.root.removeChild(self.c1)
+        self.assertEqual(self.calls, [])
+        await asyncio.sleep(0)
+        self.assertEqual(len(self.calls), 1)
+        records, observer = self.calls[0]
+        self.assertIs(observer, self.observer)
+        self.assertEqual([r.type for r in records], ['childList'] * 3)
+        self.assertTrue(all(isinstance(r, MutationRecord) for r in records))
+        self.assertIs(records[0].target, self.root)
+        self.assertEqual(list(records[0].addedNodes), [c2])
+        self.assertIs(records[0].previousSibling, self.c1)
+        self.assertIsNone(records[0].nextSibling)
+        self.assertEqual(list(records[1].addedNodes), [c0])
+        self.assertIsNone(records[1].previousSibling)
+        self.assertIs(records[1].nextSibling, self.c1)
+        self.assertEqual(list(records[2].removedNodes), [self.c1])
+        self.assertEqual(len(records[2].addedNodes), 0)
+        self.assertIs(records[2].previousSibling, c0)
+        self.assertIs(records[2].nextSibling, c2)
+
+    @sync
+    async def test_batch(self):
+        # records in the same turn of the event loop are delivered at once
+        self.observer.observe(self.root, childList=True)
+        for _ in range(10):
+            self.root.appendChild(HTMLElement('a'))
+        await asyncio.sleep(0)
+        self.root.appendChild(HTMLElement('a'))
+        await asyncio.sleep(0)
+        self.assertEqual([len(c[0]) for c in self.calls], [10, 1])
+
+    def test_not_subtree(self):
+        self.observer.observe(self.root, childList=True, attributes=True,
+                              characterData=True)
+        self.c1.appendChild(HTMLElement('a'))
+        self.c1.setAttribute('title', 'a')
+        self.text.data = 'b'
+        self.assertEqual(self.observer.takeRecords(), [])
+
+    def test_subtree(self):
+        self.observer.observe(self.root, childList=True, subtree=True)
+        c2 = self.c1.appendChild(HTMLElement('a'))
+        records = self.observer.takeRecords()
+        self.assertEqual(len(records), 1)
+        self.assertIs(records[0].target, self.c1)
+        self.assertEqual(list(records[0].addedNodes), [c2])
+        self.assertEqual(self.observer.takeRecords(), [])
+
+    def test_attributes(self):
+        self.observer.observe(self.root, attributes=True, subtree=True)
+        self.root.setAttribute('title', 'a')
+        self.root.setAttribute('title', 'b')
+        self.root.removeAttribute('title')
+        self.c1.classList.add('x')
+        self.root.style = 'color: red'
+        records = self.observer.takeRecords()
+        self.assertEqual([r.type for r in records], ['attributes'] * 5)
+        self.assertEqual([r.attributeName for r in records],
+                         ['title', 'title', 'title', 'class', 'style'])
+        self.assertEqual([r.target for r in records], [self.root] * 3 +
+                         [self.c1, self.root])
+        self.assertEqual([r.oldValue for r in records], [None] * 5)
+
+    def test_attribute_old_value(self):
+        self.observer.observe(self.root, attributeOldValue=True)
+        self.root.setAttribute('title', 'a')
+        self.root.setAttribute('title', 'b')
+        self.root.removeAttribute('title')
+        self.root.classList.add('x')
+        self.root.classList.add('y')
+        self.root.classList.remove('x')
+        self.root.setAttribute('class', 'z')
+        self.root.removeAttribute('class')
+        self.root.style['color'] = 'red'
+        self.root.style = 'color: blue'
+        self.assertEqual(
+            [r.oldValue for r in self.observer.takeRecords()],
+            [None, 'a', 'b', None, 'x', 'x y', 'y', 'z', None, 'color: red;'])
+
+    def test_attribute_filter(self):
+        self.observer.observe(self.root, attributeFilter=['id', 'class'])
+        self.root.setAttribute('title', 'a')
+        self.root.id = 'r'
+        self.root.classList.add('x')
+        self.assertEqual(
+            [r.attributeName for r in self.observer.takeRecords()],
+            ['id', 'class'])
+
+    def test_character_data(self):
+        self.observer.observe(self.root, characterData=True, subtree=True,
+                              characterDataOldValue=True)
+        self.text.data = 'b'
+        self.text.appendData('c')
+        records = self.observer.takeRecords()
+        self.assertEqual([r.type for r in records], ['characterData'] * 2)
+        self.assertEqual([r.target for r in records], [self.text] * 2)
+        self.assertEqual([r.oldValue for r in records], ['a', 'b'])
+
+    def test_observe_again(self):
+        self.observer.observe(self.root, childList=True)
+        self.observer.observe(self.root, attributes=True)
+        self.root.appendChild(HTMLElement('a'))
+        self.root.setAttribute('title', 'a')
+        self.assertEqual([r.type for r in self.observer.takeRecords()],
+                         ['attributes'])
+
+    def test_multiple_observers(self):
+        # each observer gets one record, with old value if any requires it
+        other = MutationObserver(lambda records, observer: None)
+        self.observer.observe(self.root, attributes=True, subtree=True)
+        self.observer.observe(self.c1, attributeOldValue=True)
+        other.observe(self.c1, attributes=True)
+        self.c1.setAttribute('title', 'a')
+        self.c1.setAttribute('title', 'b')
+        self.assertEqual([r.oldValue for r in self.observer.takeRecords()],
+                         [None, 'a'])
+        self.assertEqual([r.oldValue for r in other.takeRecords()],
+                         [None, None])
+
+    @sync
+    async def test_removed_subtree(self):
+        # mutations in removed subtree are observed until delivered
+        self.observer.observe(self.root, childList=True, subtree=True)
+        self.root.removeChild(self.c1)
+        self.c1.appendChild(HTMLElement('a'))
+        await asyncio.sleep(0)
+        self.assertEqual([r.target for r in self.calls[0][0]],
+                         [self.root, self.c1])
+        self.c1.appendChild(HTMLElement('a'))
+        self.assertEqual(self.observer.takeRecords(), [])
+
+    @sync
+    async def test_disconnect(self):
+        self.observer.observe(self.root, childList=True)
+        self.root.appendChild(HTMLElement('a'))
+        self.observer.disconnect()
+        self.root.appendChild(HTMLElement('a'))
+        await asyncio.sleep(0)
+        self.assertEqual(self.calls, [])
+        self.assertFalse(_registrations)
+
+    @sync
+    async def test_coroutine_callback(self):
+        records = []
+
+        async def callback(_records, observer):
+            await asyncio.sleep(0)
+            records.extend(_records)
+
+        observer = MutationObserver(callback)
+        observer.observe(self.root, childList=True)
+        self.root.appendChild(Element('a'))
+        for _ in range(3):
+            await asyncio.sleep(0)
+        self.assertEqual(len(records), 1)
+
+    @sync
+    async def test_callback_error(self):
+        def callback(records, observer):
+            raise ValueError
+
+        observer = MutationObserver(callback)
+        observer.observe(self.root, childList=True)
+        self.observer.observe(self.root, childList=True)
+        self.root.appendChild(HTMLElement('a'))
+        with self.assertLogs('wdom.node', 'ERROR'):
+            await asyncio.sleep(0)
+        self.assertEqual(len(self.calls), 1)
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from random import Random
+
 from wdom.element import Element
 from wdom.node import Node, NodeList
 from wdom.node import ParentNode, NonDocumentTypeChildNode, ChildNode
@@ -216,6 +218,119 @@ class TestNode(TestCase):
         self.assertEqual(self.node.childNodes.index(self.c2), 1)
         self.assertEqual(self.node.childNodes.index(self.c3), 2)
 
+    def test_index_not_child(self):
+        self.node.appendChild(self.c1)
+        with self.assertRaises(ValueError):
+            self.node.index(self.c2)
+        with self.assertRaises(ValueError):
+            self.c1.index(self.c1)
+        self.c2.appendChild(self.c1)
+        with self.assertRaises(ValueError):
+            self.node.index(self.c1)
+        with self.assertRaises(ValueError):
+            self.node.removeChild(self.c1)
+
+    def test_child_nodes_live(self):
+        child_nodes = self.node.childNodes
+        self.assertIs(self.node.childNodes, child_nodes)
+        self.node.appendChild(self.c1)
+        self.assertEqual(len(child_nodes), 1)
+        self.assertIs(child_nodes[0], self.c1)
+
+    def _random_modify(self, random, node, children):
+        op = random.randrange(3)
+        if op == 0 and children:
+            ref = random.choice(children)
+            if node is not ref:
+                self.node.insertBefore(node, ref)
+                if node in children:
+                    children.remove(node)
+                children.insert(children.index(ref), node)
+        elif op == 1 and node in children:
+            self.node.removeChild(node)
+            children.remove(node)
+        else:
+            self.node.appendChild(node)
+            if node in children:
+                children.remove(node)
+            children.append(node)
+
+    def test_siblings_after_modification(self):
+        random = Random(0)
+        children = []
+        nodes = [Node() for _ in range(30)]
+        for _ in range(300):
+            self._random_modify(random, random.choice(nodes), children)
+            check = random.choice(nodes)
+            if check in children:
+                i = children.index(check)
+                self.assertEqual(self.node.index(check), i)
+                self.assertIs(check.previousSibling,
+                              children[i - 1] if i > 0 else None)
+                self.assertIs(check.nextSibling,
+                              children[i + 1] if i + 1 < len(children)
+                              else None)
+        self.assertEqual(list(self.node.childNodes), children)
+        for i, child in enumerate(children):
+            self.assertEqual(self.node.index(child), i)
+
+    def test_interleaved_modification(self):
+        # positions shift more than the search range around the last known
+        children = [Node() for _ in range(3000)]
+        for child in children:
+            self.node.appendChild(child)
+        middle = children[1500]
+        self.assertEqual(self.node.index(middle), 1500)
+        first = children[0]
+        for _ in range(500):
+            new = Node()
+            self.node.insertBefore(new, first.nextSibling)
+            children.insert(1, new)
+            self.assertIs(first.nextSibling, new)
+            self.assertIs(new.previousSibling, first)
+            self.assertIs(new.nextSibling, children[2])
+        for _ in range(500):
+            self.node.removeChild(self.node.lastChild)
+            children.pop()
+            self.node.insertBefore(Node(), self.node.firstChild)
+            children.insert(0, self.node.firstChild)
+        self.assertEqual(self.node.index(middle), children.index(middle))
+        self.assertEqual(list(self.node.childNodes), children)
+        for i, child in enumerate(children):
+            self.assertEqual(self.node.index(child), i)
+            self.assertIs(child.previousSibling,
+                          children[i - 1] if i > 0 else None)
+
+    def test_removed_siblings(self):
+        c1, c2, c3 = Node(), Node(), Node()
+        for c in (c1, c2, c3):
+            self.node.appendChild(c)
+        self.node.removeChild(c2)
+        self.assertIsNone(c2.previousSibling)
+        self.assertIsNone(c2.nextSibling)
+        self.assertIs(c1.nextSibling, c3)
+        self.assertIs(c3.previousSibling, c1)
+
+    def test_insert_fragment(self):
+        children = [Node() for _ in range(5)]
+        for child in children:
+            self.node.appendChild(child)
+        df = DocumentFragment()
+        new_nodes = [Node() for _ in range(3)]
+        for node in new_nodes:
+            df.appendChild(node)
+        self.node.insertBefore(df, children[2])
+        children[2:2] = new_nodes
+        self.assertFalse(df.hasChildNodes())
+        self.assertEqual(list(self.node.childNodes), children)
+        for i, child in enumerate(children):
+            self.assertIs(child.parentNode, self.node)
+            self.assertEqual(self.node.index(child), i)
+            self.assertIs(child.nextSibling,
+                          children[i + 1] if i + 1 < len(children) else None)
+            self.assertIs(child.previousSibling,
+                          children[i - 1] if i > 0 else None)
+
 
 class TestNodeList(TestCase):
     def setUp(self):
@@ -562,6 +677,12 @@ class TestText(TestCase):
     def test_nodename(self):
         self.assertEqual(self.tnode.nodeName, '#text')
 
+    def test_no_dict(self):
+        # text nodes use only slots to save memory
+        self.assertFalse(hasattr(self.tnode, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.tnode.a = 1
+
     def test_html_escape(self):
         self.assertEqual(self.tnode.html, 'text')
         self.tnode.textContent = '<'
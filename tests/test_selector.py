@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from parameterized import parameterized
+
+from wdom.document import Document
+from wdom.selector import Selector, compile_selector
+
+from .base import TestCase
+
+html = '''\
+<div id="d" class="x y">\
+<p>1</p><p class="x">2</p><span lang="en-US" data-v="abc">3</span>\
+</div>\
+<ul><li>a</li><li>b</li><li>c</li><li>d</li></ul>\
+<form><input type="checkbox" checked><input disabled><option selected>\
+</option></form>\
+'''
+
+
+class TestSelector(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.doc = Document()
+        self.doc.body.innerHTML = html
+
+    def select(self, selectors):
+        return [e.textContent or e.localName
+                for e in self.doc.querySelectorAll(selectors)]
+
+    @parameterized.expand([
+        ('p', ['1', '2']),
+        ('P', ['1', '2']),
+        ('#d', ['123']),
+        ('.x', ['123', '2']),
+        ('.x.y', ['123']),
+        ('p.x', ['2']),
+        ('div#d.x', ['123']),
+        ('div > p', ['1', '2']),
+        ('body p', ['1', '2']),
+        ('html > p', []),
+        ('p + p', ['2']),
+        ('p + span', ['3']),
+        ('p ~ span', ['3']),
+        ('span ~ p', []),
+        ('ul li, div p', ['1', '2', 'a', 'b', 'c', 'd']),
+        ('[lang]', ['3']),
+        ('[lang=en-US]', ['3']),
+        ('[lang="en-us" i]', ['3']),
+        ('[lang|=en]', ['3']),
+        ('[lang|=e]', []),
+        ('[data-v~=abc]', ['3']),
+        ('[data-v^=ab]', ['3']),
+        ("[data-v$='bc']", ['3']),
+        ('[data-v*=b]', ['3']),
+        ('[data-v*=""]', []),
+        ('li:first-child', ['a']),
+        ('li:last-child', ['d']),
+        ('li:nth-child(2)', ['b']),
+        ('li:nth-child(odd)', ['a', 'c']),
+        ('li:nth-child(even)', ['b', 'd']),
+        ('li:nth-child(2n+1)', ['a', 'c']),
+        ('li:nth-child(-n + 2)', ['a', 'b']),
+        ('li:nth-last-child(1)', ['d']),
+        ('span:nth-of-type(1)', ['3']),
+        ('p:first-of-type', ['1']),
+        ('p:last-of-type', ['2']),
+        ('span:only-of-type', ['3']),
+        ('li:only-child', []),
+        ('p:not(.x)', ['1']),
+        ('li:not(:first-child, :last-child)', ['b', 'c']),
+        ('input:checked, option:checked', ['input', 'option']),
+        ('input:disabled', ['input']),
+        ('input:enabled', ['input']),
+        (':root', ['123abcd']),
+        ('form :empty', ['input', 'input', 'option']),
+        ('div *', ['1', '2', '3']),
+    ])
+    def test_select(self, selectors, expected):
+        self.assertEqual(self.select(selectors), expected)
+
+    def test_query_selector(self):
+        self.assertEqual(self.doc.querySelector('li').textContent, 'a')
+        self.assertEqual(self.doc.querySelector('ul > *:last-child'),
+                         self.doc.querySelector('ul').lastChild)
+        self.assertIsNone(self.doc.querySelector('table'))
+
+    def test_detached(self):
+        div = self.doc.querySelector('div')
+        div.remove()
+        self.assertEqual([p.textContent for p in div.querySelectorAll('.x')],
+                         ['2'])
+        self.assertEqual(div.querySelector('#d'), None)
+        self.assertEqual(self.select('.x'), [])
+
+    def test_scope(self):
+        div = self.doc.querySelector('div')
+        # ancestors of the root node are also checked
+        self.assertEqual(len(div.querySelectorAll('body p')), 2)
+        self.assertEqual(len(div.querySelectorAll('div')), 0)
+
+    def test_reused_id(self):
+        div = self.doc.querySelector('#d')
+        # the latest element with the id is not in the document
+        other = self.doc.createElement('div')
+        other.id = 'd'
+        self.assertIs(self.doc.querySelector('#d'), div)
+        self.assertEqual(list(self.doc.querySelectorAll('#d')), [div])
+
+    def test_detached_root(self):
+        root = self.doc.createElement('div')
+        root.innerHTML = '<p id="a">1</p><p class="b">2</p>'
+        # the latest element with the id is not under the root
+        other = self.doc.createElement('p')
+        other.id = 'a'
+        self.doc.body.appendChild(other)
+        self.assertEqual(root.querySelector('#a').textContent, '1')
+        self.assertEqual(root.querySelector('p.b').textContent, '2')
+        self.assertEqual(list(self.doc.querySelectorAll('#a')), [other])
+
+    def test_cache(self):
+        self.assertIs(compile_selector('div > p'), compile_selector('div > p'))
+        self.assertEqual(repr(compile_selector('a')), "Selector('a')")
+
+    @parameterized.expand([
+        ('', ), ('p >', ), ('[a', ), ('[a=]', ), (':foo', ), ('p,', ),
+        ('li:nth-child(x)', ), ('a:not(b', ), ('#', ),
+    ])
+    def test_invalid(self, selectors):
+        with self.assertRaises(ValueError):
+            Selector(selectors)
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from wdom.document import Document
 from wdom.element import DOMTokenList
-from wdom.tag import Tag, NewTagClass, NestedTag, RawHtmlNode
+from wdom.tag import Tag, NewTagClass, NestedTag, RawHtmlNode, Div
 from wdom.web_node import WdomElement
 from wdom.window import customElements
 
@@ -29,6 +30,17 @@ class TestTag(TestCase):
         self.assertEqual(a.tagName, 'ATAG')
         self.assertEqual(a.localName, 'atag')
 
+    def test_set_tag(self):
+        doc = Document()
+        div = Div(parent=doc.body)
+        self.assertRegex(div.html, '<div wdom_id="\\d+"></div>')
+        div.tag = 'span'
+        self.assertEqual(Div.tag, 'div')
+        self.assertEqual(div.tag, 'span')
+        self.assertRegex(div.html, '<span wdom_id="\\d+"></span>')
+        self.assertEqual(list(doc.getElementsByTagName('span')), [div])
+        self.assertEqual(len(doc.getElementsByTagName('div')), 0)
+
     def test_tag_string(self):
         self.assertRegex(self.tag.html, '<tag wdom_id="\d+"></tag>')
 
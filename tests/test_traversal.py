@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from wdom.document import Document
+from wdom.node import Text
+from wdom.traversal import NodeFilter, NodeIterator, TreeWalker
+from wdom.traversal import iter_descendants
+
+from .base import TestCase
+
+html = '''\
+<p id="a">t1<b id="b">t2</b></p><!--c-->\
+<span id="s"><i id="i">t3</i></span><em id="e"></em>\
+'''
+
+
+def name(node):
+    if node.nodeType == node.ELEMENT_NODE:
+        return node.id
+    return node.textContent
+
+
+def names(nodes):
+    return [name(node) for node in nodes]
+
+
+def reject_b(node):
+    if getattr(node, 'id', None) == 'b':
+        return NodeFilter.FILTER_REJECT
+    return NodeFilter.FILTER_ACCEPT
+
+
+class TestIterDescendants(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.doc = Document()
+        self.root = self.doc.createElement('div')
+        self.root.innerHTML = html
+
+    def test_all(self):
+        self.assertEqual(names(iter_descendants(self.root)),
+                         ['a', 't1', 'b', 't2', 'c', 's', 'i', 't3', 'e'])
+
+    def test_what_to_show(self):
+        self.assertEqual(
+            names(iter_descendants(self.root, NodeFilter.SHOW_ELEMENT)),
+            ['a', 'b', 's', 'i', 'e'])
+        self.assertEqual(
+            names(iter_descendants(
+                self.root, NodeFilter.SHOW_TEXT | NodeFilter.SHOW_COMMENT)),
+            ['t1', 't2', 'c', 't3'])
+
+    def test_filter(self):
+        self.assertEqual(
+            names(iter_descendants(self.root, node_filter=reject_b)),
+            ['a', 't1', 'c', 's', 'i', 't3', 'e'])
+
+        class Filter:
+            def acceptNode(self, node):
+                return node.nodeType == node.TEXT_NODE
+
+        self.assertEqual(
+            names(iter_descendants(self.root, node_filter=Filter())),
+            ['t1', 't2', 't3'])
+        with self.assertRaises(TypeError):
+            iter_descendants(self.root, node_filter=1)
+
+    def test_lazy(self):
+        visited = []
+
+        def accept(node):
+            visited.append(node)
+            return True
+
+        it = iter_descendants(self.root, node_filter=accept)
+        self.assertEqual(visited, [])
+        self.assertEqual(name(next(it)), 'a')
+        self.assertEqual(names(visited), ['a'])
+
+    def test_deep_tree(self):
+        node = self.root
+        for _ in range(5000):
+            node = node.appendChild(self.doc.createElement('div'))
+        node.appendChild(Text('deep'))
+        self.assertTrue(self.root.textContent.endswith('deep'))
+        self.assertEqual(len(self.root.getElementsBy(lambda e: True)), 5005)
+
+
+class TestNodeIterator(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.doc = Document()
+        self.root = self.doc.createElement('div')
+        self.root.innerHTML = html
+
+    def test_create(self):
+        it = self.doc.createNodeIterator(self.root, NodeFilter.SHOW_ELEMENT)
+        self.assertIsInstance(it, NodeIterator)
+        self.assertIs(it.root, self.root)
+        self.assertIs(it.referenceNode, self.root)
+        self.assertTrue(it.pointerBeforeReferenceNode)
+        self.assertEqual(it.whatToShow, NodeFilter.SHOW_ELEMENT)
+        self.assertIsNone(it.filter)
+
+    def test_next_previous(self):
+        it = self.doc.createNodeIterator(self.root, NodeFilter.SHOW_ELEMENT)
+        self.assertIs(it.nextNode(), self.root)
+        self.assertEqual(name(it.nextNode()), 'a')
+        self.assertEqual(name(it.nextNode()), 'b')
+        self.assertFalse(it.pointerBeforeReferenceNode)
+        self.assertEqual(name(it.previousNode()), 'b')
+        self.assertTrue(it.pointerBeforeReferenceNode)
+        self.assertEqual(name(it.previousNode()), 'a')
+        self.assertIs(it.previousNode(), self.root)
+        self.assertIsNone(it.previousNode())
+
+    def test_iter(self):
+        it = self.doc.createNodeIterator(self.root, NodeFilter.SHOW_TEXT)
+        self.assertEqual(names(it), ['t1', 't2', 't3'])
+        self.assertIsNone(it.nextNode())
+        self.assertEqual(name(it.previousNode()), 't3')
+
+    def test_reject(self):
+        # FILTER_REJECT does not skip children for NodeIterator
+        it = self.doc.createNodeIterator(self.root, filter=reject_b)
+        self.assertEqual(names(it)[1:],
+                         ['a', 't1', 't2', 'c', 's', 'i', 't3', 'e'])
+
+    def test_remove_reference(self):
+        it = self.doc.createNodeIterator(self.root, NodeFilter.SHOW_ELEMENT)
+        for _ in range(3):
+            it.nextNode()
+        self.assertEqual(name(it.referenceNode), 'b')
+        # remove ancestor of the reference node
+        self.root.removeChild(self.root.firstChild)
+        self.assertIs(it.referenceNode, self.root)
+        self.assertEqual(names(it), ['s', 'i', 'e'])
+
+    def test_remove_reference_before(self):
+        it = self.doc.createNodeIterator(self.root, NodeFilter.SHOW_ELEMENT)
+        for _ in range(4):
+            it.nextNode()
+        it.previousNode()
+        self.assertEqual(name(it.referenceNode), 's')
+        self.assertTrue(it.pointerBeforeReferenceNode)
+        self.root.removeChild(self.root.querySelector('#s'))
+        self.assertEqual(name(it.referenceNode), 'e')
+        self.assertEqual(names(it), ['e'])
+
+    def test_remove_other(self):
+        it = self.doc.createNodeIterator(self.root, NodeFilter.SHOW_ELEMENT)
+        it.nextNode()
+        it.nextNode()
+        self.root.removeChild(self.root.querySelector('#s'))
+        self.assertEqual(name(it.referenceNode), 'a')
+        self.assertEqual(names(it), ['b', 'e'])
+
+
+class TestTreeWalker(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.doc = Document()
+        self.root = self.doc.createElement('div')
+        self.root.innerHTML = html
+
+    def test_create(self):
+        walker = self.doc.createTreeWalker(self.root, NodeFilter.SHOW_ELEMENT)
+        self.assertIsInstance(walker, TreeWalker)
+        self.assertIs(walker.root, self.root)
+        self.assertIs(walker.currentNode, self.root)
+
+    def test_next_previous(self):
+        walker = self.doc.createTreeWalker(self.root)
+        result = []
+        while walker.nextNode():
+            result.append(name(walker.currentNode))
+        self.assertEqual(result,
+                         ['a', 't1', 'b', 't2', 'c', 's', 'i', 't3', 'e'])
+        result = []
+        while walker.previousNode():
+            result.append(name(walker.currentNode))
+        self.assertEqual(result[:-1],
+                         ['t3', 'i', 's', 'c', 't2', 'b', 't1', 'a'])
+        self.assertIs(walker.currentNode, self.root)
+
+    def test_what_to_show(self):
+        walker = self.doc.createTreeWalker(self.root, NodeFilter.SHOW_TEXT)
+        self.assertEqual(name(walker.nextNode()), 't1')
+        self.assertEqual(name(walker.nextNode()), 't2')
+        self.assertEqual(name(walker.previousNode()), 't1')
+        self.assertIsNone(walker.previousNode())
+        self.assertEqual(name(walker.currentNode), 't1')
+
+    def test_reject(self):
+        walker = self.doc.createTreeWalker(self.root, filter=reject_b)
+        result = []
+        while walker.nextNode():
+            result.append(name(walker.currentNode))
+        self.assertEqual(result, ['a', 't1', 'c', 's', 'i', 't3', 'e'])
+        result = []
+        while walker.previousNode():
+            result.append(name(walker.currentNode))
+        self.assertEqual(result[:-1], ['t3', 'i', 's', 'c', 't1', 'a'])
+
+    def test_children(self):
+        walker = self.doc.createTreeWalker(self.root, NodeFilter.SHOW_ELEMENT)
+        self.assertEqual(name(walker.firstChild()), 'a')
+        self.assertEqual(name(walker.firstChild()), 'b')
+        self.assertIsNone(walker.firstChild())
+        self.assertEqual(name(walker.parentNode()), 'a')
+        self.assertIs(walker.parentNode(), self.root)
+        self.assertIs(walker.currentNode, self.root)
+        self.assertIsNone(walker.parentNode())
+        self.assertEqual(name(walker.lastChild()), 'e')
+
+    def test_siblings(self):
+        walker = self.doc.createTreeWalker(self.root, NodeFilter.SHOW_ELEMENT)
+        self.assertIsNone(walker.nextSibling())
+        walker.firstChild()
+        self.assertEqual(name(walker.nextSibling()), 's')
+        self.assertEqual(name(walker.nextSibling()), 'e')
+        self.assertIsNone(walker.nextSibling())
+        self.assertEqual(name(walker.previousSibling()), 's')
+        self.assertEqual(name(walker.previousSibling()), 'a')
+        self.assertIsNone(walker.previousSibling())
+
+    def test_skip(self):
+        # children of skipped nodes are visited as children/siblings
+        def skip_span(node):
+            if node.localName == 'span':
+                return NodeFilter.FILTER_SKIP
+            return NodeFilter.FILTER_ACCEPT
+
+        walker = self.doc.createTreeWalker(
+            self.root, NodeFilter.SHOW_ELEMENT, skip_span)
+        walker.firstChild()
+        self.assertEqual(name(walker.nextSibling()), 'i')
+        self.assertEqual(name(walker.nextSibling()), 'e')
+        self.assertEqual(name(walker.previousSibling()), 'i')
+        self.assertIs(walker.parentNode(), self.root)
+        walker.currentNode = self.root
+        self.assertEqual(name(walker.lastChild()), 'e')
+
+    def test_current_node(self):
+        walker = self.doc.createTreeWalker(self.root, NodeFilter.SHOW_ELEMENT)
+        walker.currentNode = self.root.querySelector('#i')
+        self.assertEqual(name(walker.nextNode()), 'e')
+        self.assertIsNone(walker.nextNode())
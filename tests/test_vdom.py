@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from random import Random
+from unittest.mock import MagicMock
+
+from wdom.document import set_app
+from wdom.server import _tornado
+from wdom.tag import Li
+from wdom.vdom import Component, VNode
+
+from .base import TestCase
+
+
+class ListComponent(Component):
+    tag = 'ul'
+
+    def __init__(self, items, **kwargs):
+        super().__init__(**kwargs)
+        self.items = items
+        self.keyed = True
+
+    def render(self):
+        return [VNode('li', str(item), key=item if self.keyed else None,
+                      class_='item')
+                for item in self.items]
+
+
+def expected_html(items):
+    return '<ul>{}</ul>'.format(''.join(
+        '<li class="item">{}</li>'.format(i) for i in items))
+
+
+class TestVNode(TestCase):
+    def test_init(self):
+        vnode = VNode('a', 'text', VNode('b'), key=1, class_='c', is_='d')
+        self.assertEqual(vnode.tag, 'a')
+        self.assertEqual(vnode.key, 1)
+        self.assertEqual(vnode.attrs, {'class': 'c', 'is': 'd'})
+        self.assertEqual(len(vnode.children), 2)
+        self.assertIsNone(vnode.children[0].tag)
+        self.assertEqual(vnode.children[0].text, 'text')
+        self.assertEqual(vnode.children[1].tag, 'b')
+
+    def test_flatten_children(self):
+        vnode = VNode('a', ['1', ['2', None]], 3)
+        self.assertEqual([c.text for c in vnode.children], ['1', '2', '3'])
+
+
+class TestComponent(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.comp = ListComponent([1, 2, 3])
+        self.comp.update()
+
+    def test_render(self):
+        self.assertEqual(self.comp.html_noid, expected_html([1, 2, 3]))
+        self.comp.items = []
+        self.comp.update()
+        self.assertEqual(self.comp.html_noid, '<ul></ul>')
+
+    def test_render_text(self):
+        class TextComponent(Component):
+            text = 'a'
+
+            def render(self):
+                return self.text
+
+        comp = TextComponent()
+        comp.update()
+        self.assertEqual(comp.html_noid, '<tag>a</tag>')
+        comp.text = '<b>'
+        comp.update()
+        self.assertEqual(comp.html_noid, '<tag>&lt;b&gt;</tag>')
+        self.assertEqual(len(comp.childNodes), 1)
+
+    def test_render_class(self):
+        comp = ListComponent([])
+        comp.render = lambda: VNode(Li, 'a', class_='b')
+        comp.update()
+        self.assertIsInstance(comp.firstChild, Li)
+        self.assertEqual(comp.html_noid, '<ul><li class="b">a</li></ul>')
+
+    def test_keep_nodes(self):
+        nodes = {n.textContent: n for n in self.comp.childNodes}
+        self.comp.items = [3, 4, 1]
+        self.comp.update()
+        self.assertEqual(self.comp.html_noid, expected_html([3, 4, 1]))
+        self.assertIs(self.comp.childNodes[0], nodes['3'])
+        self.assertIs(self.comp.childNodes[2], nodes['1'])
+
+    def test_unkeyed(self):
+        self.comp.keyed = False
+        self.comp.update()
+        first = self.comp.firstChild
+        self.comp.items = [2, 3]
+        self.comp.update()
+        self.assertEqual(self.comp.html_noid, expected_html([2, 3]))
+        # matched by order (text is replaced)
+        self.assertIs(self.comp.firstChild, first)
+
+    def test_random(self):
+        random = Random(0)
+        for _ in range(100):
+            self.comp.items = random.sample(range(20), random.randint(0, 20))
+            self.comp.keyed = random.random() < 0.8
+            self.comp.update()
+            self.assertEqual(self.comp.html_noid,
+                             expected_html(self.comp.items))
+
+
+class TestComponentMessage(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.conn_mock = MagicMock()
+        _tornado.connections.append(self.conn_mock)
+        self.comp = ListComponent(list(range(5)))
+        set_app(self.comp)
+        self.conn_mock.reset_mock()
+        self.comp.update()
+
+    def tearDown(self):
+        _tornado.connections.remove(self.conn_mock)
+        super().tearDown()
+
+    def messages(self):
+        return [(msg['method'], list(msg['params'])) for (msg, ), _
+                in self.conn_mock.queue.push.call_args_list]
+
+    def test_initial_render(self):
+        self.assertEqual(self.messages(), [
+            ('insertAdjacentHTML', ['beforeend', self.comp.innerHTML]),
+        ])
+
+    def test_no_change(self):
+        self.conn_mock.reset_mock()
+        self.comp.update()
+        self.assertEqual(self.messages(), [])
+
+    def test_text(self):
+        self.conn_mock.reset_mock()
+        li = self.comp.firstChild
+        self.comp.render = lambda: VNode('li', 'a', key=0, class_='item')
+        self.comp.update()
+        self.assertIs(self.comp.firstChild, li)
+        self.assertEqual(li.textContent, 'a')
+        self.assertEqual(self.messages()[-1], ('textContent', ['a']))
+
+    def test_attributes(self):
+        self.comp.render = lambda: VNode('li', '0', key=0, class_='a b')
+        self.comp.update()
+        self.conn_mock.reset_mock()
+        self.comp.render = lambda: VNode('li', '0', key=0, class_='b c', x='1')
+        self.comp.update()
+        self.assertEqual(self.messages(), [
+            ('setAttribute', ['x', '1']),
+            ('removeClass', [['a']]),
+            ('addClass', [['c']]),
+        ])
+        self.conn_mock.reset_mock()
+        self.comp.render = lambda: VNode('li', '0', key=0)
+        self.comp.update()
+        self.assertEqual(self.messages(), [
+            ('removeAttribute', ['x']),
+            ('removeClass', [['b', 'c']]),
+        ])
+
+    def test_reorder(self):
+        self.conn_mock.reset_mock()
+        self.comp.items = [4, 0, 1, 2, 3]
+        self.comp.update()
+        self.assertEqual(self.comp.html_noid, expected_html(self.comp.items))
+        # move only one node, without html
+        self.assertEqual(self.messages(), [
+            ('moveChildById', [self.comp.firstChild.wdom_id, 0]),
+        ])
+
+    def test_insert_remove(self):
+        self.conn_mock.reset_mock()
+        self.comp.items = [0, 5, 6, 2, 3, 4]
+        self.comp.update()
+        self.assertEqual(self.comp.html_noid, expected_html(self.comp.items))
+        new_html = self.comp.childNodes[1].html + self.comp.childNodes[2].html
+        self.assertEqual([m[0] for m in self.messages()],
+                         ['removeChildById', 'insertAdjacentHTML'])
+        self.assertEqual(self.messages()[1][1], ['beforebegin', new_html])
+
+    def test_shuffle(self):
+        self.comp.items = list(range(40))
+        self.comp.update()
+        nodes = list(self.comp.childNodes)
+        self.conn_mock.reset_mock()
+        self.comp.items = list(reversed(range(40)))
+        self.comp.update()
+        self.assertEqual(self.comp.html_noid, expected_html(self.comp.items))
+        # re-insert all instead of moving each node
+        self.assertEqual(self.messages(), [
+            ('empty', []),
+            ('insertAdjacentHTML', ['beforeend', self.comp.innerHTML]),
+        ])
+        self.assertEqual(list(self.comp.childNodes), nodes[::-1])
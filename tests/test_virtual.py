@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from unittest.mock import MagicMock
+
+from wdom.document import set_app
+from wdom.event import create_event, Event
+from wdom.server import _tornado
+from wdom.tag import Div, Tr
+from wdom.virtual import VirtualList, VirtualTable
+
+from .base import TestCase
+
+
+def scroll_event(node, top, height=100):
+    return Event('scroll', {
+        'currentTarget': {'id': node.wdom_id, 'scrollTop': top,
+                          'clientHeight': height},
+        'target': {'id': node.wdom_id},
+    })
+
+
+def scroll(node, top, height=100):
+    e = scroll_event(node, top, height)
+    node.on_event_pre(e)
+    node.dispatchEvent(e)
+
+
+class TestVirtualList(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.data = list(range(1000))
+        self.vlist = VirtualList(self.data, row_height=10,
+                                 viewport_height=100, overscan=5)
+
+    def texts(self):
+        return [row.textContent for row in self.vlist.rows]
+
+    def test_initial(self):
+        self.assertEqual(self.vlist.window, (0, 16))
+        self.assertEqual(self.texts(), [str(i) for i in range(16)])
+        # two spacers and rows
+        self.assertEqual(self.vlist.length, 18)
+        self.assertEqual(self.vlist.lastChild.style['height'], '9840px')
+        self.assertEqual(self.vlist.style['overflow-y'], 'auto')
+        self.assertEqual(self.vlist.style['height'], '100px')
+
+    def test_scroll(self):
+        rows = set(self.vlist.rows)
+        scroll(self.vlist, 500)
+        self.assertEqual(self.vlist.window, (45, 66))
+        self.assertEqual(self.texts(), [str(i) for i in range(45, 66)])
+        self.assertEqual(self.vlist.firstChild.style['height'], '450px')
+        self.assertEqual(self.vlist.lastChild.style['height'], '9340px')
+        # all rows are recycled
+        self.assertTrue(rows <= set(self.vlist.rows))
+        self.assertEqual(self.vlist.length, 23)
+
+    def test_scroll_keep_rows(self):
+        scroll(self.vlist, 500)
+        rows = self.vlist.rows
+        scroll(self.vlist, 520)
+        self.assertEqual(self.vlist.window, (47, 68))
+        self.assertEqual(self.texts(), [str(i) for i in range(47, 68)])
+        self.assertEqual(self.vlist.rows[:-2], rows[2:])
+        self.assertEqual(set(self.vlist.rows), set(rows))
+        scroll(self.vlist, 480)
+        self.assertEqual(self.texts(), [str(i) for i in range(43, 64)])
+        self.assertEqual(set(self.vlist.rows), set(rows))
+
+    def test_scroll_end(self):
+        scroll(self.vlist, 9900)
+        self.assertEqual(self.vlist.window, (985, 1000))
+        self.assertEqual(self.vlist.lastChild.style['height'], '0px')
+        self.assertEqual(self.vlist.childNodes[-2].textContent, '999')
+
+    def test_resize(self):
+        scroll(self.vlist, 0, 200)
+        self.assertEqual(self.vlist.window, (0, 26))
+
+    def test_refresh(self):
+        self.data[1] = 'a'
+        self.vlist.refresh()
+        self.assertEqual(self.texts()[1], 'a')
+
+    def test_set_data(self):
+        scroll(self.vlist, 500)
+        self.vlist.data = ['a', 'b']
+        self.assertEqual(self.vlist.window, (0, 2))
+        self.assertEqual(self.texts(), ['a', 'b'])
+        self.vlist.data = []
+        self.assertEqual(self.vlist.window, (0, 0))
+        self.assertEqual(self.vlist.length, 2)
+
+    def test_render_row(self):
+        class MyList(VirtualList):
+            row_class = Tr
+
+            def render_row(self, row, item, index):
+                row.textContent = '{}: {}'.format(index, item)
+
+        vlist = MyList(['a', 'b'])
+        self.assertIsInstance(vlist.rows[0], Tr)
+        self.assertEqual(vlist.rows[1].textContent, '1: b')
+
+
+class TestVirtualTable(TestCase):
+    def test_table(self):
+        data = [(i, i * 2) for i in range(100)]
+        table = VirtualTable(data, header=['a', 'b'], row_height=10,
+                             viewport_height=20, overscan=1)
+        self.assertEqual(
+            table.html_noid,
+            '<div style="overflow-y: auto; height: 20px;"><table>'
+            '<thead><tr><th>a</th><th>b</th></tr></thead><tbody>'
+            '<tr style="height: 0px;"></tr>'
+            '<tr style="height: 10px;"><td>0</td><td>0</td></tr>'
+            '<tr style="height: 10px;"><td>1</td><td>2</td></tr>'
+            '<tr style="height: 10px;"><td>2</td><td>4</td></tr>'
+            '<tr style="height: 10px;"><td>3</td><td>6</td></tr>'
+            '<tr style="height: 960px;"></tr>'
+            '</tbody></table></div>'
+        )
+        table.data = [(1, ), (2, 3, 4)]
+        self.assertEqual(
+            [[c.textContent for c in row.childNodes] for row in table.rows],
+            [['1'], ['2', '3', '4']],
+        )
+
+
+class TestVirtualListMessage(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.conn_mock = MagicMock()
+        _tornado.connections.append(self.conn_mock)
+        self.root = Div()
+        set_app(self.root)
+        self.vlist = VirtualList(range(100000), row_height=10,
+                                 viewport_height=100, overscan=5)
+        self.root.appendChild(self.vlist)
+        self.conn_mock.reset_mock()
+
+    def tearDown(self):
+        _tornado.connections.remove(self.conn_mock)
+        super().tearDown()
+
+    def messages(self):
+        return [(msg['method'], list(msg['params'])) for (msg, ), _
+                in self.conn_mock.queue.push.call_args_list]
+
+    def test_scroll(self):
+        scroll(self.vlist, 500)
+        rows = self.vlist.rows
+        self.conn_mock.reset_mock()
+        scroll(self.vlist, 520)
+        # two rows are recycled and sent as a single html
+        self.assertEqual(set(self.vlist.rows[-2:]), set(rows[:2]))
+        html = ''.join(row.html for row in self.vlist.rows[-2:])
+        self.assertEqual(self.messages(), [
+            ('setAttribute', ['style', 'height: 470px;']),
+            ('setAttribute', ['style', 'height: 999320px;']),
+            ('removeChildById', [rows[1].wdom_id]),
+            ('removeChildById', [rows[0].wdom_id]),
+            ('insertAdjacentHTML', ['beforebegin', html]),
+        ])
+
+    def test_scroll_traffic(self):
+        # number of messages does not depend on the position
+        counts = []
+        for top in (1000, 10000, 100000, 900000):
+            scroll(self.vlist, top)
+            self.conn_mock.reset_mock()
+            scroll(self.vlist, top + 30)
+            counts.append(len(self.messages()))
+        self.assertEqual(counts, [6] * 4)
+        self.assertEqual(self.vlist.length, 23)
+
+    def test_scroll_throttle(self):
+        mount = create_event(
+            {'type': 'mount', 'currentTarget': {'id': self.vlist.wdom_id}})
+        self.vlist.dispatchEvent(mount)
+        self.assertIn(('addEventListener', ['scroll', {'throttle': 50}]),
+                      self.messages())
+
+    def test_no_change(self):
+        scroll(self.vlist, 5)
+        self.assertEqual(self.messages(), [])
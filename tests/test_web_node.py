@@ -5,7 +5,7 @@ from unittest.mock import MagicMock, call
 
 from syncer import sync
 
-from wdom.document import set_app
+from wdom.document import get_document, set_app
 from wdom.event import create_event
 from wdom.node import Text
 from wdom.server import _tornado
@@ -484,6 +484,69 @@ class TestEventMessage(TestCase):
         self.elm.dispatchEvent(self.event)
         self.mock.assert_not_called()
 
+    def test_listener_options(self):
+        mock = MagicMock(_is_coroutine=False)
+        self.elm.addEventListener('scroll', mock, throttle=0.1, passive=True)
+        self.elm.js_exec.assert_called_with(
+            'addEventListener', 'scroll', {'throttle': 100, 'passive': True})
+        self.elm.addEventListener('scroll', self.mock, debounce=0.5)
+        self.elm.js_exec.assert_called_with(
+            'addEventListener', 'scroll', {'throttle': 100})
+        # options of the rest are sent
+        self.elm.removeEventListener('scroll', mock)
+        self.elm.js_exec.assert_called_with(
+            'addEventListener', 'scroll', {'debounce': 500})
+        self.elm.removeEventListener('scroll', self.mock)
+        self.elm.js_exec.assert_called_with('removeEventListener', 'scroll')
+
+    def test_remove_listener_without_options(self):
+        mock = MagicMock(_is_coroutine=False)
+        self.elm.addEventListener('scroll', mock)
+        self.elm.addEventListener('scroll', self.mock, throttle=0.1)
+        self.elm.js_exec.assert_called_with('addEventListener', 'scroll')
+        # the rest is throttled now
+        self.elm.removeEventListener('scroll', mock)
+        self.elm.js_exec.assert_called_with(
+            'addEventListener', 'scroll', {'throttle': 100})
+
+    def test_listener_fields(self):
+        self.elm.addEventListener('mousemove', self.mock, fields=['clientX'])
+        self.elm.js_exec.assert_called_with(
+            'addEventListener', 'mousemove', {'fields': ['clientX']})
+        self.elm.addEventListener('mousemove', self.mock,
+                                  fields=['clientY', 'clientX'])
+        self.elm.js_exec.assert_called_with(
+            'addEventListener', 'mousemove',
+            {'fields': ['clientX', 'clientY']})
+
+    def test_mount_options(self):
+        self.elm.addEventListener('input', self.mock, debounce=0.2)
+        self.elm.js_exec.reset_mock()
+        mount = create_event(
+            {'type': 'mount', 'currentTarget': {'id': self.elm.wdom_id}})
+        self.elm.dispatchEvent(mount)
+        self.elm.js_exec.assert_has_calls([
+            call('addEventListener', 'click'),
+            call('addEventListener', 'input', {'debounce': 200}),
+        ])
+
+    def test_mount(self):
+        self.elm.js_exec.reset_mock()
+        mount = create_event(
+            {'type': 'mount', 'currentTarget': {'id': self.elm.wdom_id}})
+        self.elm.dispatchEvent(mount)
+        # listeners are added on browser without ``mount`` listener
+        self.elm.js_exec.assert_called_once_with('addEventListener', 'click')
+        self.assertNotIn('mount', self.elm._event_listeners)
+
+    def test_lazy_init(self):
+        elm = WdomElement('tag', parent=self.elm)
+        self.assertRegex(elm.html, r'<tag wdom_id="\d+"></tag>')
+        self.assertIsNone(elm._event_listeners)
+        self.assertIsNone(elm._attributes)
+        self.assertIsNone(elm._class_list)
+        self.assertIsNone(elm._HTMLElement__style)
+
 
 class TestQuery(TestCase):
     def setUp(self):
@@ -518,3 +581,179 @@ class TestQuery(TestCase):
         self.elm.on_response(self.msg)
         x = await fut
         self.assertEqual(x, {'x': 1})
+
+
+class TestBatch(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.conn_mock = MagicMock()
+        _tornado.connections.append(self.conn_mock)
+        self.elm = WdomElement('tag')
+        set_app(self.elm)
+        self.c1 = WdomElement('c1', parent=self.elm)
+        self.c2 = WdomElement('c2', parent=self.elm)
+        self.conn_mock.reset_mock()
+
+    def tearDown(self):
+        _tornado.connections.remove(self.conn_mock)
+        super().tearDown()
+
+    def messages(self):
+        return [(msg['id'], msg['method'], list(msg['params']))
+                for (msg, ), _ in self.conn_mock.queue.push.call_args_list]
+
+    def test_append(self):
+        with self.elm.batch():
+            rows = [WdomElement('row', parent=self.elm) for _ in range(3)]
+            for row in rows:
+                row.appendChild(WdomElement('cell'))
+                row.setAttribute('a', 'b')
+        html = ''.join(row.html for row in rows)
+        self.assertEqual(self.messages(), [
+            (self.elm.wdom_id, 'insertAdjacentHTML', ['beforeend', html]),
+        ])
+
+    def test_append_remove(self):
+        with self.elm.batch():
+            c3 = WdomElement('c3', parent=self.elm)
+            c3.setAttribute('a', 'b')
+            self.elm.removeChild(c3)
+        self.assertEqual(self.messages(), [])
+
+    def test_attribute(self):
+        with self.elm.batch():
+            c3 = WdomElement('c3', parent=self.elm)
+            self.c1.setAttribute('a', 'b')
+            c3.setAttribute('a', 'b')
+        self.assertEqual(self.messages(), [
+            (self.c1.wdom_id, 'setAttribute', ['a', 'b']),
+            (self.elm.wdom_id, 'insertAdjacentHTML', ['beforeend', c3.html]),
+        ])
+
+    def test_remove_insert(self):
+        with self.elm.batch():
+            self.c1.remove()
+            c3 = WdomElement('c3')
+            self.elm.insertBefore(c3, self.c2)
+            c4 = WdomElement('c4')
+            self.elm.insertBefore(c4, self.c2)
+        self.assertEqual(self.messages(), [
+            (self.elm.wdom_id, 'removeChildById', [self.c1.wdom_id]),
+            (self.c2.wdom_id, 'insertAdjacentHTML',
+             ['beforebegin', c3.html + c4.html]),
+        ])
+
+    def test_move(self):
+        with self.elm.batch():
+            self.c2.appendChild(self.c1)
+            c3 = WdomElement('c3', parent=self.c1)
+        self.assertEqual(self.messages(), [
+            (self.c2.wdom_id, 'moveChildById', [self.c1.wdom_id, None]),
+            (self.c1.wdom_id, 'insertAdjacentHTML', ['beforeend', c3.html]),
+        ])
+
+    def test_reorder(self):
+        c3 = WdomElement('c3', parent=self.elm)
+        c4 = WdomElement('c4', parent=self.elm)
+        self.conn_mock.reset_mock()
+        with self.elm.batch():
+            self.elm.insertBefore(c4, self.c1)
+            c5 = WdomElement('c5')
+            self.elm.insertBefore(c5, c3)
+            self.elm.insertBefore(self.c2, self.c1)
+        # c1 and c3 are not moved
+        self.assertEqual(list(self.elm.childNodes),
+                         [c4, self.c2, self.c1, c5, c3])
+        self.assertEqual(self.messages(), [
+            (c3.wdom_id, 'insertAdjacentHTML', ['beforebegin', c5.html]),
+            (self.elm.wdom_id, 'moveChildById', [self.c2.wdom_id, 0]),
+            (self.elm.wdom_id, 'moveChildById', [c4.wdom_id, 0]),
+        ])
+
+    def test_remove_and_insert(self):
+        # removed node may be changed without messages, so sent as html
+        with self.elm.batch():
+            self.c1.remove()
+            self.c1.setAttribute('a', 'b')
+            self.elm.appendChild(self.c1)
+        self.assertEqual(self.messages(), [
+            (self.elm.wdom_id, 'removeChildById', [self.c1.wdom_id]),
+            (self.elm.wdom_id, 'insertAdjacentHTML',
+             ['beforeend', self.c1.html]),
+        ])
+        self.assertIn('a="b"', self.c1.html)
+
+    def test_message_order(self):
+        with self.elm.batch():
+            self.c1.click()
+            c3 = WdomElement('c3', parent=self.elm)
+            c3.setAttribute('a', 'b')
+            html = c3.html
+            # c3 is sent before the query
+            c3.js_query('getBoundingClientRect')
+            c3.setAttribute('c', 'd')
+            self.c2.remove()
+            self.c1.click()
+        self.assertEqual(self.messages(), [
+            (self.c1.wdom_id, 'click', []),
+            (self.elm.wdom_id, 'insertAdjacentHTML', ['beforeend', html]),
+            (c3.wdom_id, 'getBoundingClientRect', [0]),
+            (c3.wdom_id, 'setAttribute', ['c', 'd']),
+            (self.elm.wdom_id, 'removeChildById', [self.c2.wdom_id]),
+            (self.c1.wdom_id, 'click', []),
+        ])
+
+    def test_move_without_batch(self):
+        self.c2.appendChild(self.c1)
+        self.elm.insertBefore(self.c1, self.c2)
+        self.assertEqual(self.messages(), [
+            (self.c2.wdom_id, 'moveChildById', [self.c1.wdom_id, None]),
+            (self.elm.wdom_id, 'moveChildById', [self.c1.wdom_id, 0]),
+        ])
+        self.assertEqual(list(self.elm.childNodes), [self.c1, self.c2])
+
+    def test_empty(self):
+        with self.elm.batch():
+            self.elm.textContent = 'text'
+        self.assertEqual(self.messages(), [
+            (self.elm.wdom_id, 'empty', []),
+            (self.elm.wdom_id, 'insertAdjacentHTML', ['beforeend', 'text']),
+        ])
+
+    def test_text_node(self):
+        t1 = Text('t1')
+        t2 = Text('t2')
+        self.elm.prepend(t1)
+        self.elm.append(t2)
+        self.conn_mock.reset_mock()
+        with self.elm.batch():
+            c3 = WdomElement('c3')
+            self.elm.insertBefore(c3, t2)
+            self.elm.removeChild(t1)
+        self.assertEqual(self.messages(), [
+            (self.elm.wdom_id, 'removeChildByIndex', [0]),
+            (self.elm.wdom_id, 'insert', [2, c3.html]),
+        ])
+
+    def test_nested(self):
+        with self.elm.batch():
+            c3 = WdomElement('c3', parent=self.elm)
+            with get_document().batch():
+                c4 = WdomElement('c4', parent=self.elm)
+            self.assertEqual(self.messages(), [])
+        self.assertEqual(self.messages(), [
+            (self.elm.wdom_id, 'insertAdjacentHTML',
+             ['beforeend', c3.html + c4.html]),
+        ])
+
+    def test_exception(self):
+        with self.assertRaises(ValueError):
+            with self.elm.batch():
+                c3 = WdomElement('c3', parent=self.elm)
+                raise ValueError
+        self.assertEqual(self.messages(), [
+            (self.elm.wdom_id, 'insertAdjacentHTML', ['beforeend', c3.html]),
+        ])
+        # not in batch after exception
+        self.c1.setAttribute('a', 'b')
+        self.assertEqual(len(self.messages()), 2)
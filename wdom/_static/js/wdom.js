@@ -20,7 +20,8 @@
   const element_with_value = ['INPUT', 'TEXTAREA', 'SELECT']
   const event_data_map = {
     'input': ['value'],
-    'change': ['checked', 'value']
+    'change': ['checked', 'value'],
+    'scroll': ['scrollTop', 'scrollLeft', 'clientHeight', 'clientWidth'],
   }
 
   function get_log_level(level) {
@@ -48,14 +49,67 @@
     }
   }
 
+  // wdom_id -> element, kept up to date by the mutation observer.
+  // Lookup by a selector scans the whole document for each message.
+  const nodes = new Map()
+  // wdom_id -> messages which arrived before the node was mounted
+  const pending_nodes = new Map()
+  let observer = null
+
   function get_node(id) {
     if (id === 'window') {
       return window
     } else if (id === 'document') {
       return document
-    } else {
-      return document.querySelector(`[wdom_id="${id}"]`)
     }
+    const node = nodes.get(id)
+    if (node !== undefined || observer === null) { return node }
+    // node inserted by a message in the same frame is not registered yet
+    const records = observer.takeRecords()
+    if (records.length === 0) { return node }
+    records.forEach(mutation_handler)
+    return nodes.get(id)
+  }
+
+  function register_node(node) {
+    const id = node.getAttribute('wdom_id')
+    nodes.set(id, node)
+    const msgs = pending_nodes.get(id)
+    if (msgs !== undefined) {
+      pending_nodes.delete(id)
+      msgs.forEach(function(msg) { wdom.exec(node, msg.method, msg.params) })
+    }
+  }
+
+  function unregister_node(node) {
+    const id = node.getAttribute('wdom_id')
+    // the id may already be used by a new node which replaced this one
+    if (nodes.get(id) === node && !node.isConnected) { nodes.delete(id) }
+  }
+
+  function walk_wdom_nodes(node, func) {
+    // call func for the node and its descendants which have wdom_id
+    if (node.nodeType !== Node.ELEMENT_NODE) { return }
+    if (node.hasAttribute('wdom_id')) { func(node) }
+    const children = node.querySelectorAll('[wdom_id]')
+    for (let i = 0; i < children.length; i++) { func(children[i]) }
+  }
+
+  function wait_mount(msg) {
+    // keep message until the node is mounted
+    let msgs = pending_nodes.get(msg.id)
+    if (msgs === undefined) {
+      msgs = []
+      pending_nodes.set(msg.id, msgs)
+      setTimeout(function() {
+        if (pending_nodes.get(msg.id) !== msgs) { return }
+        // node not found. send warning.
+        pending_nodes.delete(msg.id)
+        wdom.log.console('warn', `got message to unknown node (id=${msg.id}).`)
+        wdom.log.warn(`unknown node: id=${msg.id}, method=${msg.method}`)
+      }, wdom.settings.PENDING_TIMEOUT)
+    }
+    msgs.push(msg)
   }
 
   function get_wdom_id(node) {
@@ -76,8 +130,8 @@
     if (!is_wdom_node(node)) { return }
     wdom.send_event({type: 'mount', target: node, currentTarget: node})
     if (element_with_value.indexOf(node.tagName) >= 0) {
-      node.addEventListener('input', wdom.send_event, false)
-      node.addEventListener('change', wdom.send_event, false)
+      node.addEventListener('input', send_value_event, false)
+      node.addEventListener('change', send_value_event, false)
     }
   }
 
@@ -88,23 +142,26 @@
 
   function mutation_handler(m) {
     let i, node
-    for (i=0; i < m.addedNodes.length; i++) {
-      node = m.addedNodes[i]
-      if (node && node.nodeType === Node.ELEMENT_NODE && node.hasAttribute('wdom_id')) {
-        node_mounted(node)
+    // removed first, since replaced nodes may have the same wdom_id
+    for (i=0; i < m.removedNodes.length; i++) {
+      node = m.removedNodes[i]
+      walk_wdom_nodes(node, unregister_node)
+      if (node.nodeType === Node.ELEMENT_NODE && node.hasAttribute('wdom_id')) {
+        node_unmounted(node)
       }
     }
-    for (i=0; i < m.removedNodes.length; i++) {
+    for (i=0; i < m.addedNodes.length; i++) {
       node = m.addedNodes[i]
-      if (node && node.nodeType === Node.ELEMENT_NODE && node.hasAttribute('wdom_id')) {
-        node_unmounted(node)
+      walk_wdom_nodes(node, register_node)
+      if (node.nodeType === Node.ELEMENT_NODE && node.hasAttribute('wdom_id')) {
+        node_mounted(node)
       }
     }
   }
 
   function start_observer() {
     // initialize observer
-    const observer = new MutationObserver(
+    observer = new MutationObserver(
       function(mutations) {
         mutations.forEach(mutation_handler)
       }
@@ -114,11 +171,14 @@
       'subtree': true,
     }
     observer.observe(document, obs_conf)
+    // nodes already in the page
+    walk_wdom_nodes(document.documentElement, register_node)
   }
 
   function ws_onopen() {
-    // Start msg sending loop
-    wdom.msg_loop()
+    // Start sending msgs
+    send_enabled = true
+    if (wdom.msg_queue.length > 0) { schedule_flush() }
     // Send pending events
     wdom.pending_msgs.forEach(function(msg) {
       wdom.push_msg(msg)
@@ -126,30 +186,180 @@
     wdom.pending_msgs = []
   }
 
+  /* Binary protocol decoder (see wdom/server/protocol.py) */
+  const JSON_PROTOCOL = 'wdom-json'
+  const BINARY_PROTOCOL = 'wdom-binary-1'
+  const BINARY_VERSION = 1
+  // must be same order as wdom.server.protocol.METHODS
+  const METHODS = [
+    'addEventListener', 'removeEventListener', 'insert', 'insertAdjacentHTML',
+    'textContent', 'innerHTML', 'outerHTML', 'removeChildById',
+    'removeChildByIndex', 'replaceChildById', 'replaceChildByIndex',
+    'removeAttribute', 'setAttribute', 'addClass', 'removeClass', 'empty',
+    'getBoundingClientRect', 'click', 'scroll', 'scrollTo', 'scrollBy',
+    'scrollX', 'scrollY', 'eval', 'reload', 'moveChildById',
+  ]
+  const SPECIAL_IDS = [null, 'document', 'window']
+
+  function decode_binary(buffer) {
+    const bytes = new Uint8Array(buffer)
+    const view = new DataView(buffer)
+    const decoder = new TextDecoder('utf-8')
+    let pos = 1
+
+    function read_varint() {
+      // do not use bitwise operators, which are limited to 32 bits
+      let n = 0, scale = 1, b
+      do {
+        b = bytes[pos++]
+        n += (b & 0x7f) * scale
+        scale *= 128
+      } while (b & 0x80)
+      return n
+    }
+
+    function read_string() {
+      const len = read_varint()
+      const s = decoder.decode(bytes.subarray(pos, pos + len))
+      pos += len
+      return s
+    }
+
+    function read_id() {
+      const n = read_varint()
+      if (n === 0) {
+        return read_string()
+      } else if (n < SPECIAL_IDS.length) {
+        return SPECIAL_IDS[n]
+      }
+      return String(n - SPECIAL_IDS.length)
+    }
+
+    function read_value() {
+      const tag = bytes[pos++]
+      let v, len, i
+      switch (tag) {
+        case 0: return null
+        case 1: return false
+        case 2: return true
+        case 3: return read_string()
+        case 4: return read_varint()
+        case 5: return -read_varint()
+        case 6:
+          v = view.getFloat64(pos, true)
+          pos += 8
+          return v
+        case 7:
+          len = read_varint()
+          v = []
+          for (i = 0; i < len; i++) { v.push(read_value()) }
+          return v
+        case 8: return JSON.parse(read_string())
+      }
+      throw new Error(`unknown value tag: ${tag}`)
+    }
+
+    if (bytes[0] !== BINARY_VERSION) {
+      throw new Error(`unsupported protocol version: ${bytes[0]}`)
+    }
+    const msgs = []
+    while (pos < bytes.length) {
+      const op = read_varint()
+      if (op === 0) {
+        msgs.push(JSON.parse(read_string()))
+        continue
+      }
+      const method = op === 1 ? read_string() : METHODS[op - 2]
+      const id = read_id()
+      const len = read_varint()
+      const params = []
+      for (let i = 0; i < len; i++) { params.push(read_value()) }
+      msgs.push({target: 'node', id: id, method: method, params: params})
+    }
+    return msgs
+  }
+
+  /* Messages are applied in animation frames, in the received order */
+  const recv_queue = []
+  let recv_head = 0  // index of the next message in recv_queue
+  let frame_requested = false
+  // ops: messages applied in the last frame, backlog: left for next frames.
+  // busy_*: frames and messages since the backlog started.
+  const frame_stats = {
+    frames: 0, ops: 0, max_ops: 0, backlog: 0, max_backlog: 0,
+    busy_frames: 0, busy_ops: 0,
+  }
+
+  function request_frame() {
+    if (frame_requested) { return }
+    frame_requested = true
+    // animation frames do not run in background tabs
+    if (document.hidden) {
+      setTimeout(apply_messages, 0)
+    } else {
+      requestAnimationFrame(apply_messages)
+    }
+  }
+
+  function apply_messages() {
+    frame_requested = false
+    const deadline = performance.now() + wdom.settings.FRAME_BUDGET
+    const start = recv_head
+    while (recv_head < recv_queue.length) {
+      const msg = recv_queue[recv_head]
+      recv_queue[recv_head++] = undefined
+      msg_to_node(msg)
+      if (performance.now() > deadline) { break }
+    }
+    update_frame_stats(recv_head - start)
+    if (recv_head < recv_queue.length) {
+      // out of budget, resume on the next frame
+      if (recv_head > 1024 && recv_head * 2 > recv_queue.length) {
+        recv_queue.splice(0, recv_head)
+        recv_head = 0
+      }
+      request_frame()
+    } else {
+      recv_queue.length = 0
+      recv_head = 0
+    }
+  }
+
+  function update_frame_stats(ops) {
+    const stats = frame_stats
+    stats.frames += 1
+    stats.ops = ops
+    stats.max_ops = Math.max(stats.max_ops, ops)
+    stats.backlog = recv_queue.length - recv_head
+    stats.max_backlog = Math.max(stats.max_backlog, stats.backlog)
+    stats.busy_frames += 1
+    stats.busy_ops += ops
+    if (stats.backlog > 0) {
+      wdom.log.console('debug', `applied ${ops} messages, ${stats.backlog} left`)
+      return
+    }
+    if (stats.busy_frames > 1) {
+      // report once when the backlog is cleared
+      wdom.log.debug(`applied ${stats.busy_ops} messages in ${stats.busy_frames} frames (max ${stats.max_ops} messages per frame, max backlog ${stats.max_backlog})`)
+    }
+    stats.busy_frames = 0
+    stats.busy_ops = 0
+  }
+
   function ws_onmessage(e) {
     const data = e.data
-    setTimeout(function() {
-      const msgs = JSON.parse(data)
-      msgs.forEach(msg_to_node)
-    }, 0)
+    const msgs = typeof data === 'string' ? JSON.parse(data) : decode_binary(data)
+    for (let i = 0; i < msgs.length; i++) { recv_queue.push(msgs[i]) }
+    request_frame()
   }
 
   function msg_to_node(msg) {
     const target = msg.target
     if (target === 'node') {
-      let node = get_node(msg.id)
+      const node = get_node(msg.id)
       if (!node) {
-        // node may not have been mounted yet. retry 100ms later.
-        setTimeout(function() {
-          let node = get_node(msg.id)
-            if (!node) {
-              // node not found. send warning.
-              wdom.log.console('warn', `gat message to unknown node (id=${msg.id}).\n Message: ${msg}`)
-              wdom.log.warn(`unknown node: id=${msg.id}, method=${msg.method}`)
-            } else {
-              wdom.exec(node, msg.method, msg.params)
-            }
-        }, 100)
+        // node may not have been mounted yet. run when mounted.
+        wait_mount(msg)
       } else {
         wdom.exec(node, msg.method, msg.params)
       }
@@ -201,6 +411,8 @@
     set_default('AUTORELOAD', false)
     set_default('RELOAD_WAIT', 100)
     set_default('MESSAGE_WAIT', 0.005)
+    set_default('PENDING_TIMEOUT', 1000)
+    set_default('FRAME_BUDGET', 8)
     set_default('LOG_LEVEL', 'WARN')
     set_default('LOG_PREFIX', 'wdom: ')
     set_default('LOG_CONSOLE', false)
@@ -208,21 +420,27 @@
     wdom.log.set_level(wdom.settings.LOG_LEVEL)
 
     // Make root WebScoket connection
-    wdom.ws = new WebSocket(wdom.settings.WS_URL)
+    // Server chooses binary or JSON protocol
+    const protocols = 'TextDecoder' in window ? [BINARY_PROTOCOL, JSON_PROTOCOL] : [JSON_PROTOCOL]
+    wdom.ws = new WebSocket(wdom.settings.WS_URL, protocols)
+    wdom.ws.binaryType = 'arraybuffer'
     wdom.ws.addEventListener('open', ws_onopen, false)
     wdom.ws.addEventListener('message', ws_onmessage, false)
     wdom.ws.addEventListener('close', ws_onclose, false)
 
+    walk_wdom_nodes(document.documentElement, register_node)
     node_mounted(document)
     node_mounted(window)
   }
 
   wdom.exec = function(node, method, params) {
     // Execute fucntion with msg
-    setTimeout(function() {
-      const args = [node].concat(params)
-      wdom[method].apply(wdom, args)
-    }, 0)
+    try {
+      wdom[method].apply(wdom, [node].concat(params))
+    } catch (e) {
+      wdom.log.error(e.toString())
+      wdom.log.console('error', e.toString())
+    }
   }
 
   wdom.eval = function(node, script) {
@@ -241,19 +459,45 @@
   wdom.pending_msgs = []
   wdom.msg_queue = []
 
-  wdom.push_msg = function(msg) {
-    wdom.msg_queue.push(msg)
+  // Events which only the latest one per target is sent in a flush
+  const coalesced_events = ['mousemove', 'pointermove', 'touchmove', 'scroll', 'input', 'wheel', 'dragover']
+  // `${wdom_id} ${event type}` -> index of the event msg in msg_queue
+  const coalesced_index = new Map()
+  let send_enabled = false
+  let flush_timer = null
+
+  function coalesce_key(msg) {
+    if (msg.type !== 'event' || coalesced_events.indexOf(msg.event.type) < 0) {
+      return null
+    }
+    return `${msg.id} ${msg.event.type}`
   }
 
-  wdom.msg_loop = function() {
-    setTimeout(function() {
-      if (wdom.msg_queue.length > 0) {
-        const msg = JSON.stringify(wdom.msg_queue)
-        wdom.msg_queue.length = 0
-        wdom.send(msg)
-      }
-      wdom.msg_loop()
-    }, wdom.settings.MESSAGE_WAIT)
+  function schedule_flush() {
+    // MESSAGE_WAIT is in seconds, like the server option
+    if (flush_timer === null) {
+      flush_timer = setTimeout(flush_msgs, wdom.settings.MESSAGE_WAIT * 1000)
+    }
+  }
+
+  function flush_msgs() {
+    flush_timer = null
+    coalesced_index.clear()
+    const msgs = wdom.msg_queue.filter(function(msg) { return msg !== null })
+    wdom.msg_queue.length = 0
+    if (msgs.length > 0) { wdom.send(JSON.stringify(msgs)) }
+  }
+
+  wdom.push_msg = function(msg) {
+    const key = coalesce_key(msg)
+    if (key !== null) {
+      // drop the older one, but keep the order with other msgs
+      const index = coalesced_index.get(key)
+      if (index !== undefined) { wdom.msg_queue[index] = null }
+      coalesced_index.set(key, wdom.msg_queue.length)
+    }
+    wdom.msg_queue.push(msg)
+    if (send_enabled) { schedule_flush() }
   }
 
   wdom.send = function(msg, retry) {
@@ -296,18 +540,21 @@
       'repeat', 'shiftKey'],
   }
   let _data_transfer_id = 1
-  wdom.send_event = function(e) {
+  function event_message(e, fields) {
     // Catch currentTarget here. In callback, it becomes different node or null,
     // since event bubbles up.
+    // fields: Set of attributes required by the server, or all if undefined
     const currentTarget = e.currentTarget
     const target = e.target
-    if (!is_wdom_node(currentTarget)) { return }
+    if (!is_wdom_node(currentTarget)) { return null }
 
     // define func here to capture e and event
     function copy_event_attrs(event_class) {
-      EventMap[event_class].forEach(function(attr) {
-        event[attr] = e[attr]
-      })
+      const attrs = EventMap[event_class]
+      for (let i = 0; i < attrs.length; i++) {
+        const attr = attrs[i]
+        if (fields === undefined || fields.has(attr)) { event[attr] = e[attr] }
+      }
     }
 
     /* Event Object Format
@@ -339,10 +586,12 @@
 
     // Mouse Event
     if (e instanceof MouseEvent) {
-      if (e.relatedTarget !== null) {
-        event.relatedTarget = {id: get_wdom_id(e.relatedTarget)}
-      } else {
-        event.relatedTarget = null
+      if (fields === undefined || fields.has('relatedTarget')) {
+        if (e.relatedTarget !== null) {
+          event.relatedTarget = {id: get_wdom_id(e.relatedTarget)}
+        } else {
+          event.relatedTarget = null
+        }
       }
       copy_event_attrs('MouseEvent') // Copy event attributes
     }
@@ -373,12 +622,9 @@
       }
     }
 
-    // Add event specific attributes
-    if (proto in EventMap) {
-      for (let i in EventMap[proto]) {
-        const attr = EventMap[proto][i]
-        event[attr] = e[attr]
-      }
+    // Add event specific attributes (MouseEvent is already copied)
+    if (proto in EventMap && proto !== 'MouseEvent') {
+      copy_event_attrs(proto)
     }
 
     // On input/change events, copy data to the server node
@@ -410,13 +656,97 @@
       event: event,
       id: get_wdom_id(currentTarget)
     }
-    wdom.push_msg(msg)
+    return msg
+  }
+
+  wdom.send_event = function(e) {
+    const msg = event_message(e)
+    if (msg !== null) { wdom.push_msg(msg) }
+  }
+
+  function throttled_send_event(interval, fields) {
+    // Message is made when event fired (currentTarget is available only
+    // then), but only the last one is sent after the interval.
+    let last = 0
+    let timer = null
+    let pending = null
+    function send() {
+      last = Date.now()
+      timer = null
+      wdom.push_msg(pending)
+      pending = null
+    }
+    return function(e) {
+      const msg = event_message(e, fields)
+      if (msg === null) { return }
+      pending = msg
+      if (timer === null) {
+        timer = setTimeout(send, Math.max(0, interval - (Date.now() - last)))
+      }
+    }
+  }
+
+  function debounced_send_event(wait, fields) {
+    // Send the last event after no event fired for the wait.
+    let timer = null
+    let pending = null
+    function send() {
+      timer = null
+      wdom.push_msg(pending)
+      pending = null
+    }
+    return function(e) {
+      const msg = event_message(e, fields)
+      if (msg === null) { return }
+      pending = msg
+      clearTimeout(timer)
+      timer = setTimeout(send, wait)
+    }
+  }
+
+  function make_listener(event, options) {
+    // options: {throttle: ms, debounce: ms, passive: bool, fields: [names]},
+    // from server
+    const fields = options.fields ? new Set(options.fields) : undefined
+    if (options.throttle) {
+      return throttled_send_event(options.throttle, fields)
+    } else if (options.debounce) {
+      return debounced_send_event(options.debounce, fields)
+    } else if (fields !== undefined) {
+      return function(e) {
+        const msg = event_message(e, fields)
+        if (msg !== null) { wdom.push_msg(msg) }
+      }
+    }
+    return wdom.send_event
+  }
+
+  function send_value_event(e) {
+    // Sync value of input elements, unless the server listens to this
+    // event: its listener sends value with the event (maybe throttled).
+    const listeners = e.currentTarget.__wdom_listeners
+    if (listeners === undefined || !(e.type in listeners)) {
+      wdom.send_event(e)
+    }
   }
 
   // Add event listener
-  wdom.addEventListener = function(node, event) {
-    node.addEventListener(event, wdom.send_event, false)
-    if (event === 'dragstart') {
+  wdom.addEventListener = function(node, event, options) {
+    options = options || {}
+    if (node.__wdom_listeners === undefined) { node.__wdom_listeners = {} }
+    const key = JSON.stringify(options)
+    const current = node.__wdom_listeners[event]
+    if (current !== undefined) {
+      if (current.key === key) { return }
+      // options changed
+      node.removeEventListener(event, current.listener, false)
+    }
+    const listener = make_listener(event, options)
+    node.__wdom_listeners[event] = {listener: listener, key: key}
+    node.addEventListener(event, listener, {capture: false, passive: !!options.passive})
+    if (current !== undefined) {
+      return
+    } else if (event === 'dragstart') {
       // Send drag-end signal to remove data on dataTransfer on server
       node.addEventListener('dragend', wdom.send_event, false)
     } else if (event === 'drop') {
@@ -427,7 +757,10 @@
   }
 
   wdom.removeEventListener = function(node, event) {
-    node.removeEventListener(event, wdom.send_event)
+    const listeners = node.__wdom_listeners
+    if (listeners === undefined || !(event in listeners)) { return }
+    node.removeEventListener(event, listeners[event].listener, false)
+    delete listeners[event]
   }
 
   /* DOM control */
@@ -467,7 +800,7 @@
 
   wdom.removeChildById = function(node, id) {
     const child = get_node(id)
-    if (child) { node.removeChild(child) }
+    if (child && child.parentNode === node) { node.removeChild(child) }
   }
 
   wdom.removeChildByIndex = function(node, index) {
@@ -475,6 +808,15 @@
     if (child) { node.removeChild(child) }
   }
 
+  wdom.moveChildById = function(node, id, index) {
+    // move existing node before index-th child (or to the last if null)
+    const child = get_node(id)
+    if (child) {
+      const ref = index === null ? null : node.childNodes.item(index)
+      node.insertBefore(child, ref)
+    }
+  }
+
   wdom.replaceChildById = function(node, html, id) {
     const old_child = get_node(id)
     if (old_child) {
@@ -561,6 +903,10 @@
     wdom.send_response(node, reqid, {y: window.scrollY})
   }
 
+  wdom.reload = function(node){
+    location.reload()
+  }
+
   wdom.log.log = function(level, message) {
     const msg = {
       type: 'log',
@@ -6,9 +6,10 @@
 import re
 from collections import OrderedDict
 import logging
-from typing import Any, Match
+from typing import Any, Match, Optional
 
-from wdom.node import AbstractNode
+from wdom.node import AbstractNode, Node
+from wdom.node import _queue_attribute_mutation, _registrations
 
 logger = logging.getLogger(__name__)
 _css_norm_re = re.compile(r'([a-z])([A-Z])')
@@ -29,6 +30,8 @@ def _normalize_css_property(prop: str) -> str:
 class CSSStyleDeclaration(OrderedDict):
     """Represents a CSS property-value pairs."""
 
+    __slots__ = ('__parent', '_owner')
+
     def __init__(self, style: str = None, parent: 'CSSStyleRule' = None,
                  owner: AbstractNode = None) -> None:
         """Initialize with styles.
@@ -42,8 +45,17 @@ class CSSStyleDeclaration(OrderedDict):
         if style:
             self._parse_str(style)
 
-    def _update_web(self) -> None:
+    def _old_value(self) -> Optional[str]:
+        # value of the style attribute before change, if observed
+        if _registrations and self._owner is not None:
+            return self.cssText or None
+        return None
+
+    def _update_web(self, old_value: str = None) -> None:
         from wdom.web_node import WdomElement
+        if isinstance(self._owner, Node):
+            self._owner._changed()
+            _queue_attribute_mutation(self._owner, 'style', old_value)
         if isinstance(self._owner, WdomElement):
             css = self.cssText
             if css:
@@ -52,12 +64,13 @@ class CSSStyleDeclaration(OrderedDict):
                 self._owner.js_exec('removeAttribute', 'style')
 
     def _parse_str(self, style: str) -> None:
+        old_value = self._old_value()
         self.clear()
         orig_style = style
         style_str = _style_cleanup_re.sub(r'\1', style.strip())
         if len(style_str) == 0:
             # do nothing, just clear and update
-            self._update_web()
+            self._update_web(old_value)
             return
 
         # temporary disable udpating browser for better performance
@@ -76,7 +89,7 @@ class CSSStyleDeclaration(OrderedDict):
             value = decl_list[1]
             self[prop] = value
         self._owner = _owner
-        self._update_web()
+        self._update_web(old_value)
 
     @property
     def cssText(self) -> str:
@@ -127,12 +140,14 @@ class CSSStyleDeclaration(OrderedDict):
         return self.get(_normalize_css_property(attr), '')
 
     def __setitem__(self, attr: str, value: str) -> None:
+        old_value = self._old_value()
         super().__setitem__(_normalize_css_property(attr), value)
-        self._update_web()
+        self._update_web(old_value)
 
     def __delitem__(self, attr: str) -> None:
+        old_value = self._old_value()
         super().__delitem__(_normalize_css_property(attr))
-        self._update_web()
+        self._update_web(old_value)
 
     def __getattr__(self, attr: str) -> str:
         if attr.startswith('_') or attr in dir(self):
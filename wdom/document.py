@@ -11,12 +11,14 @@ import tempfile
 import shutil
 from functools import partial
 from types import ModuleType
-from typing import Any, Callable, Optional, Union
+from typing import Any, Callable, ContextManager, Iterator, List, Optional
+from typing import Union
 import weakref
 
 from wdom import server
 from wdom.element import Element, Attr, HTMLElement, getElementsBy
 from wdom.element import getElementsByClassName, getElementsByTagName
+from wdom.element import _has_plain_html, _ElementIndex
 from wdom.element import querySelector, querySelectorAll
 from wdom.event import Event, EventTarget, WebEventTarget
 from wdom.node import Node, DocumentType, Text, RawHtml, Comment, ParentNode
@@ -24,7 +26,8 @@ from wdom.node import DocumentFragment, NodeList
 from wdom.options import config
 from wdom.tag import Tag
 from wdom.tag import Html, Head, Body, Meta, Link, Title, Script
-from wdom.web_node import WdomElement
+from wdom.traversal import NodeFilter, NodeIterator, TreeWalker
+from wdom.web_node import WdomElement, batch
 from wdom.window import Window
 
 
@@ -91,6 +94,7 @@ class Document(Node, ParentNode, EventTarget):
 
     nodeType = Node.DOCUMENT_NODE
     nodeName = '#document'
+    _change_count = 0  # incremented when any node in this doc is changed
 
     def __init__(self, *,
                  doctype: str = 'html',
@@ -103,6 +107,8 @@ class Document(Node, ParentNode, EventTarget):
             :py:meth:`createElement` method.
         """
         super().__init__()
+        # tag and class name indexes of elements in this document
+        self._element_index = _ElementIndex()
         self.__window = Window(self)
         self._default_class = default_class
 
@@ -170,6 +176,14 @@ class Document(Node, ParentNode, EventTarget):
         title_element = _title or Title(parent=self.head)
         title_element.textContent = new_title
 
+    def _index_nodes(self, nodes: List[Node]) -> None:
+        """Add ``nodes`` inserted to this document to the indexes."""
+        self._element_index.add(nodes)
+
+    def _unindex_nodes(self, nodes: List[Node]) -> None:
+        """Remove ``nodes`` removed from this document from the indexes."""
+        self._element_index.remove(nodes)
+
     def getElementsBy(self, cond: Callable[[Element], bool]) -> NodeList:
         """Get elements in this document which matches condition."""
         return getElementsBy(self, cond)
@@ -216,14 +230,65 @@ class Document(Node, ParentNode, EventTarget):
         """Create Attribute object with ``name``."""
         return Attr(name)
 
-    def querySelector(self, selectors: str) -> Node:
-        """Not Implemented."""
+    def createNodeIterator(self, root: Node,
+                           whatToShow: int = NodeFilter.SHOW_ALL,
+                           filter: Any = None) -> NodeIterator:
+        """Create NodeIterator of ``root`` and its descendants.
+
+        ``filter`` is a function or an object which has ``acceptNode`` method
+        (see :class:`wdom.traversal.NodeFilter`).
+        """
+        return NodeIterator(root, whatToShow, filter)
+
+    def createTreeWalker(self, root: Node,
+                         whatToShow: int = NodeFilter.SHOW_ALL,
+                         filter: Any = None) -> TreeWalker:
+        """Create TreeWalker which starts from ``root``.
+
+        ``filter`` is a function or an object which has ``acceptNode`` method
+        (see :class:`wdom.traversal.NodeFilter`).
+        """
+        return TreeWalker(root, whatToShow, filter)
+
+    def querySelector(self, selectors: str) -> Optional[Node]:
+        """Get the first element in this document which matches selectors."""
         return querySelector(self, selectors)
 
     def querySelectorAll(self, selectors: str) -> NodeList:
-        """Not Implemented."""
+        """Get elements in this document which match selectors."""
         return querySelectorAll(self, selectors)
 
+    def iter_html(self) -> Iterator[str]:
+        """Yield HTML representation of this document by chunks.
+
+        The first chunk contains doctype, ``<head>``, and the start tag of
+        ``<body>``. Then html of each child node of ``<body>`` and the rest of
+        the document are yielded.
+        """
+        buf = []  # type: List[str]
+        for child in self.childNodes:
+            if child is self.documentElement and _has_plain_html(type(child)):
+                buf.append(child.start_tag)
+                yield from self._iter_html_root(child, buf)
+                buf.append(child.end_tag)
+            else:
+                buf.append(child.html)
+        if buf:
+            yield ''.join(buf)
+
+    def _iter_html_root(self, root: Element, buf: List[str]
+                        ) -> Iterator[str]:
+        for child in root.childNodes:
+            if child is self.body and _has_plain_html(type(child)):
+                buf.append(child.start_tag)
+                yield ''.join(buf)
+                buf.clear()
+                for node in child.childNodes:
+                    yield node.html
+                buf.append(child.end_tag)
+            else:
+                buf.append(child.html)
+
 
 class WdomDocument(Document, WebEventTarget):
     """Main document class for WDOM applications."""
@@ -241,6 +306,13 @@ class WdomDocument(Document, WebEventTarget):
         """Return temporary directory used by this document."""
         return self.__tempdir
 
+    def batch(self) -> ContextManager[None]:
+        """Gather mutations in ``with`` block and send them at once.
+
+        See :func:`wdom.web_node.batch` for details.
+        """
+        return batch()
+
     def __init__(self, *,
                  doctype: str = 'html',
                  title: str = 'W-DOM',
@@ -270,29 +342,32 @@ class WdomDocument(Document, WebEventTarget):
                                            partial(_cleanup, _tempdir))
         self._autoreload = autoreload
         self._reload_wait = reload_wait
+        self._built_html = ''
+        self._built_count = -1
 
         super().__init__(doctype=doctype, default_class=default_class)
         self.characterSet = charset
         self.title = title
         self.script = Script(parent=self.body)
         self._autoreload_script = Script(parent=self.head)
-        self.addEventListener('mount', self._on_mount)
 
     def _set_autoreload(self) -> None:
-        self._autoreload_script.textContent = ''
         if self._autoreload is None:
             autoreload = (config.autoreload or config.debug)
         else:
             autoreload = self._autoreload
 
+        script = ''
         if autoreload:
             ar_script = []
             ar_script.append('var WDOM_AUTORELOAD = true')
             if self._reload_wait is not None:
                 ar_script.append('var WDOM_RELOAD_WAIT = {}'.format(
                     self._reload_wait))
-            self._autoreload_script.textContent = '\n{}\n'.format(
-                '\n'.join(ar_script))
+            script = '\n{}\n'.format('\n'.join(ar_script))
+        # avoid changing the tree (and invalidating built html) if possible
+        if self._autoreload_script.textContent != script:
+            self._autoreload_script.textContent = script
 
     def getElementByWdomId(self, id: Union[str]) -> Optional[WebEventTarget]:
         """Get an element node with ``wdom_id``.
@@ -344,9 +419,37 @@ class WdomDocument(Document, WebEventTarget):
             self.defaultView.customElements.define(cls)
 
     def build(self) -> str:
-        """Return HTML representation of this document."""
+        """Return HTML representation of this document.
+
+        Built html is cached until any node in this document is changed.
+        """
+        if not self.is_cached():
+            self._built_html = ''.join(self.iter_html())
+            self._built_count = self._change_count
+        return self._built_html
+
+    def is_cached(self) -> bool:
+        """Return True if :meth:`build` returns cached html."""
         self._set_autoreload()
-        return ''.join(child.html for child in self.childNodes)
+        return self._built_count == self._change_count
+
+    def iter_build(self) -> Iterator[str]:
+        """Yield HTML representation of this document by chunks.
+
+        Html is cached when all chunks are yielded and the document is not
+        changed meanwhile. See :meth:`Document.iter_html` for chunks.
+        """
+        if self.is_cached():
+            yield self._built_html
+            return
+        count = self._change_count
+        chunks = []  # type: List[str]
+        for chunk in self.iter_html():
+            chunks.append(chunk)
+            yield chunk
+        if count == self._change_count:
+            self._built_html = ''.join(chunks)
+            self._built_count = count
 
 
 def get_new_document(  # noqa: C901
@@ -3,22 +3,21 @@
 
 """Conclete implemententions for Element node."""
 
-from collections import OrderedDict, UserDict
 import html as html_
 from typing import Any, Callable, Dict, Iterable, Iterator, List
-from typing import MutableSequence, Optional, Tuple, Type, Union
-from typing import TYPE_CHECKING
+from typing import MutableMapping, MutableSequence, Optional, Set, Tuple
+from typing import Type
+from typing import Union
 from weakref import WeakSet, WeakValueDictionary
 from xml.etree.ElementTree import HTML_EMPTY  # type: ignore
 
 from wdom.css import CSSStyleDeclaration
 from wdom.event import EventTarget, Event
 from wdom.node import AbstractNode, Node, ParentNode, NonDocumentTypeChildNode
-from wdom.node import DocumentFragment, NodeList, ChildNode
+from wdom.node import DocumentFragment, HTMLCollection, NodeList, ChildNode
+from wdom.node import _queue_attribute_mutation, _registrations
 from wdom.parser import FragmentParser
-
-if TYPE_CHECKING:
-    from typing import MutableMapping  # noqa
+from wdom.traversal import NodeFilter, iter_descendants
 
 _AttrValueType = Union[List[str], str, int, bool, CSSStyleDeclaration, None]
 
@@ -30,6 +29,8 @@ class DOMTokenList(MutableSequence[str]):
     This class is mainly used for class list.
     """
 
+    __slots__ = ('_list', '_owner')
+
     def __init__(self, owner: Union[Node, Type['HTMLElement']],
                  *args: Union[str, 'DOMTokenList']) -> None:
         """Initialize with owner node (maybe type of node) and initial values.
@@ -93,27 +94,56 @@ class DOMTokenList(MutableSequence[str]):
     def add(self, *tokens: str) -> None:
         """Add new tokens to list."""
         from wdom.web_node import WdomElement
+        old_value = self._old_value()
         _new_tokens = []
         for token in tokens:
             self._validate_token(token)
             if token and token not in self:
                 self._list.append(token)
                 _new_tokens.append(token)
+        if isinstance(self._owner, Node) and _new_tokens:
+            self._owner._changed()
+            self._update_index(_new_tokens, True)
+            self._queue_mutation(old_value)
         if isinstance(self._owner, WdomElement) and _new_tokens:
             self._owner.js_exec('addClass', _new_tokens)  # type: ignore
 
     def remove(self, *tokens: str) -> None:
         """Remove tokens from list."""
         from wdom.web_node import WdomElement
+        old_value = self._old_value()
         _removed_tokens = []
         for token in tokens:
             self._validate_token(token)
             if token in self:
                 self._list.remove(token)
                 _removed_tokens.append(token)
+        if isinstance(self._owner, Node) and _removed_tokens:
+            self._owner._changed()
+            self._update_index(_removed_tokens, False)
+            self._queue_mutation(old_value)
         if isinstance(self._owner, WdomElement) and _removed_tokens:
             self._owner.js_exec('removeClass', _removed_tokens)  # type: ignore
 
+    def _update_index(self, tokens: List[str], added: bool) -> None:
+        # update class index of the owner document, if this is the class list
+        owner = self._owner
+        doc = owner.ownerDocument  # type: ignore
+        if doc is not None and owner._class_list is self:  # type: ignore
+            if added:
+                doc._element_index.add_classes(owner, tokens)
+            else:
+                doc._element_index.remove_classes(owner, tokens)
+
+    def _old_value(self) -> Optional[str]:
+        # value of the class attribute before change, if observed
+        return (self.toString() or None) if _registrations else None
+
+    def _queue_mutation(self, old_value: Optional[str]) -> None:
+        owner = self._owner
+        if _registrations and owner._class_list is self:  # type: ignore
+            _queue_attribute_mutation(owner, 'class', old_value)
+
     def toggle(self, token: str) -> None:
         """Add or remove token to/from list.
 
@@ -158,6 +188,8 @@ class Attr:
     interface. (Previously, Attr inherited Node interface.)
     """
 
+    __slots__ = ('_name', '_value', '_owner')
+
     def __init__(self, name: str,
                  value: _AttrValueType = None,
                  owner: Node = None) -> None:
@@ -197,7 +229,11 @@ class Attr:
 
     @value.setter
     def value(self, val: str) -> None:
+        old_value = self.value
         self._value = val
+        if isinstance(self._owner, Node):
+            self._owner._changed()
+            _queue_attribute_mutation(self._owner, self.name, old_value)
 
     @property
     def isId(self) -> bool:
@@ -208,6 +244,8 @@ class Attr:
 class DraggableAttr(Attr):
     """Attribute node class for draggable attribute."""
 
+    __slots__ = ()
+
     @property
     def html(self) -> str:
         """Return html representation."""
@@ -218,16 +256,18 @@ class DraggableAttr(Attr):
         return 'draggable="{}"'.format(val)
 
 
-class NamedNodeMap(UserDict):
+class NamedNodeMap(MutableMapping[str, Attr]):
     """Collection of Attr objects."""
 
+    __slots__ = ('_owner', '_dict')
+
     def __init__(self, owner: Node) -> None:
         """Initialize with owner node.
 
         :arg Node owner: owner node of this object.
         """
         self._owner = owner
-        self._dict = OrderedDict()  # type: OrderedDict[str, Attr]
+        self._dict = dict()  # type: Dict[str, Attr]
 
     def __len__(self) -> int:
         return len(self._dict)
@@ -270,8 +310,13 @@ class NamedNodeMap(UserDict):
         if isinstance(self._owner, WdomElement):
             self._owner.js_exec('setAttribute', item.name,  # type: ignore
                                 item.value)
+        old_item = self._dict.get(item.name)
         self._dict[item.name] = item
         item._owner = self._owner
+        if isinstance(self._owner, Node):
+            self._owner._changed()
+            _queue_attribute_mutation(self._owner, item.name,
+                                      old_item.value if old_item else None)
 
     def removeNamedItem(self, item: Attr) -> Optional[Attr]:
         """Set ``Attr`` object and return it (if exists)."""
@@ -283,6 +328,10 @@ class NamedNodeMap(UserDict):
         removed_item = self._dict.pop(item.name, None)
         if removed_item:
             removed_item._owner = self._owner
+            if isinstance(self._owner, Node):
+                self._owner._changed()
+                _queue_attribute_mutation(self._owner, removed_item.name,
+                                          removed_item.value)
         return removed_item
 
     def item(self, index: int) -> Optional[Attr]:
@@ -364,13 +413,32 @@ class ElementMeta(type):
     def __new__(cls: type, name: str, bases: Tuple[type],
                 namespace: Dict[str, Any], **kwargs: Any) -> type:
         """Add special properties to new class."""
+        namespace = dict(namespace)
         for attr in namespace.get('_special_attr_string', []):
             namespace[attr] = _string_properties(attr)
         for attr in namespace.get('_special_attr_boolean', []):
             namespace[attr] = _boolean_properties(attr)
-        new_cls = super().__new__(cls, name, bases, dict(namespace))
+        # class-level tag name must not shadow ``Element.tag`` property
+        if isinstance(namespace.get('tag'), str):
+            namespace['_default_tag'] = namespace.pop('tag')
+        new_cls = super().__new__(cls, name, bases, namespace)
         return new_cls
 
+    @property
+    def tag(cls) -> str:
+        """Default tag name of instances of this class."""
+        return cls._default_tag  # type: ignore
+
+    @tag.setter
+    def tag(cls, tag: str) -> None:
+        cls._default_tag = tag  # type: ignore
+
+
+def _iter_elements(start_node: ParentNode) -> Iterator['Element']:
+    """Yield descendant elements of ``start_node`` in document order."""
+    elements = iter_descendants(start_node, NodeFilter.SHOW_ELEMENT)
+    return elements  # type: ignore
+
 
 def getElementsBy(start_node: ParentNode,
                   cond: Callable[['Element'], bool]) -> NodeList:
@@ -379,61 +447,205 @@ def getElementsBy(start_node: ParentNode,
     ``cond`` must be a function which gets a single argument ``Element``,
     and returns boolean. If the node matches requested condition, ``cond``
     should return True.
-    This searches all child elements recursively.
+    This searches all descendant elements (without recursive calls).
 
     :arg ParentNode start_node:
     :arg cond: Callable[[Element], bool]
     :rtype: NodeList[Element]
     """
-    elements = []
-    for child in start_node.children:
-        if cond(child):
-            elements.append(child)
-        elements.extend(child.getElementsBy(cond))
-    return NodeList(elements)
+    return NodeList([elm for elm in _iter_elements(start_node) if cond(elm)])
+
+
+class _ElementIndex:
+    """Tag name and class name indexes of elements in a document."""
+
+    __slots__ = ('tags', 'classes')
+
+    def __init__(self) -> None:
+        self.tags = {}  # type: Dict[str, Set[Element]]
+        self.classes = {}  # type: Dict[str, Set[Element]]
+
+    def add(self, nodes: Iterable[Node]) -> None:
+        """Add elements in ``nodes`` to the indexes."""
+        tags = self.tags
+        for node in nodes:
+            if node.nodeType == Node.ELEMENT_NODE:
+                tags.setdefault(node.tagName, set()).add(node)  # type: ignore
+                if node._class_list:  # type: ignore
+                    self.add_classes(node, node._class_list)  # type: ignore
+
+    def remove(self, nodes: Iterable[Node]) -> None:
+        """Remove elements in ``nodes`` from the indexes."""
+        tags = self.tags
+        for node in nodes:
+            if node.nodeType == Node.ELEMENT_NODE:
+                _discard(tags, node.tagName, node)  # type: ignore
+                if node._class_list:  # type: ignore
+                    self.remove_classes(node, node._class_list)  # type: ignore # noqa: E501
+
+    def add_classes(self, elm: 'Element', classes: Iterable[str]) -> None:
+        """Add ``elm`` to the index of each class of ``classes``."""
+        index = self.classes
+        for class_ in classes:
+            index.setdefault(class_, set()).add(elm)
+
+    def remove_classes(self, elm: 'Element', classes: Iterable[str]
+                       ) -> None:
+        """Remove ``elm`` from the index of each class of ``classes``."""
+        for class_ in classes:
+            _discard(self.classes, class_, elm)
+
+
+def _discard(index: Dict[str, Set['Element']], key: str, elm: 'Element'
+             ) -> None:
+    elements = index.get(key)
+    if elements is not None:
+        elements.discard(elm)
+        if not elements:
+            del index[key]
+
+
+def _tree_position(node: Node, root: Node) -> Optional[List[int]]:
+    """Return indices of ``node`` and its ancestors under ``root``.
+
+    If ``node`` is not a descendant of ``root``, return None. Positions of
+    nodes in document order are in ascending order.
+    """
+    position = []
+    while node is not root:
+        parent = node.parentNode
+        if parent is None:
+            return None
+        position.append(parent._child_index(node))
+        node = parent
+    position.reverse()
+    return position
+
+
+class _IndexedCollection(HTMLCollection):
+    """Live collection of elements by tag name or class names.
+
+    Elements are looked up from the indexes of the owner document, and sorted
+    in document order. The result is cached until the document is changed. If
+    the root node is not in any document, all elements under it are checked.
+    """
+
+    def __init__(self, root: ParentNode, tag: str = None,
+                 classes: List[str] = None) -> None:
+        super().__init__([])
+        self._root = root
+        self._tag = tag
+        self._classes = classes or []
+        self._cache = []  # type: List[Element]
+        self._cache_key = None  # type: Optional[Tuple[Node, int]]
+
+    def _match(self, elm: 'Element') -> bool:
+        if self._tag is not None:
+            return elm.tagName == self._tag
+        class_list = elm._class_list
+        return bool(class_list) and all(c in class_list
+                                        for c in self._classes)
+
+    def _lookup(self, index: _ElementIndex) -> Iterable['Element']:
+        if self._tag is not None:
+            return index.tags.get(self._tag, ())
+        candidates = [index.classes.get(c, ()) for c in self._classes]
+        # check elements in the smallest index
+        return [elm for elm in min(candidates, key=len) if self._match(elm)]
+
+    def _elements(self) -> List['Element']:
+        root = self._root
+        doc = root.ownerDocument
+        if doc is None:
+            return [elm for elm in _iter_elements(root) if self._match(elm)]
+        key = (doc, doc._change_count)  # type: ignore
+        if self._cache_key == key:
+            return self._cache
+        found = []
+        for elm in self._lookup(doc._element_index):  # type: ignore
+            if elm is not root:
+                position = _tree_position(elm, root)
+                if position is not None:
+                    found.append((position, elm))
+        found.sort(key=lambda item: item[0])
+        self._cache = [elm for _, elm in found]
+        self._cache_key = key
+        return self._cache
+
+    def __getitem__(self, index: int) -> Node:  # type: ignore
+        return self._elements()[index]
+
+    def __len__(self) -> int:
+        return len(self._elements())
+
+    def __contains__(self, other: object) -> bool:
+        return other in self._elements()
+
+    def __iter__(self) -> Iterator[AbstractNode]:
+        return iter(list(self._elements()))
+
+    def item(self, index: int) -> Optional[Node]:  # noqa: D102
+        if not isinstance(index, int):
+            raise TypeError(
+                'Indeces must be integer, not {}'.format(type(index)))
+        elements = self._elements()
+        return elements[index] if 0 <= index < len(elements) else None
+
+    def index(self, node: Node) -> int:  # type: ignore # noqa: D102
+        return self._elements().index(node)  # type: ignore
 
 
 def getElementsByTagName(start_node: ParentNode, tag: str) -> NodeList:
-    """Get child nodes which tag name is ``tag``."""
-    _tag = tag.upper()
-    return getElementsBy(start_node, lambda node: node.tagName == _tag)
+    """Get child nodes which tag name is ``tag``.
+
+    Return a live collection, looked up by the index of the owner document.
+    """
+    return _IndexedCollection(start_node, tag=tag.upper())
 
 
 def getElementsByClassName(start_node: ParentNode, class_name: str
                            ) -> NodeList:
-    """Get child nodes which has ``class_name`` class attribute."""
-    classes = set(class_name.split(' '))
-    return getElementsBy(
-        start_node,
-        lambda node: classes.issubset(set(node.classList))
-    )
+    """Get child nodes which has ``class_name`` class attribute.
+
+    Return a live collection, looked up by the index of the owner document.
+    """
+    return _IndexedCollection(start_node, classes=class_name.split(' '))
 
 
-def querySelector(start_node: ParentNode, selectors: str) -> AbstractNode:
-    """Not Implemented yet.
+def querySelector(start_node: ParentNode, selectors: str
+                  ) -> Optional[AbstractNode]:
+    """Return the first descendant element which matches ``selectors``.
 
-    Please use `getElementsBy` method instead.
+    If no element matches, return None. If ``selectors`` is invalid, raise
+    ``ValueError``.
     """
-    raise NotImplementedError
+    from wdom.selector import compile_selector
+    result = compile_selector(selectors).select(start_node, first=True)
+    return result[0] if result else None
 
 
 def querySelectorAll(start_node: ParentNode, selectors: str) -> NodeList:
-    """Not Implemented yet.
+    """Return all descendant elements which match ``selectors``.
 
-    Please use `getElementsBy` method instead.
+    Elements are in document order. If ``selectors`` is invalid, raise
+    ``ValueError``.
     """
-    raise NotImplementedError
+    from wdom.selector import compile_selector
+    return NodeList(compile_selector(selectors).select(start_node))
 
 
 class Element(Node, EventTarget, ParentNode, NonDocumentTypeChildNode,
               ChildNode, metaclass=ElementMeta):
     """Element base class."""
 
+    __slots__ = ('_registered', '_tag', '_attributes', '_class_list',
+                 '_event_listeners')
     nodeType = Node.ELEMENT_NODE
     nodeValue = None
     _parser_class = ElementParser  # type: Type[ElementParser]
     _element_buffer = WeakSet()  # type: WeakSet[Node]
     _elements_with_id = WeakValueDictionary()  # type: MutableMapping
+    _default_tag = ''
     _should_escape_text = True
     _special_attr_string = ['id']
     _special_attr_boolean = []  # type: List[str]
@@ -447,12 +659,14 @@ class Element(Node, EventTarget, ParentNode, NonDocumentTypeChildNode,
         :arg bool _registered: Is registered to CustomElementRegistry.
         :arg kwargs: key-value pair of attributes.
         """
-        super().__init__(parent=parent)
+        # set before appended to the parent, which adds this node to indexes
         self._registered = _registered
-        self.tag = tag
+        self._tag = tag
+        # created on first access (most elements do not have attributes)
+        self._attributes = None  # type: Optional[NamedNodeMap]
+        self._class_list = None  # type: Optional[DOMTokenList]
+        super().__init__(parent=parent)
         self._element_buffer.add(self)  # used to suport custom elements
-        self.attributes = NamedNodeMap(self)
-        self.classList = DOMTokenList(self)
 
         if 'class_' in kwargs:
             kwargs['class'] = kwargs.pop('class_')
@@ -461,6 +675,35 @@ class Element(Node, EventTarget, ParentNode, NonDocumentTypeChildNode,
         for k, v in kwargs.items():
             self.setAttribute(k, v)
 
+    @property
+    def tag(self) -> str:
+        """Tag name of this element."""
+        return self._tag
+
+    @tag.setter
+    def tag(self, tag: str) -> None:
+        doc = self.ownerDocument
+        if doc is not None:
+            doc._unindex_nodes([self])  # type: ignore
+        self._tag = tag
+        if doc is not None:
+            doc._index_nodes([self])  # type: ignore
+        self._changed()
+
+    @property
+    def attributes(self) -> NamedNodeMap:
+        """Return attributes of this node as ``NamedNodeMap``."""
+        if self._attributes is None:
+            self._attributes = NamedNodeMap(self)
+        return self._attributes
+
+    @property
+    def classList(self) -> DOMTokenList:
+        """Return class list of this node as ``DOMTokenList``."""
+        if self._class_list is None:
+            self._class_list = DOMTokenList(self)
+        return self._class_list
+
     def _clone_node(self) -> 'Element':
         clone = type(self)(self.tag)
         for attr in self.attributes:
@@ -470,7 +713,7 @@ class Element(Node, EventTarget, ParentNode, NonDocumentTypeChildNode,
 
     def _get_attrs_by_string(self) -> str:
         # attrs = ' '.join(attr.html for attr in self.attributes.values())
-        attrs = self.attributes.toString()
+        attrs = self._attributes.toString() if self._attributes else ''
         classes = self.getAttribute('class')
         if classes:
             attrs = ' '.join((attrs.strip(), 'class="{}"'.format(classes)))
@@ -496,7 +739,7 @@ class Element(Node, EventTarget, ParentNode, NonDocumentTypeChildNode,
         return parser.root
 
     def _get_inner_html(self) -> str:
-        return ''.join(child.html for child in self.childNodes)
+        return _serialize_children(self)
 
     def _set_inner_html(self, html: str) -> None:
         self._empty()
@@ -517,8 +760,15 @@ class Element(Node, EventTarget, ParentNode, NonDocumentTypeChildNode,
 
     @property
     def html(self) -> str:
-        """Return HTML representation of this node."""
-        return self.start_tag + self.innerHTML + self.end_tag
+        """Return HTML representation of this node.
+
+        Result is cached until this node or its descendants are changed.
+        """
+        html = self._html_cache
+        if html is None:
+            html = self.start_tag + self.innerHTML + self.end_tag
+            self._html_cache = html
+        return html
 
     def insertAdjacentHTML(self, position: str, html: str) -> None:
         """Parse ``html`` to DOM and insert to ``position``.
@@ -582,8 +832,8 @@ class Element(Node, EventTarget, ParentNode, NonDocumentTypeChildNode,
         If this node does not have ``attr``, return None.
         """
         if attr == 'class':
-            if self.classList:
-                return self.classList.toString()
+            if self._class_list:
+                return self._class_list.toString()
             return None
         attr_node = self.getAttributeNode(attr)
         if attr_node is None:
@@ -595,31 +845,44 @@ class Element(Node, EventTarget, ParentNode, NonDocumentTypeChildNode,
 
         If this node does not have ``attr``, return None.
         """
-        return self.attributes.getNamedItem(attr)
+        if not self._attributes:
+            return None
+        return self._attributes.getNamedItem(attr)
 
     def hasAttribute(self, attr: str) -> bool:
         """Return True if this node has ``attr``."""
         if attr == 'class':
-            return bool(self.classList)
-        return attr in self.attributes
+            return bool(self._class_list)
+        return bool(self._attributes) and attr in self._attributes
 
     def hasAttributes(self) -> bool:
         """Return True if this node has any attributes."""
-        return bool(self.attributes) or bool(self.classList)
+        return bool(self._attributes) or bool(self._class_list)
 
     def _set_attribute_class(self, value: _AttrValueType) -> None:
         if isinstance(value, str):
-            self.classList = DOMTokenList(self, value)
+            class_list = DOMTokenList(self, value)
         elif isinstance(value, Iterable):
-            self.classList = DOMTokenList(self, *value)
+            class_list = DOMTokenList(self, *value)
         else:
             raise TypeError(
                 'class attribute must be str, '
                 'but got {}'.format(type(value))
             )
+        old_value = self.getAttribute('class') if _registrations else None
+        doc = self.ownerDocument
+        if doc is not None:
+            if self._class_list:
+                doc._element_index.remove_classes(  # type: ignore
+                    self, self._class_list)
+            doc._element_index.add_classes(self, class_list)  # type: ignore
+        self._class_list = class_list
+        # tokens may be empty, then the list did not notify change
+        self._changed()
+        _queue_attribute_mutation(self, 'class', old_value)
 
     def _change_id(self, value: _AttrValueType) -> None:
-        if 'id' in self.attributes:
+        if self.hasAttribute('id'):
             # remove old reference to self
             self._elements_with_id.pop(self.id, None)
         # register this elements with new id
@@ -653,7 +916,7 @@ class Element(Node, EventTarget, ParentNode, NonDocumentTypeChildNode,
 
     def _remove_attribute(self, attr: str) -> None:
         if attr == 'class':
-            self.classList = DOMTokenList(self)
+            self._remove_attribute_class()
         else:
             if attr == 'id':
                 self._elements_with_id.pop(self.id, None)
@@ -661,6 +924,17 @@ class Element(Node, EventTarget, ParentNode, NonDocumentTypeChildNode,
             if _attr:
                 self.attributes.removeNamedItem(_attr)
 
+    def _remove_attribute_class(self) -> None:
+        old_value = self.getAttribute('class') if _registrations else None
+        doc = self.ownerDocument
+        if doc is not None and self._class_list:
+            doc._element_index.remove_classes(  # type: ignore
+                self, self._class_list)
+        self._class_list = None
+        self._changed()
+        if old_value is not None:
+            _queue_attribute_mutation(self, 'class', old_value)
+
     def removeAttribute(self, attr: str) -> None:
         """Remove ``attr`` from this node."""
         self._remove_attribute(attr)
@@ -681,14 +955,71 @@ class Element(Node, EventTarget, ParentNode, NonDocumentTypeChildNode,
         """Get elements with class name under this node."""
         return getElementsByClassName(self, class_name)
 
-    def querySelector(self, selectors: str) -> Node:
-        """Not Implemented."""
+    def querySelector(self, selectors: str) -> Optional[Node]:
+        """Get the first element under this node which matches selectors."""
         return querySelector(self, selectors)
 
     def querySelectorAll(self, selectors: str) -> NodeList:
-        """Not Implemented."""
+        """Get elements under this node which match selectors."""
         return querySelectorAll(self, selectors)
 
+    def matches(self, selectors: str) -> bool:
+        """Return True if this node matches selectors."""
+        from wdom.selector import compile_selector
+        return compile_selector(selectors).match(self)
+
+
+_plain_html_classes = {}  # type: Dict[type, bool]
+
+
+def _has_plain_html(cls: type) -> bool:
+    """Check html of ``cls`` is start tag + html of child nodes + end tag."""
+    plain = _plain_html_classes.get(cls)
+    if plain is None:
+        plain = (issubclass(cls, Element) and
+                 cls.html is Element.html and  # type: ignore
+                 cls.innerHTML.fget is Element.innerHTML.fget and  # type: ignore # noqa: E501
+                 cls._get_inner_html is Element._get_inner_html)  # type: ignore # noqa: E501
+        _plain_html_classes[cls] = plain
+    return plain
+
+
+def _serialize_children(node: Node) -> str:
+    """Return html of child nodes of ``node`` without recursive calls.
+
+    Child elements are traversed with an explicit stack and their html is
+    written into a single list. Cached html of elements is reused, and html
+    of elements serialized here is cached.
+    """
+    parts = []  # type: List[str]
+    append = parts.append
+    plain_classes = _plain_html_classes
+    # (element, iterator of remaining child nodes, index of its start tag)
+    stack = [(node, iter(node.childNodes), 0)]  # type: List[Tuple[Node, Iterator[Node], int]]  # noqa: E501
+    while stack:
+        parent, children, start = stack[-1]
+        for child in children:
+            html = child._html_cache
+            if html is None:
+                plain = plain_classes.get(type(child))
+                if plain is None:
+                    plain = _has_plain_html(type(child))
+                if plain:
+                    append(child.start_tag)  # type: ignore
+                    stack.append((child, iter(child.childNodes),
+                                  len(parts) - 1))
+                    break
+                html = child.html
+            append(html)
+        else:
+            stack.pop()
+            if stack:
+                parts.append(parent.end_tag)  # type: ignore
+                html = ''.join(parts[start:])
+                parts[start:] = [html]
+                parent._html_cache = html
+    return ''.join(parts)
+
 
 class HTMLElement(Element):
     """Base class for HTMLElement.
@@ -696,13 +1027,20 @@ class HTMLElement(Element):
     This class extends `Element` class with some HTML specific features.
     """
 
+    # no new slots, to keep the same layout as ``Element`` (custom elements
+    # change ``__class__`` of existing nodes)
+    __slots__ = ()
+
     _special_attr_string = ['title', 'type']
     _special_attr_boolean = ['hidden']
     _parser_class = HTMLElementParser  # type: Type[ElementParser]
+    # created on first access
+    __style = None  # type: Optional[CSSStyleDeclaration]
 
     def __init__(self, *args: Any, style: str=None, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
-        self.__style = CSSStyleDeclaration(style, owner=self)
+        if style:
+            self.__style = CSSStyleDeclaration(style, owner=self)
 
     def _get_attrs_by_string(self) -> str:
         attrs = super()._get_attrs_by_string()
@@ -713,7 +1051,8 @@ class HTMLElement(Element):
 
     def _clone_node(self) -> 'HTMLElement':
         clone = super()._clone_node()
-        clone.style.update(self.style)
+        if self.__style:
+            clone.style.update(self.__style)
         return clone
 
     @property
@@ -729,6 +1068,8 @@ class HTMLElement(Element):
     @property
     def style(self) -> CSSStyleDeclaration:
         """Return style attribute of this node."""
+        if self.__style is None:
+            self.__style = CSSStyleDeclaration(owner=self)
         return self.__style
 
     @style.setter
@@ -739,11 +1080,14 @@ class HTMLElement(Element):
         ``CSSStyleDeclaration``.
         """
         if isinstance(style, str):
-            self.__style._parse_str(style)
+            self.style._parse_str(style)
         elif style is None:
-            self.__style._parse_str('')
+            if self.__style is not None:
+                self.__style._parse_str('')
         elif isinstance(style, CSSStyleDeclaration):
-            self.__style._owner = None
+            old_value = self.getAttribute('style')
+            if self.__style is not None:
+                self.__style._owner = None
             if style._owner is not None:
                 new_style = CSSStyleDeclaration(owner=self)
                 new_style.update(style)
@@ -752,6 +1096,8 @@ class HTMLElement(Element):
                 # always making new decl may be better
                 style._owner = self
                 self.__style = style
+            self._changed()
+            _queue_attribute_mutation(self, 'style', old_value)
         else:
             raise TypeError('Invalid type for style: {}'.format(type(style)))
 
@@ -777,8 +1123,8 @@ class HTMLElement(Element):
         if attr == 'style':
             # if style is neither None nor empty, return None
             # otherwise, return style.cssText
-            if self.style:
-                return self.style.cssText
+            if self.__style:
+                return self.__style.cssText
             return None
         return super().getAttribute(attr)
 
@@ -830,22 +1176,26 @@ class FormControlMixin(AbstractNode):
 
 class HTMLAnchorElement(HTMLElement):  # noqa: D204
     """HTMLAnchorElement class (<a></a> tag)."""
+    __slots__ = ()
     _special_attr_string = ['href', 'name', 'rel', 'src', 'target']
 
 
 class HTMLButtonElement(HTMLElement):  # noqa: D204
     """HTMLButtonElement class (<button></button> tag)."""
+    __slots__ = ()
     _special_attr_string = ['name', 'value']
     _special_attr_boolean = ['disabled']
 
 
 class HTMLFormElement(HTMLElement):  # noqa: D204
     """HTMLFormElement class (<form></form> tag)."""
+    __slots__ = ()
     _special_attr_string = ['name']
 
 
 class HTMLIFrameElement(HTMLElement):  # noqa: D204
     """HTMLIFrameElement class (<iframe></iframe> tag)."""
+    __slots__ = ()
     _special_attr_string = ['height', 'name', 'src', 'target', 'width']
 
 
@@ -961,6 +1311,7 @@ class HTMLScriptElement(HTMLElement):  # noqa: D204
 
     In this tag, all inner contents are not escaped.
     """
+    __slots__ = ()
     _special_attr_string = ['charset', 'src']
     _special_attr_boolean = ['async', 'defer']
     _should_escape_text = False
@@ -1012,6 +1363,7 @@ class HTMLStyleElement(HTMLElement):  # noqa: D204
 
     In this tag, all inner contents are not escaped.
     """
+    __slots__ = ()
     _special_attr_boolean = ['disabled', 'scoped']
     _should_escape_text = False
 
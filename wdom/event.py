@@ -9,14 +9,14 @@ Usually users don't need to instantiate these classes directly.
 """
 
 from asyncio import ensure_future, iscoroutinefunction, Future
-from collections import defaultdict, OrderedDict
-from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Union
-from typing import TYPE_CHECKING
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from typing import Union, TYPE_CHECKING
 
 from wdom.node import Node
 
 if TYPE_CHECKING:
-    from typing import List, MutableMapping  # noqa: F401
+    from typing import Set  # noqa: F401
 
 
 # EventMsgDict = TypedDict('EventMsgDict', {
@@ -94,6 +94,9 @@ class DataTransfer:
             del self.__data[type]
 
 
+_UNSET = object()
+
+
 class Event:
     """Base class of Event classes."""
 
@@ -105,6 +108,11 @@ class Event:
     @property
     def target(self) -> Optional['WebEventTarget']:
         """Return original event target, which emitted this event first."""
+        if self.__target is _UNSET:
+            from wdom.document import getElementByWdomId
+            _id = self.init.get('target', {'id': None}).get('id')
+            self.__target = (getElementByWdomId(_id) or
+                             self.__currentTarget)  # type: Any
         return self.__target
 
     def __init__(self, type: str, init: EventMsgDict = None) -> None:
@@ -118,10 +126,9 @@ class Event:
         self.type = type
         self.init = dict() if init is None else init
         _id = self.init.get('currentTarget', {'id': None}).get('id')
-        ctarget = getElementByWdomId(_id)
-        self.__currentTarget = ctarget
-        _id = self.init.get('target', {'id': None}).get('id')
-        self.__target = getElementByWdomId(_id) or ctarget
+        self.__currentTarget = getElementByWdomId(_id)
+        # looked up on first access
+        self.__target = _UNSET
 
     def stopPrapagation(self) -> None:
         """Not implemented yet."""
@@ -133,8 +140,18 @@ class UIEvent(Event):  # noqa: D204
 
     Mouse/Touch/Focus/Keyboard/Wheel/Input/Composition/...Events are
     descendants of this class.
+
+    Attributes listed in ``attrs`` are read from the message on access. If the
+    listener is added with ``fields``, attributes not in the fields are None.
     """
-    pass
+    attrs = ()  # type: Iterable[str]
+
+    def __getattr__(self, attr: str) -> Any:
+        # called only when the attribute is not set
+        if attr in self.attrs:
+            return self.init.get(attr)
+        raise AttributeError('{} object has no attribute {}'.format(
+            type(self).__name__, attr))
 
 
 class MouseEvent(UIEvent):  # noqa: D204
@@ -152,21 +169,20 @@ class MouseEvent(UIEvent):  # noqa: D204
     `MouseEvent - Web APIs | MDN
     <https://developer.mozilla.org/en-US/docs/Web/API/MouseEvent>`_
     """
-    attrs = ['altKey', 'button', 'clientX', 'clientY', 'ctrlKey', 'metaKey',
-             'movementX', 'movementY', 'offsetX', 'offsetY', 'pageX', 'pageY',
-             'region', 'screenX', 'screenY', 'shiftKey', 'x', 'y']
+    attrs = frozenset((
+        'altKey', 'button', 'clientX', 'clientY', 'ctrlKey', 'metaKey',
+        'movementX', 'movementY', 'offsetX', 'offsetY', 'pageX', 'pageY',
+        'region', 'screenX', 'screenY', 'shiftKey', 'x', 'y'))
 
-    def __init__(self, type: str, init: EventMsgDict = None) -> None:
-        super().__init__(type, init)
-        for attr in self.attrs:
-            setattr(self, attr, self.init.get(attr))
+    @property
+    def relatedTarget(self) -> Optional['WebEventTarget']:
+        """Return secondary target of this event, if any."""
         rt = self.init.get('relatedTarget') or {'id': None}
         rid = rt.get('id')
-        if rid is not None:
-            from wdom.document import getElementByWdomId
-            self.relatedTarget = getElementByWdomId(rid)
-        else:
-            self.relatedTarget = None
+        if rid is None:
+            return None
+        from wdom.document import getElementByWdomId
+        return getElementByWdomId(rid)
 
 
 class DragEvent(MouseEvent):  # noqa: D204
@@ -207,13 +223,8 @@ class KeyboardEvent(UIEvent):  # noqa: D204
     `KeyboardEvent - Web APIs | MDN
     <https://developer.mozilla.org/en-US/docs/Web/API/KeyboardEvent>`_
     """
-    attrs = ['altKey', 'code', 'ctrlKey', 'key', 'locale', 'metaKey', 'repeat',
-             'shiftKey']
-
-    def __init__(self, type: str, init: EventMsgDict = None) -> None:
-        super().__init__(type, init)
-        for attr in self.attrs:
-            setattr(self, attr, self.init.get(attr))
+    attrs = frozenset(('altKey', 'code', 'ctrlKey', 'key', 'locale', 'metaKey',
+                       'repeat', 'shiftKey'))
 
 
 class InputEvent(UIEvent):  # noqa: D204
@@ -263,15 +274,33 @@ class EventListener:
     Acceptable listeners are function, coroutine, and coroutine-function.
     If listener is a coroutine or coroutine-function, it will be executed
     synchronously as if it is normal function.
+
+    ``throttle``, ``debounce`` (seconds), ``passive`` and ``fields`` are
+    options applied on browser, see :meth:`EventTarget.addEventListener`.
     """
 
     # Should support generator?
-    def __init__(self, listener: _EventListenerType) -> None:
+    def __init__(self, listener: _EventListenerType, *,
+                 throttle: float = None, debounce: float = None,
+                 passive: bool = False, fields: Iterable[str] = None
+                 ) -> None:
         """Wrap an event listener.
 
         Event listener should be function or coroutine-function.
         """
+        if throttle is not None and debounce is not None:
+            raise ValueError('Cannot use both throttle and debounce')
+        for value in (throttle, debounce):
+            if value is not None and value <= 0:
+                raise ValueError(
+                    'throttle/debounce must be positive: {}'.format(value))
         self.listener = listener
+        self.throttle = throttle
+        self.debounce = debounce
+        self.passive = passive
+        if isinstance(fields, str):
+            fields = (fields, )
+        self.fields = None if fields is None else frozenset(fields)
         if iscoroutinefunction(self.listener):
             self.action = _wrap_coro_func(self.listener)  # type: ignore
             self._is_coroutine = True
@@ -286,6 +315,51 @@ class EventListener:
         """
         return self.action(event)
 
+    @property
+    def has_options(self) -> bool:
+        """True if any browser option is set."""
+        return (self.throttle is not None or self.debounce is not None or
+                self.passive or self.fields is not None)
+
+
+def _merged_fields(listeners: Iterable[EventListener]) -> Optional[List[str]]:
+    """Return union of fields of listeners, or None if any needs all."""
+    fields = set()  # type: Set[str]
+    for listener in listeners:
+        if listener.fields is None:
+            return None
+        fields |= listener.fields
+    return sorted(fields)
+
+
+def _browser_options(listeners: Iterable[EventListener]
+                     ) -> Dict[str, Union[float, bool, List[str]]]:
+    """Merge options of listeners of an event into options for browser.
+
+    Browser sends events as often as the most frequent listener needs: no
+    limit if any listener has no throttle/debounce, else the shortest
+    throttle (or debounce, if all are debounced). Intervals are converted to
+    milliseconds. Events have the union of fields of the listeners.
+    """
+    listeners = list(listeners)
+    options = {}  # type: Dict[str, Union[float, bool, List[str]]]
+    if all(listener.passive for listener in listeners):
+        options['passive'] = True
+    fields = _merged_fields(listeners)
+    if fields is not None:
+        options['fields'] = fields
+    if any(listener.throttle is None and listener.debounce is None
+           for listener in listeners):
+        return options
+    throttles = [listener.throttle for listener in listeners
+                 if listener.throttle is not None]
+    if throttles:
+        options['throttle'] = min(throttles) * 1000
+    else:
+        options['debounce'] = min(
+            listener.debounce for listener in listeners) * 1000
+    return options
+
 
 class EventTarget:
     """Base class for EventTargets.
@@ -293,7 +367,8 @@ class EventTarget:
     This class and subclasses can add/remove event listeners and emit events.
     """
 
-    _event_listeners = None  # type: MutableMapping[str, List[EventListener]]
+    # created when the first listener is added
+    _event_listeners = None  # type: Optional[Dict[str, List[EventListener]]]
 
     @property
     def ownerDocument(self) -> Optional[Node]:
@@ -303,13 +378,18 @@ class EventTarget:
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         # need to call super().__init__ to use as mixin class
         super().__init__(*args, **kwargs)  # type: ignore
-        self._event_listeners = defaultdict(list)
-
-    def _add_event_listener(self, event: str, listener: _EventListenerType
-                            ) -> None:
-        self._event_listeners[event].append(EventListener(listener))
-
-    def addEventListener(self, event: str, listener: _EventListenerType
+        self._event_listeners = None
+
+    def _add_event_listener(self, event: str, listener: _EventListenerType,
+                            **options: Any) -> None:
+        if self._event_listeners is None:
+            self._event_listeners = {}
+        self._event_listeners.setdefault(event, []).append(
+            EventListener(listener, **options))
+
+    def addEventListener(self, event: str, listener: _EventListenerType, *,
+                         throttle: float = None, debounce: float = None,
+                         passive: bool = False, fields: Iterable[str] = None
                          ) -> None:
         """Add event listener to this node.
 
@@ -317,20 +397,46 @@ class EventTarget:
         listener called. Acceptable events are same as JavaScript, without
         ``on``. For example, to add a listener which is called when this node
         is clicked, event is ``'click``.
+
+        Options are applied on browser, so that suppressed events are not sent
+        to the server:
+
+        * ``throttle``: send the event at most once per this seconds. The last
+          event is always sent.
+        * ``debounce``: send the event only after no event occurs for this
+          seconds.
+        * ``passive``: add the listener on browser as passive, which never
+          cancels the event (good for ``scroll``, ``wheel`` and ``touch*``).
+        * ``fields``: names of event attributes the listener uses, like
+          ``['clientX', 'clientY']``. Browser sends only them (and the
+          targets), and other attributes of the event are None. By default,
+          all attributes are sent.
+
+        Browser has one listener per event type of each node. If listeners
+        have different options, events are sent as often as the most
+        frequent one needs with the union of their fields, and ``passive`` is
+        used only if all listeners are passive.
         """
-        self._add_event_listener(event, listener)
+        self._add_event_listener(event, listener, throttle=throttle,
+                                 debounce=debounce, passive=passive,
+                                 fields=fields)
 
     def _remove_event_listener(self, event: str, listener: _EventListenerType
-                               ) -> None:
-        listeners = self._event_listeners[event]
+                               ) -> Optional[EventListener]:
+        if not self._event_listeners:
+            return None
+        listeners = self._event_listeners.get(event)
         if not listeners:
-            return
+            return None
         for l in listeners:
             if l.listener == listener:
                 listeners.remove(l)
                 break
+        else:
+            return None
         if not listeners:
             del self._event_listeners[event]
+        return l
 
     def removeEventListener(self, event: str, listener: _EventListenerType
                             ) -> None:
@@ -351,7 +457,9 @@ class EventTarget:
         pass
 
     def _dispatch_event(self, event: Event) -> None:
-        for listener in self._event_listeners[event.type]:
+        if not self._event_listeners:
+            return
+        for listener in self._event_listeners.get(event.type, ()):
             listener(event)
 
     def dispatchEvent(self, event: Event) -> None:
@@ -365,6 +473,8 @@ _T_MsgItem = Union[int, str]
 class WebEventTarget(EventTarget):
     """Mixin class for web connection controll."""
 
+    __slots__ = ()
+
     @property
     def wdom_id(self) -> str:
         """Return ID used to relate python node and browser DOM node."""
@@ -378,12 +488,13 @@ class WebEventTarget(EventTarget):
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)  # type: ignore
         self.__reqid = 0
-        self.__tasks = {}  # type: Dict
+        # created when the first query is sent
+        self.__tasks = None  # type: Optional[Dict]
 
     def on_response(self, msg: Dict[str, str]) -> None:
         """Run when get response from browser."""
         response = msg.get('data', False)
-        if response:
+        if response and self.__tasks:
             task = self.__tasks.pop(msg.get('reqid'), False)
             if task and not task.cancelled() and not task.done():
                 task.set_result(msg.get('data'))
@@ -406,6 +517,8 @@ class WebEventTarget(EventTarget):
         if self.connected:
             self.js_exec(query, self.__reqid)
             fut = Future()  # type: Future[str]
+            if self.__tasks is None:
+                self.__tasks = {}
             self.__tasks[self.__reqid] = fut
             self.__reqid += 1
             return fut
@@ -428,24 +541,44 @@ class WebEventTarget(EventTarget):
 
     # Event Handling
     def _add_event_listener_web(self, event: str) -> None:
-        self.js_exec('addEventListener', event)
+        options = _browser_options(self._event_listeners[event])
+        if options:
+            self.js_exec('addEventListener', event, options)  # type: ignore
+        else:
+            self.js_exec('addEventListener', event)
 
-    def addEventListener(self, event: str, listener: _EventListenerType
+    def addEventListener(self, event: str, listener: _EventListenerType, *,
+                         throttle: float = None, debounce: float = None,
+                         passive: bool = False, fields: Iterable[str] = None
                          ) -> None:  # noqa: D102
-        super().addEventListener(event, listener)
+        super().addEventListener(event, listener, throttle=throttle,
+                                 debounce=debounce, passive=passive,
+                                 fields=fields)
         if self.connected:
             self._add_event_listener_web(event)
 
     def _remove_event_listener_web(self, event: str) -> None:
-        if event not in self._event_listeners:
+        if not self._event_listeners or event not in self._event_listeners:
             self.js_exec('removeEventListener', event)  # type: ignore
 
     def removeEventListener(self, event: str, listener: _EventListenerType
                             ) -> None:  # noqa: D102
-        super().removeEventListener(event, listener)
-        if self.connected:
+        removed = self._remove_event_listener(event, listener)
+        if not self.connected:
+            return
+        if event not in (self._event_listeners or ()):
             self._remove_event_listener_web(event)
+        elif removed is not None:
+            # merged options of the remaining listeners may change (browser
+            # ignores the same options)
+            self._add_event_listener_web(event)
 
     def _on_mount(self, e: Event) -> None:
-        for event in self._event_listeners:
+        for event in self._event_listeners or ():
             self._add_event_listener_web(event=event)
+
+    def _dispatch_event(self, event: Event) -> None:
+        # class-level hook instead of a ``mount`` listener on every node
+        if event.type == 'mount':
+            self._on_mount(event)
+        super()._dispatch_event(event)
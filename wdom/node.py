@@ -3,15 +3,24 @@
 
 """Node related basic interface/classes."""
 
+import asyncio
+from asyncio import ensure_future, iscoroutine
+from copy import copy
 import html
+from itertools import count
 import logging
 from typing import TYPE_CHECKING
-from typing import Any, Iterator, Optional, Sequence, Union
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+from typing import Sequence, Tuple, Union
+from weakref import WeakSet, ref
 
 from xml.dom import Node as _Node
 
+from wdom.traversal import NodeFilter, iter_descendants
+from wdom.traversal import _node_iterators, _pre_remove
+
 if TYPE_CHECKING:
-    from typing import List  # noqa
+    from typing import Dict  # noqa
     from wdom.element import Element  # noqa
 
 logger = logging.getLogger(__name__)
@@ -20,6 +29,8 @@ logger = logging.getLogger(__name__)
 class AbstractNode(_Node):
     """Abstract Base Class for Node classes."""
 
+    __slots__ = ()
+
     # DOM Level 1
     nodeType = None
     nodeName = ''
@@ -39,9 +50,31 @@ class AbstractNode(_Node):
     _should_escape_text = False
 
 
+def _find_child(children: List['Node'], node: 'Node', hint: int) -> int:
+    """Return index of ``node`` in ``children``, searching around ``hint``.
+
+    The search range is widened until the node is found. Each search runs
+    ``list.index``, so nodes are not renumbered in Python.
+    """
+    width = 16
+    while True:
+        start = max(0, hint - width)
+        stop = min(len(children), hint + width)
+        try:
+            return children.index(node, start, stop)
+        except ValueError:
+            if start == 0 and stop == len(children):
+                raise
+        width *= 8
+
+
 class Node(AbstractNode):
     """Base Class for Node interface."""
 
+    __slots__ = ('__weakref__', '__children', '__parent', '__index',
+                 '__previous', '__next', '__child_nodes', '__owner_document',
+                 '_html_cache')
+
     @property
     def connected(self) -> bool:
         """When this instance has any connection, return True."""
@@ -54,7 +87,19 @@ class Node(AbstractNode):
         """
         super().__init__()  # Need to call init in multiple inheritce
         self.__children = list()  # type: List[Node]
-        self.__parent = None
+        self.__parent = None  # type: Optional[AbstractNode]
+        # Last known position of this node in child nodes of the parent
+        # node. It may be outdated by insertion/removal of preceding nodes,
+        # and is checked (and updated) when required.
+        self.__index = 0
+        # sibling nodes
+        self.__previous = None  # type: Optional[Node]
+        self.__next = None  # type: Optional[Node]
+        self.__child_nodes = None  # type: Optional[NodeList]
+        # Updated when this node (or its ancestor) is inserted/removed
+        self.__owner_document = None  # type: Optional[AbstractNode]
+        # cached html representation, cleared when this node is changed
+        self._html_cache = None  # type: Optional[str]
         if parent:
             parent.appendChild(self)
 
@@ -67,7 +112,7 @@ class Node(AbstractNode):
         return self.length
 
     def __contains__(self, other: AbstractNode) -> bool:
-        return other in self.__children
+        return isinstance(other, Node) and other.__parent is self
 
     # DOM Level 1
     @property
@@ -91,7 +136,10 @@ class Node(AbstractNode):
         but not support any modification. NodeList is a **live object**, which
         means that changes on this node is reflected to the object.
         """
-        return NodeList(self.__children)
+        child_nodes = self.__child_nodes
+        if child_nodes is None:
+            child_nodes = self.__child_nodes = NodeList(self.__children)
+        return child_nodes
 
     @property
     def firstChild(self) -> Optional[AbstractNode]:
@@ -119,10 +167,7 @@ class Node(AbstractNode):
 
         If there is no previous sibling, return ``None``.
         """
-        parent = self.parentNode
-        if parent is None:
-            return None
-        return parent.childNodes.item(parent.childNodes.index(self) - 1)
+        return self.__previous
 
     @property
     def nextSibling(self) -> Optional[AbstractNode]:
@@ -130,10 +175,7 @@ class Node(AbstractNode):
 
         If there is no next sibling, return ``None``.
         """
-        parent = self.parentNode
-        if parent is None:
-            return None
-        return parent.childNodes.item(parent.childNodes.index(self) + 1)
+        return self.__next
 
     # DOM Level 2
     @property
@@ -148,21 +190,110 @@ class Node(AbstractNode):
         """
         if self.nodeType == Node.DOCUMENT_NODE:
             return self
-        elif self.parentNode:
-            return self.parentNode.ownerDocument
-        return None
+        return self.__owner_document
+
+    @staticmethod
+    def _set_owner_document(node: 'Node', doc: Optional[AbstractNode]
+                            ) -> None:
+        """Set owner document of ``node`` and its descendants to ``doc``.
+
+        Nodes are removed from indexes of the old document, and added to the
+        indexes of ``doc``.
+        """
+        old_doc = node.__owner_document
+        if old_doc is doc:
+            # descendants always have the same owner document
+            return
+        nodes = []  # type: List[Node]
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            node.__owner_document = doc
+            nodes.append(node)
+            stack.extend(node.__children)
+        if old_doc is not None:
+            old_doc._unindex_nodes(nodes)  # type: ignore
+        if doc is not None:
+            doc._index_nodes(nodes)  # type: ignore
+
+    def _changed(self) -> None:
+        """Notify that this node (or its subtree) is changed.
+
+        Called when html representation of this node may be changed. Clear
+        cached html of this node and its ancestors, and notify the owner
+        document.
+        """
+        from wdom.element import _has_plain_html
+        node = self  # type: Optional[AbstractNode]
+        while node is not None:
+            if node._html_cache is not None:
+                node._html_cache = None
+            elif _has_plain_html(type(node)):
+                # html of ancestors is never cached without caching html of
+                # this node, so they don't have cache too
+                break
+            node = node.parentNode
+        doc = self.ownerDocument
+        if doc is not None:
+            doc._change_count += 1  # type: ignore
+
+    def _child_index(self, node: 'Node') -> int:
+        """Return index of the child ``node``.
+
+        The last known position of the node is checked first. If it is
+        outdated, the node is searched around there, since the position is
+        shifted only by nodes inserted/removed before it. So this takes
+        constant time unless many preceding nodes were changed.
+        """
+        children = self.__children
+        index = node.__index
+        if index < len(children) and children[index] is node:
+            return index
+        if node.__next is None:
+            index = len(children) - 1
+        elif node.__previous is None:
+            index = 0
+        else:
+            index = _find_child(children, node, index)
+        node.__index = index
+        return index
+
+    def _link_siblings(self, nodes: Sequence['Node'],
+                       next_node: Optional['Node']) -> None:
+        """Link ``nodes`` inserted before ``next_node`` (or at the last)."""
+        if next_node is None:
+            previous = self.__children[-1] if self.__children else None
+        else:
+            previous = next_node.__previous
+        for node in nodes:
+            node.__previous = previous
+            if previous is not None:
+                previous.__next = node
+            previous = node
+        previous.__next = next_node
+        if next_node is not None:
+            next_node.__previous = previous
 
     # Methods
     def _append_document_fragment(self, node: AbstractNode) -> AbstractNode:
-        for c in tuple(node.childNodes):
+        children = tuple(node.childNodes)
+        node._empty()
+        for c in children:
             self._append_child(c)
         return node
 
     def _append_element(self, node: AbstractNode) -> AbstractNode:
         if node.parentNode:
             node.parentNode.removeChild(node)
-        self.__children.append(node)
+        children = self.__children
+        self._link_siblings((node, ), None)
+        node.__index = len(children)
+        children.append(node)
         node.__parent = self
+        self._set_owner_document(node, self.ownerDocument)
+        self._changed()
+        if _registrations:
+            self._queue_child_list((node, ), ())
         return node
 
     def _append_child(self, node: AbstractNode) -> AbstractNode:
@@ -184,8 +315,8 @@ class Node(AbstractNode):
 
         If the node is not a child of this node, raise ``ValueError``.
         """
-        if node in self.childNodes:
-            return self.childNodes.index(node)
+        if isinstance(node, Node) and node.__parent is self:
+            return self._child_index(node)
         elif isinstance(node, Text):
             for i, n in enumerate(self.childNodes):
                 # should consider multiple match?
@@ -196,16 +327,37 @@ class Node(AbstractNode):
     def _insert_document_fragment_before(self, node: AbstractNode,
                                          ref_node: AbstractNode
                                          ) -> AbstractNode:
-        for c in tuple(node.childNodes):
-            self._insert_before(c, ref_node)
+        index = self.index(ref_node)
+        children = tuple(node.childNodes)
+        node._empty()
+        if not children:
+            return node
+        self._link_siblings(children, ref_node)
+        # insert all at once, not to shift following nodes one by one
+        self.__children[index:index] = children
+        doc = self.ownerDocument
+        for i, c in enumerate(children, index):
+            c.__parent = self
+            c.__index = i
+            self._set_owner_document(c, doc)
+        self._changed()
+        if _registrations and children:
+            self._queue_child_list(children, ())
         return node
 
     def _insert_element_before(self, node: AbstractNode,
                                ref_node: AbstractNode) -> AbstractNode:
         if node.parentNode:
             node.parentNode.removeChild(node)
-        self.__children.insert(self.index(ref_node), node)
+        index = self.index(ref_node)
+        self._link_siblings((node, ), ref_node)
+        self.__children.insert(index, node)
+        node.__index = index
         node.__parent = self
+        self._set_owner_document(node, self.ownerDocument)
+        self._changed()
+        if _registrations:
+            self._queue_child_list((node, ), ())
         return node
 
     def _insert_before(self, node: AbstractNode, ref_node:
@@ -226,15 +378,37 @@ class Node(AbstractNode):
 
     def hasChildNodes(self) -> bool:
         """Return True if this node has child nodes, otherwise return False."""
-        return bool(self.childNodes)
+        return bool(self.__children)
 
     def _remove_child(self, node: AbstractNode) -> AbstractNode:
-        if node not in self.__children:
+        if node not in self:
             raise ValueError('node to be removed is not a child of this node.')
-        self.__children.remove(node)
+        if _node_iterators:
+            _pre_remove(node)
+        if _registrations:
+            self._queue_child_list((), (node, ))
+            _add_transient_registrations(node, self)
+        self._changed()
+        del self.__children[self._child_index(node)]
+        previous, next_node = node.__previous, node.__next
+        if previous is not None:
+            previous.__next = next_node
+        if next_node is not None:
+            next_node.__previous = previous
+        node.__previous = node.__next = None
         node.__parent = None
+        self._set_owner_document(node, None)
         return node
 
+    def _queue_child_list(self, added: Sequence['Node'],
+                          removed: Sequence['Node']) -> None:
+        # queue childList mutation record, with siblings of the changed nodes
+        nodes = added or removed
+        _queue_mutation('childList', self, addedNodes=added,
+                        removedNodes=removed,
+                        previousSibling=nodes[0].previousSibling,
+                        nextSibling=nodes[-1].nextSibling)
+
     def removeChild(self, node: AbstractNode) -> AbstractNode:
         """Remove a node from this node.
 
@@ -282,7 +456,8 @@ class Node(AbstractNode):
         return self.cloneNode(True)
 
     def _empty(self) -> None:
-        for child in tuple(self.__children):
+        # remove from the last, not to shift remaining nodes
+        for child in reversed(tuple(self.__children)):
             self._remove_child(child)
 
     def empty(self) -> None:
@@ -293,7 +468,22 @@ class Node(AbstractNode):
         self._empty()
 
     def _get_text_content(self) -> str:
-        return ''.join(child.textContent for child in self.childNodes)
+        parts = []  # type: List[str]
+
+        def accept(node: AbstractNode) -> int:
+            kind = _text_kinds.get(type(node)) or _text_kind(type(node))
+            if kind is _TEXT_DATA:
+                return NodeFilter.FILTER_ACCEPT
+            if kind is _TEXT_CHILDREN:
+                return NodeFilter.FILTER_SKIP
+            # custom text content, which includes its descendants. Nodes are
+            # filtered lazily, so this is still in document order.
+            parts.append(node.textContent)
+            return NodeFilter.FILTER_REJECT
+
+        for node in iter_descendants(self, NodeFilter.SHOW_ALL, accept):
+            parts.append(node.data)  # type: ignore
+        return ''.join(parts)
 
     def _set_text_content(self, value: str) -> None:
         self._empty()
@@ -315,6 +505,33 @@ class Node(AbstractNode):
         self._set_text_content(value)
 
 
+_TEXT_DATA = 'data'
+_TEXT_CHILDREN = 'children'
+_TEXT_OTHER = 'other'
+_text_kinds = {}  # type: Dict[type, str]
+
+
+def _text_kind(cls: type) -> str:
+    """Return how to get text content of nodes of ``cls``.
+
+    ``_TEXT_DATA`` means it's the data of the node, ``_TEXT_CHILDREN`` means
+    it's the text of child nodes, and ``_TEXT_OTHER`` means custom one.
+    """
+    kind = _text_kinds.get(cls)
+    if kind is None:
+        getter = getattr(getattr(cls, 'textContent', None), 'fget', None)
+        if getter is not Node.textContent.fget:  # type: ignore
+            kind = _TEXT_OTHER
+        elif cls._get_text_content is CharacterData._get_text_content:  # type: ignore # noqa: E501
+            kind = _TEXT_DATA
+        elif cls._get_text_content is Node._get_text_content:  # type: ignore
+            kind = _TEXT_CHILDREN
+        else:
+            kind = _TEXT_OTHER
+        _text_kinds[cls] = kind
+    return kind
+
+
 class NodeList(Sequence[Node]):
     """Collection of Node objects."""
 
@@ -333,8 +550,7 @@ class NodeList(Sequence[Node]):
         return other in self.__nodes
 
     def __iter__(self) -> Iterator[AbstractNode]:
-        for n in self.__nodes:
-            yield n
+        return iter(self.__nodes)
 
     @property
     def length(self) -> int:
@@ -398,6 +614,8 @@ class ParentNode(AbstractNode):
     This class is inherited by Document, DocumentFragment, and Element class.
     """
 
+    __slots__ = ()
+
     @property
     def children(self) -> NodeList:
         """Return list of child nodes.
@@ -446,19 +664,19 @@ class ParentNode(AbstractNode):
 class NonDocumentTypeChildNode(AbstractNode):
     """Mixin class for ``CharacterData`` and ``DocumentType`` class."""
 
+    __slots__ = ()
+
     @property
     def previousElementSibling(self) -> Optional[AbstractNode]:
         """Previous Element Node.
 
         If this node has no previous element node, return None.
         """
-        if self.parentNode is None:
-            return None
-        siblings = self.parentNode.childNodes
-        for i in range(siblings.index(self), 0, -1):
-            n = siblings[i-1]
-            if n.nodeType == Node.ELEMENT_NODE:
-                return n
+        node = self.previousSibling
+        while node is not None:
+            if node.nodeType == Node.ELEMENT_NODE:
+                return node
+            node = node.previousSibling
         return None
 
     @property
@@ -467,13 +685,11 @@ class NonDocumentTypeChildNode(AbstractNode):
 
         If this node has no next element node, return None.
         """
-        if self.parentNode is None:
-            return None
-        siblings = self.parentNode.childNodes
-        for i in range(siblings.index(self) + 1, len(siblings)):
-            n = siblings[i]
-            if n.nodeType == Node.ELEMENT_NODE:
-                return n
+        node = self.nextSibling
+        while node is not None:
+            if node.nodeType == Node.ELEMENT_NODE:
+                return node
+            node = node.nextSibling
         return None
 
 
@@ -484,6 +700,8 @@ class ChildNode(AbstractNode):
     (super class of Text, Comment, and RawHtml) classes.
     """
 
+    __slots__ = ()
+
     def before(self, *nodes: Union[AbstractNode, str]) -> None:
         """Insert nodes before this node.
 
@@ -530,14 +748,30 @@ class CharacterData(Node, ChildNode, NonDocumentTypeChildNode):
     This class is a super class of ``Text`` and ``Comment``.
     """
 
+    __slots__ = ('_data', )
+
     # DOM Level 1
     firstChild = None
     lastChild = None
     specified = False
 
     def __init__(self, text: str='', parent: Node = None) -> None:  # noqa
+        # set before appended to the parent
+        self._data = text
         super().__init__(parent=parent)
-        self.data = text
+
+    @property
+    def data(self) -> str:
+        """Text data of this node."""
+        return self._data
+
+    @data.setter
+    def data(self, value: str) -> None:
+        old_value = self._data
+        self._data = value
+        self._changed()
+        if _registrations:
+            _queue_mutation('characterData', self, old_value=old_value)
 
     def _clone_node(self) -> 'CharacterData':
         clone = type(self)(self.data)
@@ -628,6 +862,8 @@ class CharacterData(Node, ChildNode, NonDocumentTypeChildNode):
 class Text(CharacterData):
     """Node class to wrap text contents."""
 
+    __slots__ = ()
+
     nodeType = Node.TEXT_NODE
     nodeName = '#text'
 
@@ -645,6 +881,8 @@ class RawHtml(Text):
     This node is [NOT DOM Standard].
     """
 
+    __slots__ = ()
+
     @property
     def html(self) -> str:
         """Return html representation."""
@@ -654,6 +892,8 @@ class RawHtml(Text):
 class Comment(CharacterData):
     """Comment node class."""
 
+    __slots__ = ()
+
     nodeType = Node.COMMENT_NODE
     nodeName = '#comment'
 
@@ -666,6 +906,8 @@ class Comment(CharacterData):
 class DocumentType(Node, NonDocumentTypeChildNode):
     """DocumentType node class."""
 
+    __slots__ = ('__type', )
+
     nodeType = Node.DOCUMENT_TYPE_NODE
     nodeValue = None
     textContent = None  # type: ignore
@@ -693,6 +935,7 @@ class DocumentType(Node, NonDocumentTypeChildNode):
     @name.setter
     def name(self, name: str) -> None:
         self.__type = name
+        self._changed()
 
     @property
     def html(self) -> str:
@@ -703,6 +946,8 @@ class DocumentType(Node, NonDocumentTypeChildNode):
 class DocumentFragment(Node, ParentNode):
     """DocumentFragument node class."""
 
+    __slots__ = ()
+
     nodeType = Node.DOCUMENT_FRAGMENT_NODE
     nodeName = '#document-fragment'
     parentNode = None
@@ -713,4 +958,322 @@ class DocumentFragment(Node, ParentNode):
     @property
     def html(self) -> str:
         """Return html representation."""
-        return ''.join(child.html for child in self.childNodes)
+        from wdom.element import _serialize_children
+        return _serialize_children(self)
+
+
+class MutationRecord:
+    """Record of a change of DOM tree, passed to ``MutationObserver``.
+
+    ``type`` is one of ``'childList'``, ``'attributes'`` and
+    ``'characterData'``.
+    """
+
+    __slots__ = ('type', 'target', '_added', '_removed', 'previousSibling',
+                 'nextSibling', 'attributeName', 'attributeNamespace',
+                 'oldValue')
+
+    def __init__(self, type: str, target: AbstractNode, *,
+                 addedNodes: Sequence[Node] = (),
+                 removedNodes: Sequence[Node] = (),
+                 previousSibling: AbstractNode = None,
+                 nextSibling: AbstractNode = None,
+                 attributeName: str = None,
+                 oldValue: Any = None) -> None:
+        """Use ``MutationObserver`` to get records."""
+        self.type = type
+        self.target = target
+        self._added = tuple(addedNodes)
+        self._removed = tuple(removedNodes)
+        self.previousSibling = previousSibling
+        self.nextSibling = nextSibling
+        self.attributeName = attributeName
+        self.attributeNamespace = None  # type: Optional[str]
+        self.oldValue = oldValue
+
+    def __repr__(self) -> str:
+        return '<MutationRecord {} of {!r}>'.format(self.type, self.target)
+
+    @property
+    def addedNodes(self) -> NodeList:
+        """Nodes added to the target."""
+        return NodeList(self._added)
+
+    @property
+    def removedNodes(self) -> NodeList:
+        """Nodes removed from the target."""
+        return NodeList(self._removed)
+
+
+class _Registration:
+    """Options of ``MutationObserver.observe()`` on a node."""
+
+    __slots__ = ('observer', 'child_list', 'attributes', 'character_data',
+                 'subtree', 'attribute_old_value', 'character_data_old_value',
+                 'attribute_filter', 'source')
+
+    def __init__(self, observer: 'MutationObserver', **options: Any) -> None:
+        self.observer = observer
+        self.child_list = options['childList']
+        self.attributes = options['attributes']
+        self.character_data = options['characterData']
+        self.subtree = options['subtree']
+        self.attribute_old_value = options['attributeOldValue']
+        self.character_data_old_value = options['characterDataOldValue']
+        attribute_filter = options['attributeFilter']
+        self.attribute_filter = (None if attribute_filter is None
+                                 else frozenset(attribute_filter))
+        # registration which made this transient registration (if any)
+        self.source = None  # type: Optional[_Registration]
+
+    def transient(self) -> '_Registration':
+        """Return copy of this registration, used for removed nodes."""
+        reg = copy(self)
+        reg.source = self
+        return reg
+
+    def keep_old_value(self, type: str, name: Optional[str]
+                       ) -> Optional[bool]:
+        """Return None if not interested in the mutation.
+
+        Otherwise, return whether the old value is recorded or not.
+        """
+        if type == 'attributes':
+            if not self.attributes or (self.attribute_filter is not None and
+                                       name not in self.attribute_filter):
+                return None
+            return bool(self.attribute_old_value)
+        if type == 'characterData':
+            if not self.character_data:
+                return None
+            return bool(self.character_data_old_value)
+        return False if self.child_list else None
+
+
+# Registrations of observed nodes (weak reference to node -> registrations).
+# Mutations are not recorded, and cost almost nothing, while this is empty.
+_registrations = {}  # type: Dict[ref, List[_Registration]]
+# Observers which have records to be delivered
+_pending_observers = []  # type: List[MutationObserver]
+_notify_handle = None  # type: Optional[asyncio.Handle]
+_notify_loop = None  # type: Optional[asyncio.AbstractEventLoop]
+_observer_counter = count()
+
+
+class MutationObserver:
+    """Observer of changes of DOM trees.
+
+    ``callback`` is called with a list of :class:`MutationRecord` and this
+    observer. Records are queued, and delivered at once in the next turn of
+    the event loop. ``callback`` may be a coroutine function.
+
+    .. code-block:: python
+
+        def callback(records, observer):
+            for record in records:
+                print(record.type, record.target)
+
+        observer = MutationObserver(callback)
+        observer.observe(document.body, childList=True, subtree=True)
+    """
+
+    def __init__(self, callback: Callable[[List[MutationRecord],
+                                           'MutationObserver'], Any]
+                 ) -> None:
+        """Make new observer which calls ``callback``."""
+        self._callback = callback
+        self._records = []  # type: List[MutationRecord]
+        # nodes which have registrations (including transient ones)
+        self._nodes = WeakSet()  # type: WeakSet[Node]
+        self._order = next(_observer_counter)
+
+    def observe(self, target: Node, *, childList: bool = False,
+                attributes: bool = None, characterData: bool = None,
+                subtree: bool = False, attributeOldValue: bool = None,
+                characterDataOldValue: bool = None,
+                attributeFilter: Iterable[str] = None) -> None:
+        """Start observing ``target`` (and its descendants if ``subtree``).
+
+        At least one of ``childList``, ``attributes`` and ``characterData``
+        must be True. ``attributes`` (``characterData``) is True by default if
+        ``attributeOldValue`` or ``attributeFilter``
+        (``characterDataOldValue``) is specified. Observing the same node
+        again replaces the options.
+        """
+        attributes, characterData = _check_observer_options(
+            childList, attributes, characterData, attributeOldValue,
+            characterDataOldValue, attributeFilter)
+        reg = _Registration(
+            self, childList=childList, attributes=attributes,
+            characterData=characterData, subtree=subtree,
+            attributeOldValue=attributeOldValue,
+            characterDataOldValue=characterDataOldValue,
+            attributeFilter=attributeFilter,
+        )
+        regs = _get_registrations(target, create=True)
+        for i, old in enumerate(regs):
+            if old.observer is self and old.source is None:
+                self._remove_transients(old)
+                regs[i] = reg
+                break
+        else:
+            regs.append(reg)
+        self._nodes.add(target)
+
+    def disconnect(self) -> None:
+        """Stop observing, and discard queued records."""
+        for node in list(self._nodes):
+            _unregister(node, lambda reg: reg.observer is self)
+        self._nodes.clear()
+        self._records.clear()
+
+    def takeRecords(self) -> List[MutationRecord]:
+        """Return queued records, and empty the queue."""
+        records = self._records
+        self._records = []
+        return records
+
+    def _remove_transients(self, source: _Registration = None) -> None:
+        # remove transient registrations (made from ``source`` if specified)
+        def is_transient(reg: _Registration) -> bool:
+            return reg.observer is self and reg.source is not None and (
+                source is None or reg.source is source)
+        for node in list(self._nodes):
+            _unregister(node, is_transient)
+            if not any(reg.observer is self
+                       for reg in _get_registrations(node)):
+                self._nodes.discard(node)
+
+    def _queue(self, record: MutationRecord) -> None:
+        if not self._records:
+            _pending_observers.append(self)
+        self._records.append(record)
+        _schedule_notify()
+
+
+def _get_registrations(node: AbstractNode, create: bool = False
+                       ) -> List[_Registration]:
+    """Return registrations on ``node`` (empty list if not registered)."""
+    regs = _registrations.get(ref(node))
+    if regs is None:
+        regs = []
+        if create:
+            _registrations[ref(node, _forget_node)] = regs
+    return regs
+
+
+def _forget_node(node_ref: ref) -> None:
+    # called when the observed node is deleted
+    _registrations.pop(node_ref, None)
+
+
+def _check_observer_options(child_list: bool, attributes: Optional[bool],
+                            character_data: Optional[bool],
+                            attribute_old_value: Optional[bool],
+                            character_data_old_value: Optional[bool],
+                            attribute_filter: Optional[Iterable[str]]
+                            ) -> Tuple[bool, bool]:
+    # return ``attributes`` and ``characterData`` options (with defaults)
+    if attributes is None:
+        attributes = (attribute_old_value is not None or
+                      attribute_filter is not None)
+    if character_data is None:
+        character_data = character_data_old_value is not None
+    if not (child_list or attributes or character_data):
+        raise TypeError('One of childList, attributes, or characterData '
+                        'must be True.')
+    if (attribute_old_value or attribute_filter is not None) and \
+            not attributes:
+        raise TypeError('attributeOldValue and attributeFilter require '
+                        'attributes option.')
+    if character_data_old_value and not character_data:
+        raise TypeError('characterDataOldValue requires characterData '
+                        'option.')
+    return attributes, character_data
+
+
+def _unregister(node: Node, cond: Callable[[_Registration], bool]) -> None:
+    """Remove registrations on ``node`` which matches ``cond``."""
+    regs = _get_registrations(node)
+    regs[:] = [reg for reg in regs if not cond(reg)]
+    if not regs:
+        _registrations.pop(ref(node), None)
+
+
+def _queue_mutation(type: str, target: Node, name: str = None,
+                    old_value: Any = None, **kwargs: Any) -> None:
+    """Queue a mutation record to observers of ``target``.
+
+    Callers should check ``_registrations`` is not empty before calling this.
+    """
+    # observer -> recorded old value
+    interested = {}  # type: Dict[MutationObserver, Any]
+    node = target  # type: Optional[AbstractNode]
+    while node is not None:
+        for reg in _get_registrations(node):
+            if node is not target and not reg.subtree:
+                continue
+            keep_old = reg.keep_old_value(type, name)
+            if keep_old is None:
+                continue
+            if keep_old or reg.observer not in interested:
+                interested[reg.observer] = old_value if keep_old else None
+        node = node.parentNode
+    for observer, old in interested.items():
+        observer._queue(MutationRecord(type, target, attributeName=name,
+                                       oldValue=old, **kwargs))
+
+
+def _queue_attribute_mutation(target: AbstractNode, name: str,
+                              old_value: Any) -> None:
+    if _registrations and isinstance(target, Node):
+        _queue_mutation('attributes', target, name, old_value)
+
+
+def _add_transient_registrations(node: Node, parent: AbstractNode) -> None:
+    # keep observing ``node`` removed from observed subtree until notified
+    ancestor = parent  # type: Optional[AbstractNode]
+    while ancestor is not None:
+        for reg in _get_registrations(ancestor):
+            if reg.subtree:
+                _get_registrations(node, create=True).append(reg.transient())
+                reg.observer._nodes.add(node)
+        ancestor = ancestor.parentNode
+
+
+def _schedule_notify() -> None:
+    global _notify_handle, _notify_loop
+    if _notify_handle is None or _notify_loop.is_closed():  # type: ignore
+        _notify_loop = asyncio.get_event_loop()
+        _notify_handle = _notify_loop.call_soon(_notify_observers)
+
+
+def _notify_observers() -> None:
+    """Deliver queued records to observers."""
+    global _notify_handle
+    _notify_handle = None
+    observers = sorted(_pending_observers, key=lambda o: o._order)
+    _pending_observers.clear()
+    for observer in observers:
+        records = observer.takeRecords()
+        observer._remove_transients()
+        if not records:
+            continue
+        try:
+            result = observer._callback(records, observer)
+            if iscoroutine(result):
+                ensure_future(result)
+        except Exception:
+            logger.exception('Error in MutationObserver callback')
+
+
+def _reset_mutation_observers() -> None:
+    """Remove all registrations and queued records."""
+    global _notify_handle
+    for observer in _pending_observers:
+        observer._records.clear()
+    _pending_observers.clear()
+    _registrations.clear()
+    if _notify_handle is not None:
+        _notify_handle.cancel()
+        _notify_handle = None
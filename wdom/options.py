@@ -78,8 +78,54 @@ parser.add_argument(
     ' when --auto-shutdown is enabled (default: 1.0 [sec]).',
 )
 parser.add_argument(
-    '--message-wait', default=0.005, type=float,
-    help='Duration (seconds) to send WS messages (default: 0.005 [sec]).',
+    '--message-wait', default=0.0, type=float,
+    help='Seconds to wait for more WS messages before sending them at once.'
+    ' If 0, send messages on the next event loop iteration'
+    ' (default: 0 [sec]).',
+)
+parser.add_argument(
+    '--message-max-wait', default=0.05, type=float,
+    help='Maximum seconds to delay WS messages while waiting for more'
+    ' messages (default: 0.05 [sec]).',
+)
+parser.add_argument(
+    '--message-high-water', default=5000, type=int,
+    help='Maximum number of WS messages queued for a connection while the'
+    ' client is not receiving them. If 0, no limit (default: 5000).',
+)
+parser.add_argument(
+    '--message-overflow', default='resync', choices=['resync', 'close'],
+    help='Action for a connection which exceeds --message-high-water.'
+    ' `resync` reloads the page on the browser and `close` closes the'
+    ' connection (default: `resync`).',
+)
+parser.add_argument(
+    '--binary-protocol', default=False, action='store_const', const=True,
+    help='Send WS messages to browser as compact binary frames, if the'
+    ' browser supports it (default: False).',
+)
+parser.add_argument(
+    '--ws-compression', default=False, action='store_const', const=True,
+    help='Compress WS messages by permessage-deflate extension, if the'
+    ' browser supports it (default: False).',
+)
+parser.add_argument(
+    '--ws-compression-level', default=6, type=int,
+    help='Compression level of WS messages from 0 (no compression) to 9'
+    ' (best compression). Only affects when used with --ws-compression'
+    ' option (default: 6).',
+)
+parser.add_argument(
+    '--ws-compression-mem-level', default=8, type=int,
+    help='Memory level of WS compression from 1 (minimum memory, slow) to 9'
+    ' (maximum memory, fast). Only affects when used with --ws-compression'
+    ' option (default: 8).',
+)
+parser.add_argument(
+    '--ws-compression-min-size', default=1024, type=int,
+    help='WS messages smaller than this size are sent without compression.'
+    ' Only affects when used with --ws-compression option'
+    ' (default: 1024 [bytes]).',
 )
 parser.add_argument(
     '--open-browser', default=False, action='store_const', const=True,
@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""CSS selector engine used by ``querySelector`` and ``querySelectorAll``.
+
+Selectors are compiled once into :class:`Selector` objects, which are kept in
+an LRU cache (see :func:`compile_selector`). Supported selectors are:
+
+* type (``div``), universal (``*``), id (``#id``), and class (``.class``)
+* attribute: ``[a]``, ``[a=v]``, ``[a~=v]``, ``[a|=v]``, ``[a^=v]``,
+  ``[a$=v]``, ``[a*=v]`` (value may be quoted, and ``i`` flag is allowed)
+* combinators: descendant (`` ``), child (``>``), next-sibling (``+``), and
+  subsequent-sibling (``~``)
+* pseudo-classes: ``:root``, ``:empty``, ``:first-child``, ``:last-child``,
+  ``:only-child``, ``:nth-child()``, ``:nth-last-child()``,
+  ``:first-of-type``, ``:last-of-type``, ``:only-of-type``,
+  ``:nth-of-type()``, ``:nth-last-of-type()``, ``:not()``, ``:checked``,
+  ``:disabled``, and ``:enabled``
+
+Selectors are matched from right to left. Candidates of the rightmost
+compound selector are taken from the id index (``Element._elements_with_id``)
+or the tag/class indexes of the owner document if possible, instead of walking
+all descendant nodes. The id index keeps only the last element created with
+each id, so it is used only when that element is under the root node.
+"""
+
+from functools import lru_cache
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from typing import Tuple
+
+from wdom.element import Element, _iter_elements, _tree_position
+from wdom.node import Node, ParentNode
+
+__all__ = ('Selector', 'compile_selector')
+
+_SelectorCache = Dict[Any, Any]
+_PseudoMatcher = Callable[[Element, _SelectorCache], bool]
+
+# Number of compiled selectors kept in the cache
+CACHE_SIZE = 256
+
+_nmstart = r'_a-zA-Z\u00a0-\uffff'
+_nmchar = r'-_a-zA-Z0-9\u00a0-\uffff'
+_ident_re = re.compile(r'-?[{}][{}]*'.format(_nmstart, _nmchar))
+_name_re = re.compile(r'[{}]+'.format(_nmchar))
+_ws_re = re.compile(r'\s*')
+_string_re = re.compile(r'"([^"]*)"|\'([^\']*)\'')
+_attr_op_re = re.compile(r'[~|^$*]?=')
+_nth_re = re.compile(r'^([-+]?\d*)n\s*(?:([-+])\s*(\d+))?$|^([-+]?\d+)$')
+_form_elements = ('button', 'input', 'select', 'textarea', 'option',
+                  'optgroup', 'fieldset')
+
+
+def _attr_string(value: Any) -> str:
+    # boolean attribute (like ``checked``) is set as True
+    return '' if value is True else str(value)
+
+
+def _match_attr_value(op: str, expected: str, value: str) -> bool:
+    if op == '=':
+        return value == expected
+    elif op == '~=':
+        return expected in value.split()
+    elif op == '|=':
+        return value == expected or value.startswith(expected + '-')
+    elif not expected:
+        # [a^=""], [a$=""], and [a*=""] match nothing
+        return False
+    elif op == '^=':
+        return value.startswith(expected)
+    elif op == '$=':
+        return value.endswith(expected)
+    return expected in value  # *=
+
+
+class _AttrMatcher:
+    """Matcher of an attribute selector (like ``[a^=v]``)."""
+
+    __slots__ = ('name', 'op', 'value', 'ignore_case')
+
+    def __init__(self, name: str, op: str = None, value: str = None,
+                 ignore_case: bool = False) -> None:
+        self.name = name.lower()
+        self.op = op
+        self.value = value.lower() if ignore_case and value else value
+        self.ignore_case = ignore_case
+
+    def __call__(self, elm: Element) -> bool:
+        if not elm.hasAttribute(self.name):
+            return False
+        if self.op is None:
+            return True
+        value = _attr_string(elm.getAttribute(self.name))
+        if self.ignore_case:
+            value = value.lower()
+        return _match_attr_value(self.op, self.value, value)  # type: ignore
+
+
+class _Compound:
+    """Matcher of a compound selector (like ``div.a#b[c]:first-child``)."""
+
+    __slots__ = ('tag', 'id', 'classes', 'attrs', 'pseudos')
+
+    def __init__(self) -> None:
+        self.tag = None  # type: Optional[str]  # upper case
+        self.id = None  # type: Optional[str]
+        self.classes = []  # type: List[str]
+        self.attrs = []  # type: List[_AttrMatcher]
+        self.pseudos = []  # type: List[_PseudoMatcher]
+
+    def match(self, elm: Element, cache: _SelectorCache) -> bool:
+        """Return True if ``elm`` matches this selector."""
+        if self.tag is not None and elm.tagName != self.tag:
+            return False
+        if self.id is not None and elm.getAttribute('id') != self.id:
+            return False
+        if self.classes and not _has_classes(elm, self.classes):
+            return False
+        return self._match_filters(elm, cache)
+
+    def _match_filters(self, elm: Element, cache: _SelectorCache) -> bool:
+        for attr in self.attrs:
+            if not attr(elm):
+                return False
+        for pseudo in self.pseudos:
+            if not pseudo(elm, cache):
+                return False
+        return True
+
+
+def _has_classes(elm: Element, classes: List[str]) -> bool:
+    class_list = elm._class_list
+    if not class_list:
+        return False
+    for class_ in classes:
+        if class_ not in class_list:
+            return False
+    return True
+
+
+class _Complex:
+    """Matcher of a complex selector (compound selectors and combinators).
+
+    Compound selectors are stored from right to left, with the combinator to
+    the next (left) compound selector.
+    """
+
+    __slots__ = ('parts', )
+
+    def __init__(self, parts: List[Tuple[_Compound, Optional[str]]]) -> None:
+        self.parts = parts
+
+    @property
+    def key(self) -> _Compound:
+        """Rightmost compound selector."""
+        return self.parts[0][0]
+
+    def match(self, elm: Element, cache: _SelectorCache) -> bool:
+        """Return True if ``elm`` matches this selector."""
+        return self._match_from(elm, 0, cache)
+
+    def _match_from(self, elm: Element, i: int, cache: _SelectorCache
+                    ) -> bool:
+        compound, combinator = self.parts[i]
+        if not compound.match(elm, cache):
+            return False
+        if combinator is None:
+            return True
+        for other in _combined_elements(elm, combinator):
+            if self._match_from(other, i + 1, cache):
+                return True
+        return False
+
+
+def _combined_elements(elm: Element, combinator: str) -> Iterator[Element]:
+    # elements which may match the compound selector to the left
+    if combinator in ('>', ' '):
+        parent = _parent_element(elm)
+        while parent is not None:
+            yield parent
+            if combinator == '>':
+                break
+            parent = _parent_element(parent)
+    else:
+        prev = elm.previousElementSibling
+        while prev is not None:
+            yield prev
+            if combinator == '+':
+                break
+            prev = prev.previousElementSibling
+
+
+def _parent_element(elm: Node) -> Optional[Element]:
+    parent = elm.parentNode
+    if parent is not None and parent.nodeType == Node.ELEMENT_NODE:
+        return parent  # type: ignore
+    return None
+
+
+class Selector:
+    """Compiled selector list.
+
+    Use :func:`compile_selector` to get (cached) instance of this class.
+    """
+
+    def __init__(self, selectors: str) -> None:
+        """Parse ``selectors``. Raise ``ValueError`` if it's invalid."""
+        self.text = selectors
+        self._complexes = _Parser(selectors).parse()
+
+    def _match_key(self, elm: Element, cache: _SelectorCache) -> bool:
+        # check only the rightmost compound selectors (fast pre-filter)
+        for complex_ in self._complexes:
+            if complex_.key.match(elm, cache):
+                return True
+        return False
+
+    def __repr__(self) -> str:
+        return 'Selector({!r})'.format(self.text)
+
+    def match(self, elm: Element, cache: _SelectorCache = None) -> bool:
+        """Return True if ``elm`` matches this selector."""
+        if cache is None:
+            cache = {}
+        for complex_ in self._complexes:
+            if complex_.match(elm, cache):
+                return True
+        return False
+
+    def _candidates(self, root: ParentNode) -> Optional[List[Element]]:
+        """Return elements which may match, or None if need to walk tree."""
+        result = {}  # type: Dict[int, Element]
+        for complex_ in self._complexes:
+            candidates = _key_candidates(complex_.key, root)
+            if candidates is None:
+                return None
+            for elm in candidates:
+                result[id(elm)] = elm
+        return list(result.values())
+
+    def select(self, root: ParentNode, first: bool = False
+               ) -> List[Element]:
+        """Return descendant elements of ``root`` matching this selector.
+
+        Elements are in document order. If ``first`` is True, return only the
+        first element (if any).
+        """
+        cache = {}  # type: _SelectorCache
+        candidates = self._candidates(root)
+        if candidates is None:
+            return self._walk(root, first, cache)
+        found = []
+        for elm in candidates:
+            if elm is root or not self.match(elm, cache):
+                continue
+            position = _tree_position(elm, root)
+            if position is not None:
+                found.append((position, elm))
+        found.sort(key=lambda item: item[0])
+        return [elm for _, elm in found[:1 if first else None]]
+
+    def _walk(self, root: ParentNode, first: bool, cache: _SelectorCache
+              ) -> List[Element]:
+        result = []
+        if len(self._complexes) == 1:
+            match_key = self._complexes[0].key.match
+        else:
+            match_key = self._match_key
+        for elm in _iter_elements(root):
+            if match_key(elm, cache) and self.match(elm, cache):
+                result.append(elm)
+                if first:
+                    break
+        return result
+
+
+def _key_candidates(compound: _Compound, root: ParentNode
+                    ) -> Optional[Iterable[Element]]:
+    # candidates of the rightmost compound selector from indexes
+    if compound.id is not None:
+        elm = Element._elements_with_id.get(compound.id)
+        # other elements with the same id are not in the index
+        if (elm is not None and elm is not root and
+                _tree_position(elm, root) is not None):
+            return [elm]
+        return None
+    doc = root.ownerDocument
+    if doc is None or not (compound.tag or compound.classes):
+        return None
+    index = doc._element_index  # type: ignore
+    sets = [index.classes.get(c, ()) for c in compound.classes]
+    if compound.tag is not None:
+        sets.append(index.tags.get(compound.tag, ()))
+    return min(sets, key=len)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_selector(selectors: str) -> Selector:
+    """Compile ``selectors`` to :class:`Selector` (cached)."""
+    return Selector(selectors)
+
+
+# Pseudo-classes
+def _element_siblings(elm: Element, cache: _SelectorCache) -> List[Element]:
+    # element siblings (including ``elm``), cached while selecting
+    parent = elm.parentNode
+    if parent is None:
+        return [elm]
+    key = ('siblings', id(parent))
+    siblings = cache.get(key)
+    if siblings is None:
+        siblings = [n for n in parent.childNodes
+                    if n.nodeType == Node.ELEMENT_NODE]
+        cache[key] = siblings
+    return siblings
+
+
+def _element_positions(elm: Element, cache: _SelectorCache, of_type: bool
+                       ) -> Tuple[int, int]:
+    """Return 1-based position of ``elm`` in siblings, and their number."""
+    parent = elm.parentNode
+    key = ('positions', id(parent), of_type and elm.tagName)
+    positions = cache.get(key)
+    if positions is None:
+        siblings = _element_siblings(elm, cache)
+        if of_type:
+            siblings = [n for n in siblings if n.tagName == elm.tagName]
+        positions = ({id(n): i for i, n in enumerate(siblings, 1)},
+                     len(siblings))
+        cache[key] = positions
+    return positions[0][id(elm)], positions[1]
+
+
+def _nth(a: int, b: int, of_type: bool, last: bool) -> _PseudoMatcher:
+    def match(elm: Element, cache: _SelectorCache) -> bool:
+        pos, count = _element_positions(elm, cache, of_type)
+        if last:
+            pos = count - pos + 1
+        if a == 0:
+            return pos == b
+        return (pos - b) % a == 0 and (pos - b) // a >= 0
+    return match
+
+
+def _parse_nth(arg: str) -> Tuple[int, int]:
+    arg = arg.strip().lower()
+    if arg == 'odd':
+        return 2, 1
+    if arg == 'even':
+        return 2, 0
+    m = _nth_re.match(arg)
+    if m is None:
+        raise ValueError('Invalid an+b expression: {}'.format(arg))
+    if m.group(4) is not None:
+        return 0, int(m.group(4))
+    a_str = m.group(1)
+    a = -1 if a_str == '-' else int(a_str) if a_str not in ('', '+') else 1
+    b = int(m.group(3) or 0)
+    if m.group(2) == '-':
+        b = -b
+    return a, b
+
+
+def _is_root(elm: Element, cache: _SelectorCache) -> bool:
+    parent = elm.parentNode
+    return parent is not None and parent.nodeType == Node.DOCUMENT_NODE
+
+
+def _is_empty(elm: Element, cache: _SelectorCache) -> bool:
+    for child in elm.childNodes:
+        if child.nodeType == Node.ELEMENT_NODE:
+            return False
+        if child.nodeType == Node.TEXT_NODE and child.data:  # type: ignore
+            return False
+    return True
+
+
+def _is_checked(elm: Element, cache: _SelectorCache) -> bool:
+    if elm.localName == 'option':
+        return elm.hasAttribute('selected')
+    return elm.localName == 'input' and elm.hasAttribute('checked')
+
+
+def _is_disabled(elm: Element, cache: _SelectorCache) -> bool:
+    return elm.localName in _form_elements and elm.hasAttribute('disabled')
+
+
+def _is_enabled(elm: Element, cache: _SelectorCache) -> bool:
+    return (elm.localName in _form_elements and
+            not elm.hasAttribute('disabled'))
+
+
+def _not(selector: Selector) -> _PseudoMatcher:
+    def match(elm: Element, cache: _SelectorCache) -> bool:
+        return not selector.match(elm, cache)
+    return match
+
+
+_pseudo_classes = {
+    'root': _is_root,
+    'empty': _is_empty,
+    'first-child': _nth(0, 1, False, False),
+    'last-child': _nth(0, 1, False, True),
+    'only-child': lambda e, c: _element_positions(e, c, False)[1] == 1,
+    'first-of-type': _nth(0, 1, True, False),
+    'last-of-type': _nth(0, 1, True, True),
+    'only-of-type': lambda e, c: _element_positions(e, c, True)[1] == 1,
+    'checked': _is_checked,
+    'disabled': _is_disabled,
+    'enabled': _is_enabled,
+}  # type: Dict[str, _PseudoMatcher]
+
+# name -> (of_type, last)
+_nth_pseudo_classes = {
+    'nth-child': (False, False),
+    'nth-last-child': (False, True),
+    'nth-of-type': (True, False),
+    'nth-last-of-type': (True, True),
+}
+
+
+class _Parser:
+    """Parser of selector list."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.pos = 0
+
+    def error(self, msg: str = 'Invalid selector') -> ValueError:
+        return ValueError('{}: {!r} at {}'.format(msg, self.text, self.pos))
+
+    def skip_ws(self) -> bool:
+        m = _ws_re.match(self.text, self.pos)
+        moved = m.end() > self.pos  # type: ignore
+        self.pos = m.end()  # type: ignore
+        return moved
+
+    def peek(self) -> str:
+        return self.text[self.pos:self.pos + 1]
+
+    def read(self, regex: Any, what: str) -> str:
+        m = regex.match(self.text, self.pos)
+        if m is None:
+            raise self.error('Expected {}'.format(what))
+        self.pos = m.end()
+        return m.group(0)
+
+    def parse(self) -> List[_Complex]:
+        """Parse selector list."""
+        result = self.parse_list()
+        if self.pos < len(self.text):
+            raise self.error()
+        return result
+
+    def parse_list(self) -> List[_Complex]:
+        result = [self.parse_complex()]
+        while self.peek() == ',':
+            self.pos += 1
+            result.append(self.parse_complex())
+        return result
+
+    def parse_complex(self) -> _Complex:
+        self.skip_ws()
+        parts = []  # type: List[Tuple[_Compound, Optional[str]]]
+        combinator = None  # type: Optional[str]
+        while True:
+            parts.append((self.parse_compound(), combinator))
+            has_ws = self.skip_ws()
+            c = self.peek()
+            if c in ('>', '+', '~'):
+                self.pos += 1
+                self.skip_ws()
+                combinator = c
+            elif has_ws and c and c not in (',', ')'):
+                combinator = ' '
+            else:
+                break
+        # from right, with the combinator to the left compound selector
+        parts.reverse()
+        return _Complex(parts)
+
+    def parse_compound(self) -> _Compound:
+        compound = _Compound()
+        start = self.pos
+        c = self.peek()
+        if c == '*':
+            self.pos += 1
+        elif _ident_re.match(self.text, self.pos):
+            compound.tag = self.read(_ident_re, 'tag name').upper()
+        while self.parse_subclass(compound):
+            pass
+        if self.pos == start:
+            raise self.error()
+        return compound
+
+    def parse_subclass(self, compound: _Compound) -> bool:
+        """Parse id, class, attribute or pseudo-class selector if any."""
+        c = self.peek()
+        if c not in ('#', '.', '[', ':'):
+            return False
+        self.pos += 1
+        if c == '#':
+            compound.id = self.read(_name_re, 'id')
+        elif c == '.':
+            compound.classes.append(self.read(_ident_re, 'class name'))
+        elif c == '[':
+            compound.attrs.append(self.parse_attr())
+        else:
+            compound.pseudos.append(self.parse_pseudo())
+        return True
+
+    def parse_attr(self) -> _AttrMatcher:
+        self.skip_ws()
+        name = self.read(_ident_re, 'attribute name')
+        self.skip_ws()
+        if self.peek() == ']':
+            self.pos += 1
+            return _AttrMatcher(name)
+        op = self.read(_attr_op_re, 'attribute operator')
+        self.skip_ws()
+        m = _string_re.match(self.text, self.pos)
+        if m is not None:
+            self.pos = m.end()
+            value = m.group(1) if m.group(1) is not None else m.group(2)
+        else:
+            value = self.read(_ident_re, 'attribute value')
+        self.skip_ws()
+        ignore_case = False
+        if self.peek() in ('i', 'I', 's', 'S'):
+            ignore_case = self.peek() in ('i', 'I')
+            self.pos += 1
+            self.skip_ws()
+        if self.peek() != ']':
+            raise self.error('Expected "]"')
+        self.pos += 1
+        return _AttrMatcher(name, op, value, ignore_case)
+
+    def parse_pseudo(self) -> _PseudoMatcher:
+        name = self.read(_ident_re, 'pseudo-class').lower()
+        if name in _pseudo_classes:
+            return _pseudo_classes[name]
+        if self.peek() != '(':
+            raise self.error('Unsupported pseudo-class')
+        self.pos += 1
+        if name == 'not':
+            selector = Selector.__new__(Selector)
+            selector.text = ''
+            selector._complexes = self.parse_list()
+            matcher = _not(selector)  # type: _PseudoMatcher
+        elif name in _nth_pseudo_classes:
+            end = self.text.find(')', self.pos)
+            if end < 0:
+                raise self.error('Expected ")"')
+            a, b = _parse_nth(self.text[self.pos:end])
+            self.pos = end
+            matcher = _nth(a, b, *_nth_pseudo_classes[name])
+        else:
+            raise self.error('Unsupported pseudo-class')
+        self.skip_ws()
+        if self.peek() != ')':
+            raise self.error('Expected ")"')
+        self.pos += 1
+        return matcher
@@ -4,7 +4,6 @@
 """Web server control functions."""
 
 import os
-import json
 import logging
 import asyncio
 from typing import Any
@@ -27,7 +26,6 @@ __all__ = (
 logger = logging.getLogger(__name__)
 _server = None
 server_config = module.server_config
-_msg_queue = []
 
 
 def is_connected() -> bool:
@@ -36,18 +34,19 @@ def is_connected() -> bool:
 
 
 def push_message(msg: dict) -> None:
-    """Push message on the message queue."""
-    _msg_queue.append(msg)
+    """Push message on the message queue of each client connection.
+
+    Each connection sends its queued messages on its own. See
+    :class:`wdom.server.base.MessageQueue` for details.
+    """
+    for conn in module.connections:
+        conn.queue.push(msg)
 
 
 def send_message() -> None:
-    """Send message via WS to all client connections."""
-    if not _msg_queue:
-        return
-    msg = json.dumps(_msg_queue)
-    _msg_queue.clear()
+    """Send queued messages via WS to all client connections now."""
     for conn in module.connections:
-        conn.write_message(msg)
+        conn.queue.flush()
 
 
 def add_static_path(prefix: str, path: str, no_watch: bool = False) -> None:
@@ -68,12 +67,6 @@ def get_app() -> module.Application:
     return module.get_app()
 
 
-async def _message_loop() -> None:
-    while True:
-        send_message()
-        await asyncio.sleep(config.message_wait)
-
-
 def start_server(address: str = None, port: int = None,
                  check_time: int = 500, **kwargs: Any) -> module.HTTPServer:
     """Start web server on ``address:port``.
@@ -98,9 +91,6 @@ def start_server(address: str = None, port: int = None,
     logger.info('Start server on {0}:{1:d}'.format(
         server_config['address'], server_config['port']))
 
-    # start messaging loop
-    asyncio.ensure_future(_message_loop())
-
     if config.open_browser:
         open_browser('http://{}:{}/'.format(server_config['address'],
                                             server_config['port']),
@@ -4,19 +4,26 @@
 """Wrapper module of tornado web server to use WDOM."""
 
 import asyncio
+from contextlib import contextmanager
+import gzip
+import hashlib
 import logging
 import socket
-from typing import Any, TYPE_CHECKING
+from typing import Any, Iterable, Iterator, Union, TYPE_CHECKING
 
+import tornado
 from tornado import web, websocket
 from tornado.httpserver import HTTPServer
 
 from wdom.util import install_asyncio
 from wdom.options import config
+from wdom.server.base import MessageQueue
 from wdom.server.handler import on_websocket_message
+from wdom.server.protocol import BINARY_PROTOCOL, JSON_PROTOCOL
+from wdom.server.protocol import encode_binary, encode_json
 
 if TYPE_CHECKING:
-    from typing import List  # noqa
+    from typing import Dict, List, Optional  # noqa
 
 logger = logging.getLogger(__name__)
 install_asyncio()
@@ -29,24 +36,160 @@ def is_connected() -> bool:
     return any(connections)
 
 
+class _Page:
+    """Encoded html page with its ETag and gzipped body."""
+
+    def __init__(self, html: str) -> None:
+        self.html = html
+        self.body = html.encode('utf-8')
+        self.etag = '"{}"'.format(hashlib.sha1(self.body).hexdigest())
+        self.gzip_body = gzip.compress(
+            self.body, web.GZipContentEncoding.GZIP_LEVEL)
+
+
+_page = None  # type: Optional[_Page]
+
+
+def _get_page(html: str) -> _Page:
+    global _page
+    if _page is None or _page.html != html:
+        _page = _Page(html)
+    return _page
+
+
 class MainHandler(web.RequestHandler):
     """Main handler to serve document of the application."""
 
+    #: Minimum size of html chunks to be flushed while rendering
+    chunk_size = 16 * 1024
+
     def get(self) -> None:
-        """Return whole html representation of the root document."""
+        """Return whole html representation of the root document.
+
+        If the document is changed after the last rendering, send html chunks
+        while rendering it, so that browser can start loading scripts and css
+        files in ``<head>``. Otherwise, send cached html with ETag. If the
+        browser accepts, gzipped body is sent.
+        """
         from wdom.document import get_document
         logger.info('connected')
-        self.write(get_document().build())
+        document = get_document()
+        if document.is_cached():
+            self._write_page(_get_page(document.build()))
+        else:
+            self._write_chunks(document.iter_build())
+
+    def _write_chunks(self, chunks: Iterable[str]) -> None:
+        size = 0
+        for i, chunk in enumerate(chunks):
+            self.write(chunk)
+            size += len(chunk)
+            # the first chunk includes <head>
+            if i == 0 or size >= self.chunk_size:
+                self.flush()
+                size = 0
+
+    def _write_page(self, page: _Page) -> None:
+        self.set_header('Etag', page.etag)
+        self.set_header('Vary', 'Accept-Encoding')
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+        if 'gzip' in self.request.headers.get('Accept-Encoding', ''):
+            self.set_header('Content-Encoding', 'gzip')
+            self.write(page.gzip_body)
+        else:
+            self.write(page.body)
+
+
+# tornado versions [from, to) whose websocket protocol compresses messages by
+# its private ``_compressor`` attribute, when written
+_COMPRESSOR_VERSIONS = ((5, 0), (7, 0))
+
+
+@contextmanager
+def _uncompressed(protocol: Any) -> Iterator[None]:
+    # Send messages on ``protocol`` without compression in this block.
+    # Uncompressed frames are allowed on compressed connection (RFC 7692), but
+    # tornado has no API to send them, so unset its compressor temporarily.
+    # On other tornado versions, messages are compressed as usual.
+    low, high = _COMPRESSOR_VERSIONS
+    compressor = getattr(protocol, '_compressor', None)
+    if compressor is None or not low <= tornado.version_info[:2] < high:
+        yield
+        return
+    protocol._compressor = None
+    try:
+        yield
+    finally:
+        protocol._compressor = compressor
 
 
 class WSHandler(websocket.WebSocketHandler):
     """Handler class of web socket connection."""
 
+    binary = False
+
+    def select_subprotocol(self, subprotocols: 'List[str]'
+                           ) -> 'Optional[str]':
+        """Select wire protocol requested by browser.
+
+        Binary protocol is used only when enabled by ``--binary-protocol``
+        option. Otherwise use JSON.
+        """
+        if config.binary_protocol and BINARY_PROTOCOL in subprotocols:
+            self.binary = True
+            return BINARY_PROTOCOL
+        elif JSON_PROTOCOL in subprotocols:
+            return JSON_PROTOCOL
+        return None
+
+    def get_compression_options(self) -> 'Optional[Dict[str, Any]]':
+        """Enable permessage-deflate if ``--ws-compression`` is set."""
+        if not config.ws_compression:
+            return None
+        return dict(compression_level=config.ws_compression_level,
+                    mem_level=config.ws_compression_mem_level)
+
     def open(self) -> None:
         """Execute when connection open."""
         logger.info('WebSocket OPEN')
+        if self.binary:
+            self.queue = MessageQueue(self._write_binary, self.on_overflow,
+                                      encode_binary)
+        else:
+            self.queue = MessageQueue(self.write_message, self.on_overflow,
+                                      encode_json)
         connections.append(self)
 
+    def _write_binary(self, message: bytes) -> Any:
+        return self.write_message(message, binary=True)
+
+    def write_message(self, message: Union[str, bytes], binary: bool = False
+                      ) -> Any:
+        """Send message to browser.
+
+        Messages smaller than ``--ws-compression-min-size`` bytes are sent
+        without compression, even if compression is enabled.
+        """
+        if isinstance(message, str):
+            # tornado sends encoded text as is
+            message = message.encode('utf-8')
+        if len(message) >= config.ws_compression_min_size:
+            return super().write_message(message, binary=binary)
+        with _uncompressed(self.ws_connection):
+            return super().write_message(message, binary=binary)
+
+    def on_overflow(self) -> None:
+        """Execute when the client falls behind messages."""
+        if config.message_overflow == 'close':
+            self.close()
+        else:
+            # reload page on browser to get current document
+            self.queue.push(dict(target='node', id='window', method='reload',
+                                 params=[]))
+            self.queue.closed = True
+
     def on_message(self, message: str) -> None:
         """Execute when get message from client."""
         on_websocket_message(message)
@@ -62,6 +205,7 @@ class WSHandler(websocket.WebSocketHandler):
     def on_close(self) -> None:
         """Execute when connection closed."""
         logger.info('WebSocket CLOSED')
+        self.queue.close()
         if self in connections:
             # Remove this connection from connection-list
             connections.remove(self)
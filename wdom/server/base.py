@@ -6,17 +6,23 @@
 import sys
 import re
 import copy
+import json
+import asyncio
+import logging
 import pathlib
 import webbrowser
 from webbrowser import _browsers  # type: ignore
-from typing import TYPE_CHECKING
+from typing import Any, Callable, List, TYPE_CHECKING
 
 from tornado import autoreload
 
 from wdom.options import config
+from wdom.server.coalesce import coalesce_messages
 
 if TYPE_CHECKING:
-    from typing import List, Pattern  # noqa
+    from typing import Optional, Pattern  # noqa
+
+logger = logging.getLogger(__name__)
 
 exclude_patterns = [
     r'node_modules',
@@ -72,3 +78,136 @@ def open_browser(url: str, browser: str = None) -> None:
         webbrowser.get(browser).open(url)
     else:
         webbrowser.open(url)
+
+
+class MessageQueue:
+    """Queue of WS messages to be sent to a single client connection.
+
+    Messages are sent as a JSON list. When the queue gets its first message, a
+    flush is scheduled on the event loop. Messages pushed within
+    ``config.message_wait`` seconds of the last one are sent together, but no
+    message waits longer than ``config.message_max_wait`` seconds.
+
+    Only one write is in flight at a time: while the previous message is not
+    flushed to the socket, new messages stay in this queue. If the queue grows
+    beyond ``config.message_high_water`` messages during that, the client is
+    regarded as falling behind; queued messages are discarded and
+    ``on_overflow`` is called.
+    """
+
+    def __init__(self, write: Callable[[Any], Any],
+                 on_overflow: Callable[[], None] = None,
+                 encode: Callable[[List[dict]], Any] = json.dumps) -> None:
+        """Initialize queue.
+
+        :arg write: function to send an encoded message. If it returns a
+            future, next write waits until the future is done.
+        :arg on_overflow: function called when the client falls behind.
+        :arg encode: function to encode list of messages (default: JSON).
+        """
+        self._write = write
+        self._on_overflow = on_overflow
+        self._encode = encode
+        self._queue = []  # type: List[dict]
+        self._loop = None  # type: Optional[asyncio.AbstractEventLoop]
+        self._handle = None  # type: Optional[asyncio.Handle]
+        self._writing = None  # type: Optional[asyncio.Future]
+        self._first_push = 0.0
+        self._last_push = 0.0
+        self._write_start = 0.0
+        self.closed = False
+        #: Number of flushes (writes) done.
+        self.flush_count = 0
+        #: Seconds from the first push of the last flushed batch to its write.
+        self.last_flush_delay = 0.0
+        #: Seconds taken to write the last batch to the socket.
+        self.last_write_time = 0.0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def depth(self) -> int:
+        """Return number of messages waiting to be sent."""
+        return len(self._queue)
+
+    @property
+    def writing(self) -> bool:
+        """Return True if the previous write is not flushed to the socket."""
+        return self._writing is not None and not self._writing.done()
+
+    def _schedule(self) -> None:
+        self._loop = loop = asyncio.get_event_loop()
+        self._last_push = loop.time()
+        if len(self._queue) == 1:
+            self._first_push = self._last_push
+        self._handle = loop.call_later(config.message_wait, self._flush)
+
+    def _flush(self) -> None:
+        now = self._loop.time()
+        deadline = self._first_push + config.message_max_wait
+        if now < deadline and now - self._last_push < config.message_wait:
+            # Messages are still coming, wait for a quiet period
+            delay = min(self._last_push + config.message_wait, deadline) - now
+            self._handle = self._loop.call_later(delay, self._flush)
+            return
+        self._handle = None
+        self.flush()
+
+    def push(self, msg: dict) -> None:
+        """Push message on this queue."""
+        if self.closed:
+            return
+        self._queue.append(msg)
+        if (self.writing and config.message_high_water and
+                len(self._queue) > config.message_high_water):
+            self._overflow()
+        elif self._handle is None or self._loop.is_closed():
+            self._schedule()
+        else:
+            self._last_push = self._loop.time()
+
+    def flush(self) -> None:
+        """Send all queued messages now.
+
+        If the previous write is not finished, messages are sent after it.
+        """
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not self._queue or self.writing:
+            return
+        msg = self._encode(coalesce_messages(self._queue))
+        self._queue.clear()
+        self.flush_count += 1
+        self._write_start = now = self._loop.time()
+        self.last_flush_delay = now - self._first_push
+        fut = self._write(msg)
+        if isinstance(fut, asyncio.Future):
+            self._writing = fut
+            fut.add_done_callback(self._on_written)
+
+    def _on_written(self, fut: asyncio.Future) -> None:
+        self._writing = None
+        self.last_write_time = self._loop.time() - self._write_start
+        if self._queue:
+            self.flush()
+
+    def _overflow(self) -> None:
+        logger.warning('Client falls behind ({} messages queued)'.format(
+            len(self._queue)))
+        self.clear()
+        if self._on_overflow is not None:
+            self._on_overflow()
+
+    def clear(self) -> None:
+        """Discard all queued messages."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._queue.clear()
+
+    def close(self) -> None:
+        """Discard all queued messages and stop accepting new messages."""
+        self.clear()
+        self.closed = True
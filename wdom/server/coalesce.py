@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Remove redundant messages from a batch before sending it to browser.
+
+Messages are split into segments by messages which may read or depend on the
+browser DOM state (like ``eval``, ``click``, or queries). Inside a segment,
+the following messages are removed:
+
+* Messages to a node which is removed later in the segment.
+* Messages which change contents of a node whose contents are replaced later
+  (by ``textContent``, ``innerHTML``, or ``empty``) in the segment.
+* Messages to nodes created by the above (removed) messages.
+* ``setAttribute``/``removeAttribute`` of the same attribute except the last.
+* ``addClass``/``removeClass`` of the same class except the last. Remaining
+  class changes of a node are merged into one ``addClass`` and one
+  ``removeClass``.
+
+Input messages are not modified, since they are shared by all connections.
+"""
+
+import re
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+__all__ = ('coalesce_messages', )
+
+_created_id_re = re.compile(r' wdom_id="([^"]*)"')
+
+_REPLACE_OPS = {'textContent', 'innerHTML', 'empty'}
+_CONTENT_OPS = _REPLACE_OPS | {
+    'insert', 'removeChildById', 'removeChildByIndex', 'replaceChildById',
+    'replaceChildByIndex',
+}
+_NODE_OPS = _CONTENT_OPS | {
+    'setAttribute', 'removeAttribute', 'addClass', 'removeClass',
+    'addEventListener', 'removeEventListener',
+}
+_CLASS_OPS = {'addClass', 'removeClass'}
+_ATTR_OPS = {'setAttribute', 'removeAttribute'}
+# index of html string in params of messages which create nodes
+_HTML_PARAM = {
+    'insert': 1,
+    'insertAdjacentHTML': 1,
+    'innerHTML': 0,
+    'replaceChildById': 0,
+    'replaceChildByIndex': 0,
+}
+_INNER_POSITIONS = {'afterbegin', 'beforeend'}
+
+
+def _is_node_message(msg: dict) -> bool:
+    return msg.get('target') == 'node' and 'id' in msg and 'params' in msg
+
+
+def _is_barrier(msg: dict) -> bool:
+    return not (_is_node_message(msg) and
+                (msg['method'] in _NODE_OPS or
+                 msg['method'] == 'insertAdjacentHTML'))
+
+
+def _changes_content(msg: dict) -> bool:
+    method = msg['method']
+    if method == 'insertAdjacentHTML':
+        return str(msg['params'][0]).lower() in _INNER_POSITIONS
+    return method in _CONTENT_OPS
+
+
+def _removed_id(msg: dict) -> Optional[str]:
+    method = msg['method']
+    if method == 'removeChildById':
+        return msg['params'][0]
+    elif method == 'replaceChildById':
+        return msg['params'][1]
+    return None
+
+
+def _created_ids(msg: dict) -> List[str]:
+    index = _HTML_PARAM.get(msg['method'])
+    if index is None:
+        return []
+    return _created_id_re.findall(str(msg['params'][index]))
+
+
+def _segments(msgs: List[dict]) -> Iterator[Tuple[int, int]]:
+    start = 0
+    for i, msg in enumerate(msgs):
+        if _is_barrier(msg):
+            if start < i:
+                yield start, i
+            start = i + 1
+    if start < len(msgs):
+        yield start, len(msgs)
+
+
+def _overwritten_at(msg: dict, removed: Dict[str, int],
+                    replaced: Dict[str, int]) -> Optional[int]:
+    """Return index of the message which makes ``msg`` redundant."""
+    id = msg['id']
+    if id in removed and (msg['method'] in _NODE_OPS or
+                          _changes_content(msg)):
+        return removed[id]
+    elif id in replaced and _changes_content(msg):
+        return replaced[id]
+    return None
+
+
+def _drop_dead(msgs: List[dict], keep: List[bool], dead: Dict[str, int],
+               start: int, end: int) -> None:
+    """Drop messages to nodes which are never created on browser.
+
+    ``dead`` maps node id to index of the message which would remove the node.
+    """
+    for i in range(start, end):
+        msg = msgs[i]
+        if keep[i] and i < dead.get(msg['id'], -1):
+            keep[i] = False
+            for created in _created_ids(msg):
+                dead.setdefault(created, dead[msg['id']])
+
+
+def _drop_overwritten(msgs: List[dict], keep: List[bool], start: int,
+                      end: int) -> None:
+    """Drop messages to removed nodes or to nodes with replaced contents."""
+    removed = {}  # type: Dict[str, int]
+    replaced = {}  # type: Dict[str, int]
+    dead = {}  # type: Dict[str, int]
+    for i in range(end - 1, start - 1, -1):
+        msg = msgs[i]
+        overwritten_at = _overwritten_at(msg, removed, replaced)
+        if overwritten_at is not None:
+            keep[i] = False
+            # nodes created by this message never exist on browser
+            for created in _created_ids(msg):
+                dead.setdefault(created, overwritten_at)
+            continue
+        removed_id = _removed_id(msg)
+        if removed_id is not None:
+            removed[removed_id] = i
+        if msg['method'] in _REPLACE_OPS:
+            replaced[msg['id']] = i
+    if dead:
+        _drop_dead(msgs, keep, dead, start, end)
+
+
+def _drop_attributes(msgs: List[dict], keep: List[bool], start: int,
+                     end: int) -> None:
+    """Keep only the last change of each attribute."""
+    seen = set()  # type: Set[Tuple[str, str]]
+    for i in range(end - 1, start - 1, -1):
+        msg = msgs[i]
+        if keep[i] and msg['method'] in _ATTR_OPS:
+            key = (msg['id'], msg['params'][0])
+            if key in seen:
+                keep[i] = False
+            seen.add(key)
+
+
+def _merge_classes(msgs: List[dict], keep: List[bool],
+                   replace: Dict[int, List[dict]], start: int, end: int
+                   ) -> None:
+    """Keep only the last change of each class and merge them by node.
+
+    Changes are not merged across setting or removing class attribute.
+    """
+    last = {}  # type: Dict[str, int]
+    changes = {}  # type: Dict[str, Dict[str, str]]
+    merged = set()  # type: Set[str]
+    for i in range(start, end):
+        msg = msgs[i]
+        if not keep[i]:
+            continue
+        if _is_class_attribute(msg):
+            _flush_classes(msg['id'], last, changes, merged, replace)
+        elif msg['method'] in _CLASS_OPS:
+            id = msg['id']
+            if id in last:
+                keep[last[id]] = False
+                merged.add(id)
+            last[id] = i
+            _record_classes(msg, changes.setdefault(id, {}))
+    for id in list(merged):
+        _flush_classes(id, last, changes, merged, replace)
+
+
+def _record_classes(msg: dict, node_changes: Dict[str, str]) -> None:
+    for token in msg['params'][0]:
+        # re-insert to keep order of the last changes
+        node_changes.pop(token, None)
+        node_changes[token] = msg['method']
+
+
+def _is_class_attribute(msg: dict) -> bool:
+    return msg['method'] in _ATTR_OPS and msg['params'][0] == 'class'
+
+
+def _flush_classes(id: str, last: Dict[str, int],
+                   changes: Dict[str, Dict[str, str]], merged: Set[str],
+                   replace: Dict[int, List[dict]]) -> None:
+    # emit merged changes of the node and start a new merge
+    if id in merged:
+        replace[last[id]] = _class_messages(id, changes[id])
+        merged.discard(id)
+    last.pop(id, None)
+    changes.pop(id, None)
+
+
+def _class_messages(id: str, changes: Dict[str, str]) -> List[dict]:
+    msgs = []
+    for method in ('addClass', 'removeClass'):
+        tokens = [t for t, m in changes.items() if m == method]
+        if tokens:
+            msgs.append(dict(method=method, params=(tokens, ),
+                             target='node', id=id))
+    return msgs
+
+
+def coalesce_messages(msgs: List[dict]) -> List[dict]:
+    """Return messages without redundant ones.
+
+    Result has the same effect on browser as ``msgs``.
+    """
+    if len(msgs) < 2:
+        return msgs
+    keep = [True] * len(msgs)
+    replace = {}  # type: Dict[int, List[dict]]
+    for start, end in _segments(msgs):
+        if end - start < 2:
+            continue
+        _drop_overwritten(msgs, keep, start, end)
+        _drop_attributes(msgs, keep, start, end)
+        _merge_classes(msgs, keep, replace, start, end)
+    result = []  # type: List[dict]
+    for i, msg in enumerate(msgs):
+        if i in replace:
+            result.extend(replace[i])
+        elif keep[i]:
+            result.append(msg)
+    return result
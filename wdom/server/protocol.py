@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Wire protocols of WS messages sent from server to browser.
+
+By default messages are sent as a JSON list of message objects. When enabled
+by ``--binary-protocol`` option and the browser supports it, messages are
+encoded to compact binary frames instead. Protocol is selected by WebSocket
+subprotocol negotiation, and falls back to JSON.
+
+Binary frame format (all integers are unsigned LEB128 varints)::
+
+    frame   := VERSION message*
+    message := opcode node_id params    (opcode >= 2)
+             | 1 string node_id params  (method not in METHODS)
+             | 0 string                 (any other message, as JSON)
+    node_id := 0 string | 1 (document) | 2 (window) | n + 3 (numeric id n)
+    params  := count value*
+    value   := 0 (null) | 1 (false) | 2 (true) | 3 string | 4 uint | 5 uint
+               (negative int) | 6 float64-le | 7 count value* (list)
+               | 8 string (JSON)
+    string  := length utf-8-bytes
+
+``METHODS`` must be kept in sync with ``wdom.js``.
+"""
+
+import json
+import re
+import struct
+from functools import lru_cache
+from collections import OrderedDict
+from typing import Any, List, Sequence, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Callable, Dict  # noqa
+
+__all__ = (
+    'BINARY_PROTOCOL',
+    'JSON_PROTOCOL',
+    'METHODS',
+    'decode_binary',
+    'encode_binary',
+    'encode_json',
+)
+
+JSON_PROTOCOL = 'wdom-json'
+BINARY_PROTOCOL = 'wdom-binary-1'
+VERSION = 1
+
+METHODS = (
+    'addEventListener',
+    'removeEventListener',
+    'insert',
+    'insertAdjacentHTML',
+    'textContent',
+    'innerHTML',
+    'outerHTML',
+    'removeChildById',
+    'removeChildByIndex',
+    'replaceChildById',
+    'replaceChildByIndex',
+    'removeAttribute',
+    'setAttribute',
+    'addClass',
+    'removeClass',
+    'empty',
+    'getBoundingClientRect',
+    'click',
+    'scroll',
+    'scrollTo',
+    'scrollBy',
+    'scrollX',
+    'scrollY',
+    'eval',
+    'reload',
+    'moveChildById',
+)
+_OP_JSON = 0
+_OP_METHOD_NAME = 1
+_OP_OFFSET = 2
+_opcodes = {m: i + _OP_OFFSET for i, m in enumerate(METHODS)}
+
+_ID_STRING = 0
+_special_ids = {'document': 1, 'window': 2}
+_special_ids_rev = {v: k for k, v in _special_ids.items()}
+_ID_OFFSET = 3
+_MAX_SAFE_ID = 2 ** 53 - 1 - _ID_OFFSET  # JS Number.MAX_SAFE_INTEGER
+_numeric_id_re = re.compile(r'[1-9][0-9]*\Z')
+
+_NULL, _FALSE, _TRUE, _STR, _UINT, _NINT, _FLOAT, _LIST, _JSON = range(9)
+_float = struct.Struct('<d')
+
+
+def encode_json(msgs: List[dict]) -> str:
+    """Encode messages to a JSON string."""
+    return json.dumps(msgs)
+
+
+def _varint(buf: bytearray, n: int) -> None:
+    while n > 0x7f:
+        buf.append((n & 0x7f) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def _varint_bytes(n: int) -> bytes:
+    buf = bytearray()
+    _varint(buf, n)
+    return bytes(buf)
+
+
+def _string(buf: bytearray, s: str) -> None:
+    b = s.encode('utf-8')
+    n = len(b)
+    if n < 0x80:
+        buf.append(n)
+    else:
+        _varint(buf, n)
+    buf += b
+
+
+_opcode_bytes = {m: _varint_bytes(op) for m, op in _opcodes.items()}
+
+
+@lru_cache(maxsize=4096)
+def _node_id(id: str) -> bytes:
+    if id in _special_ids:
+        return bytes((_special_ids[id], ))
+    elif _numeric_id_re.match(id) and int(id) <= _MAX_SAFE_ID:
+        return _varint_bytes(int(id) + _ID_OFFSET)
+    buf = bytearray((_ID_STRING, ))
+    _string(buf, id)
+    return bytes(buf)
+
+
+def _str_value(buf: bytearray, v: str) -> None:
+    buf.append(_STR)
+    _string(buf, v)
+
+
+def _none_value(buf: bytearray, v: None) -> None:
+    buf.append(_NULL)
+
+
+def _bool_value(buf: bytearray, v: bool) -> None:
+    buf.append(_TRUE if v else _FALSE)
+
+
+def _int_value(buf: bytearray, v: int) -> None:
+    if v >= 0:
+        buf.append(_UINT)
+        _varint(buf, v)
+    else:
+        buf.append(_NINT)
+        _varint(buf, -v)
+
+
+def _float_value(buf: bytearray, v: float) -> None:
+    buf.append(_FLOAT)
+    buf += _float.pack(v)
+
+
+def _list_value(buf: bytearray, v: Sequence) -> None:
+    buf.append(_LIST)
+    _varint(buf, len(v))
+    for item in v:
+        _value(buf, item)
+
+
+def _other_value(buf: bytearray, v: Any) -> None:
+    for cls, encoder in _value_encoders.items():
+        if isinstance(v, cls):
+            encoder(buf, v)
+            return
+    buf.append(_JSON)
+    _string(buf, json.dumps(v))
+
+
+_value_encoders = OrderedDict((
+    (str, _str_value),
+    (type(None), _none_value),
+    (bool, _bool_value),
+    (int, _int_value),
+    (float, _float_value),
+    (list, _list_value),
+    (tuple, _list_value),
+))  # type: OrderedDict[type, Callable[[bytearray, Any], None]]
+
+
+def _value(buf: bytearray, v: Any) -> None:
+    _value_encoders.get(type(v), _other_value)(buf, v)
+
+
+def _is_node_message(msg: dict) -> bool:
+    return (msg.get('target') == 'node' and len(msg) == 4 and
+            isinstance(msg.get('id'), str) and
+            isinstance(msg.get('method'), str) and
+            isinstance(msg.get('params'), (list, tuple)))
+
+
+def encode_binary(msgs: List[dict]) -> bytes:
+    """Encode messages to a binary frame."""
+    buf = bytearray((VERSION, ))
+    for msg in msgs:
+        if not _is_node_message(msg):
+            buf.append(_OP_JSON)
+            _string(buf, json.dumps(msg))
+            continue
+        method = msg['method']
+        if method in _opcode_bytes:
+            buf += _opcode_bytes[method]
+        else:
+            buf.append(_OP_METHOD_NAME)
+            _string(buf, method)
+        buf += _node_id(msg['id'])
+        params = msg['params']
+        _varint(buf, len(params))
+        for p in params:
+            _value(buf, p)
+    return bytes(buf)
+
+
+class _Reader:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+
+    def varint(self) -> int:
+        n = shift = 0
+        while True:
+            b = self.data[self.pos]
+            self.pos += 1
+            n |= (b & 0x7f) << shift
+            shift += 7
+            if not b & 0x80:
+                return n
+
+    def string(self) -> str:
+        length = self.varint()
+        s = self.data[self.pos:self.pos + length].decode('utf-8')
+        self.pos += length
+        return s
+
+    def node_id(self) -> str:
+        n = self.varint()
+        if n == _ID_STRING:
+            return self.string()
+        elif n in _special_ids_rev:
+            return _special_ids_rev[n]
+        return str(n - _ID_OFFSET)
+
+    def float64(self) -> float:
+        v = _float.unpack_from(self.data, self.pos)[0]
+        self.pos += _float.size
+        return v
+
+    def sequence(self) -> List[Any]:
+        return [self.value() for _ in range(self.varint())]
+
+    def json_value(self) -> Any:
+        return json.loads(self.string())
+
+    def value(self) -> Any:
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag in _constants:
+            return _constants[tag]
+        return _value_readers[tag](self)
+
+    def message(self) -> dict:
+        op = self.varint()
+        if op == _OP_JSON:
+            return json.loads(self.string())
+        elif op == _OP_METHOD_NAME:
+            method = self.string()
+        else:
+            method = METHODS[op - _OP_OFFSET]
+        id = self.node_id()
+        params = [self.value() for _ in range(self.varint())]
+        return dict(target='node', id=id, method=method, params=params)
+
+
+_constants = {_NULL: None, _FALSE: False, _TRUE: True}
+_value_readers = {
+    _STR: _Reader.string,
+    _UINT: _Reader.varint,
+    _NINT: lambda r: -r.varint(),
+    _FLOAT: _Reader.float64,
+    _LIST: _Reader.sequence,
+    _JSON: _Reader.json_value,
+}  # type: Dict[int, Callable[[_Reader], Any]]
+
+
+def decode_binary(data: bytes) -> List[dict]:
+    """Decode a binary frame to messages.
+
+    Mainly used for testing and debugging. Tuples in params are decoded as
+    lists.
+    """
+    if data[0] != VERSION:
+        raise ValueError('Unsupported protocol version: {}'.format(data[0]))
+    reader = _Reader(data)
+    reader.pos = 1
+    msgs = []  # type: List[dict]
+    while reader.pos < len(data):
+        msgs.append(reader.message())
+    return msgs
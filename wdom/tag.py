@@ -42,6 +42,8 @@ class Tag(WdomElement):
     each thier instances.
     """
 
+    __slots__ = ()
+
     #: Tag name used for this node.
     tag = 'tag'
     #: use for <input> tag's type
@@ -57,7 +59,7 @@ class Tag(WdomElement):
             kwargs['type'] = self.type_
         if self.is_ and 'is' not in kwargs and 'is_' not in kwargs:
             kwargs['is'] = self.is_
-        super().__init__(self.tag, **kwargs)  # type: ignore
+        super().__init__(self._default_tag, **kwargs)  # type: ignore
         self.append(*args)
 
     def _clone_node(self) -> 'Tag':
@@ -129,6 +131,11 @@ class NestedTag(Tag):
             return self._inner_element.childNodes
         return super().childNodes
 
+    def hasChildNodes(self) -> bool:  # noqa: D102
+        if self._inner_element:
+            return self._inner_element.hasChildNodes()
+        return super().hasChildNodes()
+
     def empty(self) -> None:  # noqa: D102
         if self._inner_element:
             self._inner_element.empty()
@@ -196,6 +203,7 @@ def NewTagClass(class_name: str, tag: str = None,
         else:
             TypeError('Invalid base class: {}'.format(str(bases)))
     kwargs['tag'] = tag
+    kwargs.setdefault('__slots__', ())
     # Here not use type() function, since it does not support
     # metaclasss (__prepare__) properly.
     cls = new_class(  # type: ignore
@@ -238,6 +246,7 @@ class Script(Tag, HTMLScriptElement):  # noqa: D204
 
     Inner contents of this node is not escaped.
     """
+    __slots__ = ()
     tag = 'script'
 
     def __init__(self, *args: Any, type: str = 'text/javascript',
@@ -329,6 +338,8 @@ class RawHtmlNode(Tag):
         Inner html is not WdomElement, so you cant control them from python.
     """
 
+    __slots__ = ()
+
     tag = 'div'
     _should_escape_text = False
 
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""DOM traversal: ``NodeFilter``, ``NodeIterator`` and ``TreeWalker``.
+
+:class:`NodeIterator` and :class:`TreeWalker` follow the DOM specification.
+They keep only the current position, so nodes are visited lazily and they
+work on trees changed while traversing. :func:`iter_descendants` is a
+(non-standard) generator for the common case of walking forward from a root
+node, which is used by ``getElementsBy``, ``textContent`` and so on.
+
+.. code-block:: python
+
+    walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT)
+    while walker.nextNode():
+        print(walker.currentNode.data)
+
+    for node in iter_descendants(document.body, NodeFilter.SHOW_ELEMENT):
+        if node.hasAttribute('hidden'):
+            break
+"""
+
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+from typing import TYPE_CHECKING
+import weakref
+from xml.dom import Node as _Node
+
+if TYPE_CHECKING:
+    from wdom.node import Node  # noqa
+
+__all__ = ('NodeFilter', 'NodeIterator', 'TreeWalker', 'iter_descendants')
+
+
+class NodeFilter:
+    """Constants of node filters.
+
+    Filter is a function (or an object with ``acceptNode`` method) which gets
+    a node and returns one of ``FILTER_ACCEPT``, ``FILTER_REJECT`` or
+    ``FILTER_SKIP``. It may return bool instead: ``True`` is the same as
+    ``FILTER_ACCEPT`` and ``False`` is the same as ``FILTER_SKIP``.
+    """
+
+    # Results of filters
+    FILTER_ACCEPT = 1
+    FILTER_REJECT = 2
+    FILTER_SKIP = 3
+
+    # Flags of ``whatToShow``
+    SHOW_ALL = 0xFFFFFFFF
+    SHOW_ELEMENT = 0x1
+    SHOW_ATTRIBUTE = 0x2
+    SHOW_TEXT = 0x4
+    SHOW_CDATA_SECTION = 0x8
+    SHOW_ENTITY_REFERENCE = 0x10
+    SHOW_ENTITY = 0x20
+    SHOW_PROCESSING_INSTRUCTION = 0x40
+    SHOW_COMMENT = 0x80
+    SHOW_DOCUMENT = 0x100
+    SHOW_DOCUMENT_TYPE = 0x200
+    SHOW_DOCUMENT_FRAGMENT = 0x400
+    SHOW_NOTATION = 0x800
+
+
+_NodeFilterType = Union[Callable[['Node'], Any], Any]
+FILTER_ACCEPT = NodeFilter.FILTER_ACCEPT
+FILTER_REJECT = NodeFilter.FILTER_REJECT
+FILTER_SKIP = NodeFilter.FILTER_SKIP
+
+
+def _filter_function(node_filter: Optional[_NodeFilterType]
+                     ) -> Optional[Callable[['Node'], Any]]:
+    if node_filter is None:
+        return None
+    accept_node = getattr(node_filter, 'acceptNode', None)
+    if callable(accept_node):
+        return accept_node
+    if callable(node_filter):
+        return node_filter
+    raise TypeError('filter must be callable or have acceptNode method, '
+                    'but get {}'.format(type(node_filter)))
+
+
+# types of nodes which may have child nodes (None for abstract nodes)
+_PARENT_TYPES = frozenset((
+    _Node.ELEMENT_NODE, _Node.DOCUMENT_NODE, _Node.DOCUMENT_FRAGMENT_NODE,
+    None,
+))
+
+
+def _shown_types(what_to_show: int) -> Dict[Optional[int], bool]:
+    # node type -> shown or not (nodes without type are shown only by SHOW_ALL)
+    shown = {t: bool(what_to_show >> (t - 1) & 1)
+             for t in range(1, 13)}  # type: Dict[Optional[int], bool]
+    shown[None] = what_to_show & NodeFilter.SHOW_ALL == NodeFilter.SHOW_ALL
+    return shown
+
+
+def iter_descendants(root: 'Node', what_to_show: int = NodeFilter.SHOW_ALL,
+                     node_filter: _NodeFilterType = None) -> Iterator['Node']:
+    """[Not Standard] Yield descendant nodes of ``root`` in document order.
+
+    Nodes are filtered in the same way as ``NodeIterator``, except that
+    ``FILTER_REJECT`` skips descendants of the node too (like
+    ``TreeWalker``). Nodes are visited lazily, without recursive calls, so
+    breaking the loop stops walking the tree. The tree should not be changed
+    while iterating (use :class:`NodeIterator` for it).
+    """
+    accept = _filter_function(node_filter)
+    shown = _shown_types(what_to_show)
+    if accept is None:
+        return _iter_shown(root, shown)
+    return _iter_filtered(root, shown, accept)
+
+
+def _iter_shown(root: 'Node', shown: Dict[Optional[int], bool]
+                ) -> Iterator['Node']:
+    stack = [iter(root.childNodes)]
+    push = stack.append
+    while stack:
+        for node in stack[-1]:
+            if shown[node.nodeType]:
+                yield node
+            if node.nodeType in _PARENT_TYPES:
+                push(iter(node.childNodes))
+                break
+        else:
+            stack.pop()
+
+
+def _iter_filtered(root: 'Node', shown: Dict[Optional[int], bool],
+                   accept: Callable[['Node'], Any]) -> Iterator['Node']:
+    stack = [iter(root.childNodes)]
+    push = stack.append
+    while stack:
+        for node in stack[-1]:
+            if shown[node.nodeType]:
+                result = accept(node)
+                if result == FILTER_ACCEPT:
+                    yield node
+                elif result == FILTER_REJECT:
+                    # skip descendants
+                    continue
+            if node.nodeType in _PARENT_TYPES:
+                push(iter(node.childNodes))
+                break
+        else:
+            stack.pop()
+
+
+class _Traversal:
+    """Common part of NodeIterator and TreeWalker."""
+
+    def __init__(self, root: 'Node', whatToShow: int = NodeFilter.SHOW_ALL,
+                 filter: _NodeFilterType = None) -> None:
+        self.__root = root
+        self.__what_to_show = whatToShow
+        self.__filter = filter
+        self._accept = _filter_function(filter)
+        self._shown = _shown_types(whatToShow)
+
+    @property
+    def root(self) -> 'Node':
+        """Root node of this traversal."""
+        return self.__root
+
+    @property
+    def whatToShow(self) -> int:
+        """Bit flags of the node types to be shown."""
+        return self.__what_to_show
+
+    @property
+    def filter(self) -> Optional[_NodeFilterType]:
+        """Node filter of this traversal."""
+        return self.__filter
+
+    def _filter(self, node: 'Node') -> int:
+        if not self._shown[node.nodeType]:
+            return FILTER_SKIP
+        if self._accept is None:
+            return FILTER_ACCEPT
+        result = self._accept(node)
+        if result == FILTER_ACCEPT:
+            return FILTER_ACCEPT
+        if result == FILTER_REJECT:
+            return FILTER_REJECT
+        return FILTER_SKIP
+
+
+def _following(node: 'Node', root: 'Node', skip_children: bool = False
+               ) -> Optional['Node']:
+    # the next node of ``node`` in document order, within ``root``
+    if not skip_children and node.hasChildNodes():
+        return node.firstChild
+    while node is not root and node is not None:
+        sibling = node.nextSibling
+        if sibling is not None:
+            return sibling
+        node = node.parentNode
+    return None
+
+
+def _preceding(node: 'Node', root: 'Node') -> Optional['Node']:
+    # the previous node of ``node`` in document order, within ``root``
+    if node is root:
+        return None
+    sibling = node.previousSibling
+    if sibling is None:
+        return node.parentNode
+    while sibling.hasChildNodes():
+        sibling = sibling.lastChild
+    return sibling
+
+
+def _is_inclusive_ancestor(node: 'Node', other: Optional['Node']) -> bool:
+    while other is not None:
+        if other is node:
+            return True
+        other = other.parentNode
+    return False
+
+
+# NodeIterators to be updated when a node is removed
+_node_iterators = weakref.WeakSet()  # type: weakref.WeakSet[NodeIterator]
+
+
+class NodeIterator(_Traversal):
+    """Iterator of nodes under the root node, in document order.
+
+    Unlike DOM, this object is also a python iterator (of the following
+    nodes). ``FILTER_REJECT`` is the same as ``FILTER_SKIP`` for
+    NodeIterator; descendants of the rejected node are still visited.
+    """
+
+    def __init__(self, root: 'Node', whatToShow: int = NodeFilter.SHOW_ALL,
+                 filter: _NodeFilterType = None) -> None:
+        """Use ``document.createNodeIterator`` to make new instance."""
+        super().__init__(root, whatToShow, filter)
+        self.__reference = root
+        self.__pointer_before_reference = True
+        _node_iterators.add(self)
+
+    @property
+    def referenceNode(self) -> 'Node':
+        """Node where this iterator is."""
+        return self.__reference
+
+    @property
+    def pointerBeforeReferenceNode(self) -> bool:
+        """True if this iterator is before the reference node."""
+        return self.__pointer_before_reference
+
+    def __iter__(self) -> Iterator['Node']:
+        return self
+
+    def __next__(self) -> 'Node':
+        node = self.nextNode()
+        if node is None:
+            raise StopIteration
+        return node
+
+    def _traverse(self, forward: bool) -> Optional['Node']:
+        node = self.__reference
+        before = self.__pointer_before_reference
+        while True:
+            if forward == before:
+                # stay on the reference node
+                before = not before
+            elif forward:
+                node = _following(node, self.root)
+            else:
+                node = _preceding(node, self.root)
+            if node is None:
+                return None
+            if self._filter(node) == FILTER_ACCEPT:
+                break
+        self.__reference = node
+        self.__pointer_before_reference = before
+        return node
+
+    def nextNode(self) -> Optional['Node']:
+        """Return the next node and move to it, or None if not exists."""
+        return self._traverse(True)
+
+    def previousNode(self) -> Optional['Node']:
+        """Return the previous node and move to it, or None if not exists."""
+        return self._traverse(False)
+
+    def detach(self) -> None:
+        """Do nothing (kept for compatibility)."""
+
+    def _pre_remove(self, node: 'Node') -> None:
+        """Move away from ``node``, which is going to be removed."""
+        root = self.root
+        if (node is root or
+                not _is_inclusive_ancestor(node, self.__reference) or
+                not _is_inclusive_ancestor(root, node)):
+            return
+        if self.__pointer_before_reference:
+            following = _following(node, root, skip_children=True)
+            if following is not None:
+                self.__reference = following
+                return
+            self.__pointer_before_reference = False
+        sibling = node.previousSibling
+        if sibling is None:
+            self.__reference = node.parentNode
+        else:
+            while sibling.hasChildNodes():
+                sibling = sibling.lastChild
+            self.__reference = sibling
+
+
+def _pre_remove(node: 'Node') -> None:
+    """Update NodeIterators before removing ``node`` from its parent."""
+    for iterator in tuple(_node_iterators):
+        iterator._pre_remove(node)
+
+
+class TreeWalker(_Traversal):
+    """Walker of the tree under the root node.
+
+    Moves from ``currentNode`` to its parent, children, siblings, or the
+    previous/next node in document order, skipping the nodes which are not
+    accepted. ``FILTER_REJECT`` skips descendants of the node too.
+    """
+
+    def __init__(self, root: 'Node', whatToShow: int = NodeFilter.SHOW_ALL,
+                 filter: _NodeFilterType = None) -> None:
+        """Use ``document.createTreeWalker`` to make new instance."""
+        super().__init__(root, whatToShow, filter)
+        self.currentNode = root
+
+    def parentNode(self) -> Optional['Node']:
+        """Move to the closest accepted ancestor and return it."""
+        node = self.currentNode
+        while node is not None and node is not self.root:
+            node = node.parentNode
+            if node is not None and self._filter(node) == FILTER_ACCEPT:
+                self.currentNode = node
+                return node
+        return None
+
+    def _traverse_children(self, first: bool) -> Optional['Node']:
+        node = self.currentNode.firstChild if first else \
+            self.currentNode.lastChild
+        while node is not None:
+            result = self._filter(node)
+            if result == FILTER_ACCEPT:
+                self.currentNode = node
+                return node
+            if result == FILTER_SKIP and node.hasChildNodes():
+                node = node.firstChild if first else node.lastChild
+                continue
+            node = self._next_in_parents(node, first)
+        return None
+
+    def _next_in_parents(self, node: 'Node', first: bool) -> Optional['Node']:
+        # sibling of ``node`` or its ancestors under the current node
+        while node is not None:
+            sibling = node.nextSibling if first else node.previousSibling
+            if sibling is not None:
+                return sibling
+            node = node.parentNode
+            if (node is None or node is self.root or
+                    node is self.currentNode):
+                return None
+        return None
+
+    def firstChild(self) -> Optional['Node']:
+        """Move to the first accepted child and return it."""
+        return self._traverse_children(True)
+
+    def lastChild(self) -> Optional['Node']:
+        """Move to the last accepted child and return it."""
+        return self._traverse_children(False)
+
+    def _traverse_siblings(self, forward: bool) -> Optional['Node']:
+        node = self.currentNode
+        if node is self.root:
+            return None
+        while True:
+            sibling = node.nextSibling if forward else node.previousSibling
+            while sibling is not None:
+                node = sibling
+                result = self._filter(node)
+                if result == FILTER_ACCEPT:
+                    self.currentNode = node
+                    return node
+                sibling = node.firstChild if forward else node.lastChild
+                if result == FILTER_REJECT or sibling is None:
+                    sibling = (node.nextSibling if forward else
+                               node.previousSibling)
+            node = node.parentNode
+            if (node is None or node is self.root or
+                    self._filter(node) == FILTER_ACCEPT):
+                return None
+
+    def nextSibling(self) -> Optional['Node']:
+        """Move to the next accepted sibling and return it."""
+        return self._traverse_siblings(True)
+
+    def previousSibling(self) -> Optional['Node']:
+        """Move to the previous accepted sibling and return it."""
+        return self._traverse_siblings(False)
+
+    def previousNode(self) -> Optional['Node']:
+        """Move to the previous accepted node in document order."""
+        node = self.currentNode
+        while node is not self.root:
+            sibling = node.previousSibling
+            while sibling is not None:
+                node, result = self._last_descendant(sibling)
+                if result == FILTER_ACCEPT:
+                    self.currentNode = node
+                    return node
+                sibling = node.previousSibling
+            parent = node.parentNode
+            if node is self.root or parent is None:
+                return None
+            node = parent
+            if self._filter(node) == FILTER_ACCEPT:
+                self.currentNode = node
+                return node
+        return None
+
+    def _last_descendant(self, node: 'Node') -> Tuple['Node', int]:
+        # the last node not under a rejected node, with filtered result
+        result = self._filter(node)
+        while result != FILTER_REJECT and node.hasChildNodes():
+            node = node.lastChild
+            result = self._filter(node)
+        return node, result
+
+    def nextNode(self) -> Optional['Node']:
+        """Move to the next accepted node in document order."""
+        node = self.currentNode
+        result = FILTER_ACCEPT
+        while True:
+            while result != FILTER_REJECT and node.hasChildNodes():
+                node = node.firstChild
+                result = self._filter(node)
+                if result == FILTER_ACCEPT:
+                    self.currentNode = node
+                    return node
+            node = _following(node, self.root, skip_children=True)
+            if node is None:
+                return None
+            result = self._filter(node)
+            if result == FILTER_ACCEPT:
+                self.currentNode = node
+                return node
@@ -57,6 +57,7 @@ def reset() -> None:
     """
     from wdom.document import get_new_document, set_document
     from wdom.element import Element
+    from wdom.node import _reset_mutation_observers
     from wdom.server import _tornado
     from wdom.window import customElements
 
@@ -66,3 +67,4 @@ def reset() -> None:
     Element._elements_with_id.clear()
     Element._element_buffer.clear()
     customElements.reset()
+    _reset_mutation_observers()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Virtual DOM: render child nodes by description and apply differences.
+
+:class:`Component` is a :class:`wdom.tag.Tag` whose child nodes are described
+by :meth:`Component.render`, which returns a tree of lightweight
+:class:`VNode` objects (and strings for text). :meth:`Component.update`
+compares the new tree with the previous one, and applies only the differences
+to the child nodes by the usual ``WdomElement`` methods (``setAttribute``,
+``textContent``, ``insertBefore``, ``removeChild``, ...).
+
+Children with ``key`` are matched by the key, so reordered children are moved
+on browser instead of re-created. Children without ``key`` are matched by
+their order.
+
+.. code-block:: python
+
+    class TodoList(Component):
+        tag = 'ul'
+
+        def __init__(self, items, **kwargs):
+            super().__init__(**kwargs)
+            self.items = items
+            self.update()
+
+        def render(self):
+            return [VNode('li', item.text, key=item.id, class_='item')
+                    for item in self.items]
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import Union
+
+from wdom.node import DocumentFragment, Node, Text
+from wdom.tag import Tag
+from wdom.web_node import WdomElement, _stable_indices
+
+__all__ = ('VNode', 'Component')
+
+_Child = Union['VNode', str]
+# Re-insert all child nodes instead of moving more than this (and more than
+# half of) child nodes
+_MAX_MOVES = 16
+
+
+class VNode:
+    """Lightweight description of an element (or a text node).
+
+    ``tag`` is a tag name or an element class (like ``wdom.tag.Div``).
+    ``children`` are ``VNode`` or strings, and keyword arguments are
+    attributes (``class_`` and ``is_`` are converted to ``class`` and ``is``,
+    same as ``Tag``). Text node is described by ``VNode(None, text=...)``, but
+    usually just pass string as a child.
+    """
+
+    __slots__ = ('tag', 'key', 'attrs', 'children', 'text', 'node')
+
+    def __init__(self, tag: Union[str, type, None], *children: _Child,
+                 key: Any = None, text: str = None, **attrs: Any) -> None:
+        """Initialize VNode."""
+        self.tag = tag
+        self.key = key
+        self.text = text
+        if 'class_' in attrs:
+            attrs['class'] = attrs.pop('class_')
+        if 'is_' in attrs:
+            attrs['is'] = attrs.pop('is_')
+        self.attrs = attrs  # type: Dict[str, Any]
+        self.children = _normalize(children)
+        # node created from (or patched by) this description
+        self.node = None  # type: Optional[Node]
+
+    def __repr__(self) -> str:
+        if self.tag is None:
+            return 'VNode(text={!r})'.format(self.text)
+        return 'VNode({!r}, key={!r})'.format(self.tag, self.key)
+
+
+def _normalize(children: Iterable[Any]) -> List[VNode]:
+    result = []
+    for child in children:
+        if isinstance(child, VNode):
+            result.append(child)
+        elif isinstance(child, (list, tuple)):
+            result.extend(_normalize(child))
+        elif child is not None:
+            result.append(VNode(None, text=str(child)))
+    return result
+
+
+def _create(vnode: VNode) -> Node:
+    """Create new node from ``vnode``."""
+    if vnode.tag is None:
+        node = Text(vnode.text)  # type: Node
+    else:
+        if isinstance(vnode.tag, str):
+            elm = WdomElement(vnode.tag)
+        else:
+            elm = vnode.tag()
+        for attr, value in vnode.attrs.items():
+            elm.setAttribute(attr, value)
+        for child in vnode.children:
+            elm.appendChild(_create(child))
+        node = elm
+    vnode.node = node
+    return node
+
+
+def _patch_class(elm: WdomElement, old: Any, new: Any) -> None:
+    old_classes = str(old or '').split()
+    new_classes = str(new or '').split()
+    removed = [c for c in old_classes if c not in new_classes]
+    added = [c for c in new_classes if c not in old_classes]
+    if removed:
+        elm.classList.remove(*removed)
+    if added:
+        elm.classList.add(*added)
+
+
+def _patch_attrs(elm: WdomElement, old: Dict[str, Any],
+                 new: Dict[str, Any]) -> None:
+    for attr in old:
+        if attr not in new and attr != 'class':
+            elm.removeAttribute(attr)
+    for attr, value in new.items():
+        if attr != 'class' and old.get(attr) != value:
+            elm.setAttribute(attr, value)
+    if old.get('class') != new.get('class'):
+        _patch_class(elm, old.get('class'), new.get('class'))
+
+
+def _patch(old: VNode, new: VNode) -> None:
+    """Apply difference of ``old`` and ``new`` to the node of ``old``."""
+    node = old.node
+    new.node = node
+    if node is None or new.tag is None:
+        return
+    _patch_attrs(node, old.attrs, new.attrs)  # type: ignore
+    _patch_children(node, old.children, new.children)  # type: ignore
+
+
+def _is_text(vnodes: List[VNode]) -> bool:
+    return len(vnodes) == 1 and vnodes[0].tag is None
+
+
+def _same_kind(old: Optional[VNode], new: VNode) -> bool:
+    # text nodes are not updated, but replaced
+    return (old is not None and old.tag == new.tag and old.key == new.key and
+            old.text == new.text)
+
+
+def _match(old: List[VNode], new: List[VNode]) -> List[Optional[VNode]]:
+    """Return old vnode which matches each new vnode (or None)."""
+    keyed = {v.key: v for v in old if v.key is not None}
+    unkeyed = iter([v for v in old if v.key is None])
+    matched = []  # type: List[Optional[VNode]]
+    for vnode in new:
+        if vnode.key is not None:
+            candidate = keyed.pop(vnode.key, None)
+        else:
+            candidate = next(unkeyed, None)
+        if _same_kind(candidate, vnode):
+            matched.append(candidate)
+        else:
+            matched.append(None)
+    return matched
+
+
+def _insert_nodes(parent: WdomElement, nodes: List[Node],
+                  ref: Optional[Node]) -> None:
+    # insert multiple nodes at once as a fragment (sent as a single html)
+    if len(nodes) == 1:
+        node = nodes[0]  # type: Node
+    else:
+        node = DocumentFragment()
+        for n in nodes:
+            node.appendChild(n)
+    if ref is None:
+        parent.appendChild(node)
+    else:
+        parent.insertBefore(node, ref)
+
+
+def _patch_text(parent: WdomElement, old: List[VNode],
+                new: List[VNode]) -> None:
+    if old[0].text != new[0].text:
+        parent.textContent = new[0].text
+    new[0].node = parent.firstChild
+
+
+def _place_nodes(parent: WdomElement, new: List[VNode],
+                 positions: List[int]) -> None:
+    """Insert new nodes and move reordered nodes.
+
+    Nodes are placed from the last, before the next (already placed) node.
+    Nodes in the longest increasing subsequence of the old positions are not
+    moved, and adjacent new nodes are inserted at once.
+
+    If most nodes need to be moved (like shuffled), all nodes are removed and
+    inserted again by a single html, which is much faster than moving each.
+    """
+    stable = _stable_indices(positions)
+    n_moved = sum(1 for pos in positions if pos >= 0) - len(stable)
+    if n_moved > _MAX_MOVES and n_moved * 2 > len(new):
+        parent.empty()
+        _insert_nodes(parent, [vnode.node for vnode in new], None)
+        return
+    ref = None  # type: Optional[Node]
+    pending = []  # type: List[Node]
+    for i in reversed(range(len(new))):
+        node = new[i].node
+        if positions[i] < 0:
+            pending.append(node)  # type: ignore
+            continue
+        if pending:
+            pending.reverse()
+            _insert_nodes(parent, pending, ref)
+            ref = pending[0]
+            pending = []
+        if i not in stable:
+            _insert_nodes(parent, [node], ref)  # type: ignore
+        ref = node
+    if pending:
+        pending.reverse()
+        _insert_nodes(parent, pending, ref)
+
+
+def _patch_children(parent: WdomElement, old: List[VNode],
+                    new: List[VNode]) -> None:
+    """Apply difference of child nodes ``old`` and ``new`` to ``parent``."""
+    if _is_text(old) and _is_text(new):
+        _patch_text(parent, old, new)
+        return
+    matched = _match(old, new)
+    reused = {id(o) for o in matched if o is not None}
+    for vnode in old:
+        if id(vnode) not in reused and vnode.node is not None:
+            parent.removeChild(vnode.node)
+    position = {id(vnode): i for i, vnode in enumerate(old)}
+    positions = []  # type: List[int]
+    for o, vnode in zip(matched, new):
+        if o is None:
+            _create(vnode)
+            positions.append(-1)
+        else:
+            _patch(o, vnode)
+            positions.append(position[id(o)])
+    _place_nodes(parent, new, positions)
+
+
+class Component(Tag):
+    """Tag whose child nodes are rendered from :meth:`render`.
+
+    Call :meth:`update` to render and apply the differences to child nodes.
+    Child nodes of this node should be changed only by :meth:`update`.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: D102
+        self._vnodes = []  # type: List[VNode]
+        super().__init__(*args, **kwargs)
+
+    def render(self) -> Union[_Child, Sequence[_Child], None]:
+        """Return description of child nodes of this node.
+
+        Return a ``VNode``, a string, or list of them. Subclasses should
+        override this method.
+        """
+        return None
+
+    def update(self) -> None:
+        """Render child nodes and apply the differences to this node."""
+        vnodes = _normalize([self.render()])
+        _patch_children(self, self._vnodes, vnodes)
+        self._vnodes = vnodes
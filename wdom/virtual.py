@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Windowed (virtualized) list and table components.
+
+:class:`VirtualList` and :class:`VirtualTable` keep the data on the server and
+only show the rows in the viewport (plus ``overscan`` rows before and after
+it) on browser. The rest of the list is filled by two spacer nodes, so the
+scroll bar works as if all rows are there.
+
+On scroll, rows which go out of the window are recycled for the rows coming
+into it, and the changes are sent in one :func:`wdom.web_node.batch`. Number
+of row nodes (on both server and browser) and size of messages per scroll do
+not depend on the length of the data. Rows must have a fixed height
+(``row_height``).
+
+.. code-block:: python
+
+    class NameList(VirtualList):
+        row_height = 30
+
+        def render_row(self, row, item, index):
+            row.textContent = '{}: {}'.format(index, item.name)
+
+    names = NameList(users, viewport_height=600)
+"""
+
+from typing import Any, List, Sequence, Tuple
+from typing import TYPE_CHECKING
+
+from wdom.event import Event
+from wdom.tag import Div, Table, Tbody, Td, Th, Thead, Tr, Tag
+from wdom.web_node import WdomElement, batch
+
+if TYPE_CHECKING:
+    from typing import Type  # noqa
+
+__all__ = ('VirtualList', 'VirtualTable')
+
+
+class VirtualList(Tag):
+    """Scrollable list which shows only the rows near the viewport.
+
+    ``data`` is any sequence (not copied). Override :meth:`render_row` to
+    customize contents of each row. Call :meth:`refresh` after changing the
+    data in place, or set new sequence to :attr:`data`.
+    """
+
+    tag = 'div'
+    #: Class of the row nodes
+    row_class = Div  # type: Type[WdomElement]
+    #: Class of the spacer nodes before and after the rows
+    spacer_class = Div  # type: Type[WdomElement]
+    #: Height of each row [px]
+    row_height = 24
+    #: Height of the viewport [px], until the browser sends the actual one
+    viewport_height = 480
+    #: Interval of scroll events sent from browser [sec]
+    scroll_throttle = 0.05
+    #: Number of rows rendered before and after the visible rows
+    overscan = 10
+
+    def __init__(self, data: Sequence[Any] = (), *,
+                 row_height: int = None, viewport_height: int = None,
+                 overscan: int = None, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        if row_height is not None:
+            self.row_height = row_height
+        if viewport_height is not None:
+            self.viewport_height = viewport_height
+        if overscan is not None:
+            self.overscan = overscan
+        self.style['overflow-y'] = 'auto'
+        self.style['height'] = '{}px'.format(self.viewport_height)
+        self._scroll_top = 0
+        self._client_height = self.viewport_height
+        self._body = self._create_body()
+        self._top_spacer = self.spacer_class()
+        self._bottom_spacer = self.spacer_class()
+        self._body.append(self._top_spacer, self._bottom_spacer)
+        # row nodes in the document, which show data[_start:_start+len(rows)]
+        self._rows = []  # type: List[WdomElement]
+        self._start = 0
+        self._data = data
+        self.addEventListener('scroll', self._on_scroll,
+                              throttle=self.scroll_throttle)
+        self._update(rerender=True)
+
+    def _create_body(self) -> WdomElement:
+        """Create node which contains spacers and rows, and return it."""
+        return self
+
+    def _create_row(self) -> WdomElement:
+        row = self.row_class()
+        row.style['height'] = '{}px'.format(self.row_height)
+        return row
+
+    @property
+    def data(self) -> Sequence[Any]:
+        """Get/Set data shown in this list."""
+        return self._data
+
+    @data.setter
+    def data(self, data: Sequence[Any]) -> None:
+        self._data = data
+        self.refresh()
+
+    @property
+    def rows(self) -> List[WdomElement]:
+        """Return row nodes currently in this list (copy)."""
+        return list(self._rows)
+
+    @property
+    def window(self) -> Tuple[int, int]:
+        """Return range (start, end) of the data rendered as rows."""
+        return self._start, self._start + len(self._rows)
+
+    def render_row(self, row: WdomElement, item: Any, index: int) -> None:
+        """Render ``item`` (``index``-th data) on the ``row`` node.
+
+        Row nodes are recycled, so this method should overwrite all contents
+        previously rendered. By default, show ``str(item)``.
+        """
+        row.textContent = str(item)
+
+    def refresh(self) -> None:
+        """Render all rows again, after the data is changed."""
+        self._update(rerender=True)
+
+    def on_event_pre(self, e: Event) -> None:
+        """Set scroll position and size of viewport sent from browser."""
+        super().on_event_pre(e)
+        if e.type == 'scroll':
+            ct_msg = e.init.get('currentTarget', dict())
+            self._scroll_top = int(ct_msg.get('scrollTop') or 0)
+            self._client_height = int(ct_msg.get('clientHeight') or
+                                      self._client_height)
+
+    def _on_scroll(self, e: Event) -> None:
+        self._update()
+
+    def _calc_window(self) -> Tuple[int, int]:
+        length = len(self._data)
+        first = min(self._scroll_top // self.row_height, length)
+        n_visible = -(-self._client_height // self.row_height) + 1
+        start = max(0, first - self.overscan)
+        end = min(length, first + n_visible + self.overscan)
+        return start, end
+
+    def _update(self, rerender: bool = False) -> None:
+        start, end = self._calc_window()
+        old_start, old_end = self.window
+        if start == old_start and end == old_end and not rerender:
+            return
+        with batch():
+            self._update_rows(start, end, rerender)
+            self._set_spacer_height(self._top_spacer, start)
+            self._set_spacer_height(self._bottom_spacer,
+                                    len(self._data) - end)
+
+    def _update_rows(self, start: int, end: int, rerender: bool) -> None:
+        # keep rows which show the same data, and recycle the others
+        old_start, old_end = self.window
+        keep_from = max(start, old_start)
+        keep_to = min(end, old_end)
+        if keep_from < keep_to:
+            lo, hi = keep_from - old_start, keep_to - old_start
+        else:
+            keep_from = keep_to = end
+            lo = hi = 0
+        kept = self._rows[lo:hi]
+        free = self._rows[:lo] + self._rows[hi:]
+        for row in free:
+            self._body.removeChild(row)
+        if rerender:
+            for i, row in enumerate(kept, keep_from):
+                self.render_row(row, self._data[i], i)
+        head = [self._take_row(free, i) for i in range(start, keep_from)]
+        tail = [self._take_row(free, i) for i in range(keep_to, end)]
+        ref = kept[0] if kept else self._bottom_spacer
+        for row in head:
+            self._body.insertBefore(row, ref)
+        for row in tail:
+            self._body.insertBefore(row, self._bottom_spacer)
+        self._rows = head + kept + tail
+        self._start = start
+
+    def _take_row(self, free: List[WdomElement], index: int) -> WdomElement:
+        row = free.pop() if free else self._create_row()
+        # not in the document yet, so no message is sent
+        self.render_row(row, self._data[index], index)
+        return row
+
+    def _set_spacer_height(self, spacer: WdomElement, n_rows: int) -> None:
+        height = '{}px'.format(n_rows * self.row_height)
+        if spacer.style['height'] != height:
+            spacer.style['height'] = height
+
+
+class VirtualTable(VirtualList):
+    """Scrollable table which shows only the rows near the viewport.
+
+    Each item of ``data`` is a sequence of cell values. ``header`` is an
+    optional sequence of column titles.
+    """
+
+    row_class = Tr
+    spacer_class = Tr
+
+    def __init__(self, data: Sequence[Sequence[Any]] = (),
+                 header: Sequence[Any] = None, **kwargs: Any) -> None:
+        self._header = header
+        super().__init__(data, **kwargs)
+
+    def _create_body(self) -> WdomElement:
+        table = Table()
+        if self._header is not None:
+            table.appendChild(Thead(Tr(*(Th(str(h)) for h in self._header))))
+        tbody = Tbody()
+        table.appendChild(tbody)
+        self.appendChild(table)
+        return tbody
+
+    def render_row(self, row: WdomElement, item: Sequence[Any], index: int
+                   ) -> None:
+        """Show each value of ``item`` in a cell of the ``row``."""
+        values = list(item)
+        while row.length > len(values):
+            row.removeChild(row.lastChild)
+        while row.length < len(values):
+            row.appendChild(Td())
+        for cell, value in zip(row.childNodes, values):
+            cell.textContent = str(value)
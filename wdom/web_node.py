@@ -3,9 +3,12 @@
 
 """Base classes for web-synchronized Nodes."""
 
+from bisect import bisect_left
+from contextlib import contextmanager
 import logging
 import re
-from typing import Any, Awaitable, Dict, Tuple, Union
+from typing import Any, Awaitable, ContextManager, Dict, Iterable, Iterator
+from typing import List, Optional, Sequence, Set, Tuple, Union
 from typing import TYPE_CHECKING
 import warnings
 from weakref import WeakValueDictionary
@@ -29,6 +32,260 @@ def remove_wdom_id(html: str) -> str:
     return _remove_id_re.sub('', html)
 
 
+# messages whose effect is included in html of the nodes inserted in batch
+# (event listeners are sent again when the node is mounted on browser)
+_html_methods = frozenset([
+    'setAttribute', 'removeAttribute', 'addClass', 'removeClass',
+    'addEventListener', 'removeEventListener',
+])
+
+
+def _stable_indices(positions: Sequence[int]) -> Set[int]:
+    """Return indices of the longest increasing subsequence of positions.
+
+    Negative positions (new nodes) are skipped.
+    """
+    tails = []  # type: List[int]  # index of the last item of each length
+    tail_positions = []  # type: List[int]
+    prev = [-1] * len(positions)
+    for i, pos in enumerate(positions):
+        if pos < 0:
+            continue
+        length = bisect_left(tail_positions, pos)
+        if length > 0:
+            prev[i] = tails[length - 1]
+        if length == len(tails):
+            tails.append(i)
+            tail_positions.append(pos)
+        else:
+            tails[length] = i
+            tail_positions[length] = pos
+    result = set()
+    i = tails[-1] if tails else -1
+    while i >= 0:
+        result.add(i)
+        i = prev[i]
+    return result
+
+
+class _Batch:
+    """Mutations of connected nodes recorded in :func:`batch`."""
+
+    def __init__(self) -> None:
+        # parent node -> its child nodes before the first change in batch
+        self.children = {}  # type: Dict[Node, List[Node]]
+        self.messages = []  # type: List[Tuple[WdomElement, Dict]]
+        # nodes removed or inserted in batch, which may be changed without
+        # messages while not in the document (so not moved on browser)
+        self.removed = set()  # type: Set[Node]
+        # below are set when flushed
+        # connected parent -> its child nodes which stay on browser
+        self._kept = {}  # type: Dict[Node, Set[Node]]
+        # child node -> its parent node before batch
+        self._orig_parent = {}  # type: Dict[Node, Node]
+        # node -> sent as (a part of) html or not
+        self._new = {}  # type: Dict[Node, bool]
+
+    def record(self, *parents: Optional[Node],
+               removed: Iterable[Node] = ()) -> None:
+        self.removed.update(removed)
+        for parent in parents:
+            # child nodes of other nodes are not synced with browser
+            if (isinstance(parent, WdomElement) and
+                    parent not in self.children):
+                self.children[parent] = list(parent.childNodes)
+
+    def _is_new(self, node: Node) -> bool:
+        # node is not on browser, or cannot be moved there
+        path = []  # ancestors not visited yet
+        ancestor = node  # type: Optional[Node]
+        while ancestor is not None and ancestor not in self._new:
+            # visited again when moved into its old descendant, send as html
+            self._new[ancestor] = True
+            path.append(ancestor)
+            ancestor = ancestor.parentNode
+        new = ancestor is not None and self._new[ancestor]
+        for n in reversed(path):
+            parent = n.parentNode
+            new = new or (parent in self._kept and
+                          n not in self._kept[parent] and
+                          not self._can_move(n))
+            self._new[n] = new
+        return self._new[node]
+
+    def _can_move(self, node: Node) -> bool:
+        # node is on browser and its old parent node remains there
+        parent = self._orig_parent.get(node)
+        return (isinstance(node, WdomElement) and parent in self._kept and
+                node not in self.removed and not self._is_new(parent))
+
+    def _is_moved(self, node: Node) -> bool:
+        parent = node.parentNode
+        return (parent in self._kept and node not in self._kept[parent] and
+                not self._is_new(node))
+
+    def flush(self) -> None:
+        """Send messages and the minimal operations to sync child nodes."""
+        for parent, orig in self.children.items():
+            if parent.ownerDocument is not None:
+                self._kept[parent] = _kept_nodes(
+                    [c for c in orig if c not in self.removed],
+                    parent.childNodes)
+            for child in orig:
+                self._orig_parent[child] = parent
+        for node, msg in self.messages:
+            if node.ownerDocument is not None and not self._is_new(node):
+                node.ws_send(msg)
+        parents = [p for p in self._kept if not self._is_new(p)]
+        # remove all nodes first, and keep child nodes on browser to get index
+        browser = {p: self._remove_children_web(p) for p in parents}
+        for parent in parents:
+            self._insert_children_web(parent, browser)
+
+    def _remove_children_web(self, parent: 'WdomElement') -> List[Node]:
+        orig = self.children[parent]
+        kept = self._kept[parent]
+        remains = [c in kept or self._is_moved(c) for c in orig]
+        if not any(remains):
+            if orig:
+                parent.js_exec('empty')
+            return []
+        # from the last, not to change indices of remaining nodes
+        for i in reversed(range(len(orig))):
+            if remains[i]:
+                continue
+            child = orig[i]
+            if isinstance(child, WdomElement):
+                parent.js_exec('removeChildById', child.wdom_id)
+            else:
+                parent.js_exec('removeChildByIndex', i)
+        return [c for c, remain in zip(orig, remains) if remain]
+
+    def _insert_children_web(self, parent: 'WdomElement',
+                             browser: Dict[Node, List[Node]]) -> None:
+        # place child nodes from the last, before the next (placed) node.
+        # each run of adjacent new nodes is inserted by a single html.
+        kept = self._kept[parent]
+        nodes = browser[parent]
+        children = list(parent.childNodes)
+        ref = None  # type: Optional[Node]
+        end = len(children)
+        for i in reversed(range(-1, len(children))):
+            if (i >= 0 and children[i] not in kept and
+                    self._is_new(children[i])):
+                continue
+            if i + 1 < end:
+                ref = _insert_html_web(parent, ref, nodes, children[i + 1:end])
+            if i >= 0:
+                child = children[i]
+                if child not in kept:
+                    old_nodes = browser[self._orig_parent[child]]
+                    _move_child_web(parent, ref, nodes, child, old_nodes)
+                ref = child
+                end = i
+
+
+def _kept_nodes(orig: List[Node], children: Iterable[Node]) -> Set[Node]:
+    # child nodes which stay on browser (longest run in the original order)
+    orig_index = {node: i for i, node in enumerate(orig)}
+    children = list(children)
+    positions = [orig_index.get(child, -1) for child in children]
+    return {children[i] for i in _stable_indices(positions)}
+
+
+def _index_web(nodes: List[Node], ref: Optional[Node]) -> int:
+    # index of ``ref`` in child nodes on browser, or the end
+    return len(nodes) if ref is None else nodes.index(ref)
+
+
+def _insert_html_web(parent: 'WdomElement', ref: Optional[Node],
+                     nodes: List[Node], new_nodes: List[Node]) -> Node:
+    # insert ``new_nodes`` by html before ``ref``, and return the first one
+    html = ''.join(node.html for node in new_nodes)
+    index = _index_web(nodes, ref)
+    if ref is None:
+        parent.js_exec('insertAdjacentHTML', 'beforeend', html)
+    elif isinstance(ref, WdomElement):
+        ref.js_exec('insertAdjacentHTML', 'beforebegin', html)
+    else:
+        parent.js_exec('insert', index, html)
+    nodes[index:index] = new_nodes
+    return new_nodes[0]
+
+
+def _move_child_web(parent: 'WdomElement', ref: Optional[Node],
+                    nodes: List[Node], child: 'WdomElement',
+                    old_nodes: List[Node]) -> None:
+    # move ``child`` on browser from ``old_nodes`` to before ``ref``
+    index = None if ref is None else nodes.index(ref)
+    parent.js_exec('moveChildById', child.wdom_id, index)
+    old_nodes.remove(child)
+    nodes.insert(_index_web(nodes, ref), child)
+
+
+_batch = None  # type: Optional[_Batch]
+
+
+@contextmanager
+def batch() -> Iterator[None]:
+    """Gather mutations of connected nodes and sync them to browser at once.
+
+    In ``with batch():`` block, changes of child nodes are not sent to browser
+    immediately. At the end of the block, each (top-level) node inserted in
+    the block is sent as a single html, nodes moved in the block are moved on
+    browser, and nodes inserted and removed in the block are not sent at all.
+    Changes of attributes, classes and event listeners are also sent at the
+    end of the block, except for the nodes sent as html, which already include
+    them. Other messages, like queries, are sent just after the changes made
+    before them. Nested blocks are merged to the outermost one.
+    """
+    global _batch
+    if _batch is not None:
+        yield
+        return
+    _batch = _Batch()
+    try:
+        yield
+    finally:
+        current, _batch = _batch, None
+        current.flush()
+
+
+def _sync_batch() -> None:
+    # send changes recorded in the current batch, and start recording again
+    global _batch
+    current, _batch = _batch, None
+    try:
+        current.flush()  # type: ignore
+    finally:
+        _batch = _Batch()
+
+
+def _record_children(*parents: Optional[Node],
+                     removed: Iterable[Node] = ()) -> bool:
+    # Record child nodes of ``parents`` and ``removed`` nodes if in batch, and
+    # return True if so.
+    if _batch is None:
+        return False
+    _batch.record(*parents, removed=removed)
+    return True
+
+
+@contextmanager
+def _inserting(node: Node) -> Iterator[None]:
+    # node moved in the document is still the same on browser, but other nodes
+    # (new, or removed with its ancestor) may be changed without messages
+    if _batch is None:
+        yield
+        return
+    moved = node.ownerDocument is not None and node not in _batch.removed
+    yield
+    if moved:
+        _batch.removed.discard(node)
+    else:
+        _batch.removed.add(node)
+
+
 class WdomElementParser(ElementParser):
     """Parser class which generates WdomElement nodes."""
 
@@ -56,6 +313,9 @@ class WdomElement(HTMLElement, WebEventTarget, metaclass=WdomElementMeta):
     attributes.
     """
 
+    __slots__ = ('__wdom_id', '_WebEventTarget__reqid',
+                 '_WebEventTarget__tasks')
+
     _elements_with_wdom_id = WeakValueDictionary(
     )  # type: WeakValueDictionary[_WdomIdType, WdomElement]
     _parser_class = WdomElementParser  # type: Type[ElementParser]
@@ -86,7 +346,7 @@ class WdomElement(HTMLElement, WebEventTarget, metaclass=WdomElementMeta):
     @property
     def connected(self) -> bool:
         """When this instance has any connection, return True."""
-        return bool(server.is_connected() and self.ownerDocument)
+        return bool(self.ownerDocument and server.is_connected())
 
     def __init__(self, *args: Any, parent: 'WdomElement' = None,
                  wdom_id: _WdomIdType = None, **kwargs: Any) -> None:
@@ -97,10 +357,26 @@ class WdomElement(HTMLElement, WebEventTarget, metaclass=WdomElementMeta):
         super().__init__(*args, **kwargs)
         # use super class to set wdom_id
         self._elements_with_wdom_id[self.wdom_id] = self
-        self.addEventListener('mount', self._on_mount)
         if parent:
             parent.appendChild(self)
 
+    def batch(self) -> ContextManager[None]:
+        """Gather mutations in ``with`` block and send them at once.
+
+        See :func:`wdom.web_node.batch` for details.
+        """
+        return batch()
+
+    def ws_send(self, obj: Dict[str, Any]) -> None:  # noqa: D102
+        if _batch is None:
+            super().ws_send(obj)
+        elif obj.get('method') in _html_methods:
+            _batch.messages.append((self, obj))
+        else:
+            # this node may be inserted in batch, so send the changes first
+            _sync_batch()
+            super().ws_send(obj)
+
     def _clone_node(self) -> HTMLElement:
         clone = super()._clone_node()
         for c in self.classList:
@@ -149,7 +425,8 @@ class WdomElement(HTMLElement, WebEventTarget, metaclass=WdomElementMeta):
     def getAttribute(self, attr: str) -> _AttrValueType:  # noqa: D102
         if attr == 'class':
             cls = self.get_class_list()
-            cls._append(self.classList)
+            if self._class_list:
+                cls._append(self._class_list)
             return cls.toString() if cls else None
         return super().getAttribute(attr)
 
@@ -189,7 +466,8 @@ class WdomElement(HTMLElement, WebEventTarget, metaclass=WdomElementMeta):
 
     def remove(self) -> None:
         """Remove this node from parent's DOM tree."""
-        if self.connected:
+        if (self.connected and
+                not _record_children(self.parentNode, removed=[self])):
             self._remove_web()
         self._remove()
 
@@ -198,7 +476,8 @@ class WdomElement(HTMLElement, WebEventTarget, metaclass=WdomElementMeta):
 
     def empty(self) -> None:
         """Remove all child nodes from this node."""
-        if self.connected:
+        if (self.connected and
+                not _record_children(self, removed=self.childNodes)):
             self._empty_web()
         self._empty()
 
@@ -213,7 +492,20 @@ class WdomElement(HTMLElement, WebEventTarget, metaclass=WdomElementMeta):
             html = getattr(child, 'html', str(child))
         return html
 
+    def _is_on_browser(self, child: Node) -> bool:
+        # child already exists on browser, so can be moved without html
+        return isinstance(child, WdomElement) and child.connected
+
+    def _move_child_web(self, child: 'WdomElement', index: Optional[int]
+                        ) -> None:
+        self.js_exec('moveChildById', child.wdom_id, index)
+        # already moved on browser, so remove it only from the current parent
+        child.parentNode._remove_child(child)
+
     def _append_child_web(self, child: 'WdomElement') -> Node:
+        if self._is_on_browser(child):
+            self._move_child_web(child, None)
+            return child
         html = self._get_child_html(child)
         self.js_exec('insertAdjacentHTML', 'beforeend', html)
         return child
@@ -224,11 +516,15 @@ class WdomElement(HTMLElement, WebEventTarget, metaclass=WdomElementMeta):
         If this instance is connected to the node on browser, the child node is
         also added to it.
         """
-        if self.connected:
+        if self.connected and not _record_children(self, child.parentNode):
             self._append_child_web(child)
-        return self._append_child(child)
+        with _inserting(child):
+            return self._append_child(child)
 
     def _insert_before_web(self, child: Node, ref_node: Node) -> Node:
+        if self._is_on_browser(child):
+            self._move_child_web(child, self.index(ref_node))
+            return child
         html = self._get_child_html(child)
         if isinstance(ref_node, WdomElement):
             ref_node.js_exec('insertAdjacentHTML', 'beforebegin', html)
@@ -244,9 +540,10 @@ class WdomElement(HTMLElement, WebEventTarget, metaclass=WdomElementMeta):
         this instance is connected to the node on browser, the child node is
         also added to it.
         """
-        if self.connected:
+        if self.connected and not _record_children(self, child.parentNode):
             self._insert_before_web(child, ref_node)
-        return self._insert_before(child, ref_node)
+        with _inserting(child):
+            return self._insert_before(child, ref_node)
 
     def _remove_child_web(self, child: Node) -> Node:
         if child in self.childNodes:
@@ -261,7 +558,8 @@ class WdomElement(HTMLElement, WebEventTarget, metaclass=WdomElementMeta):
 
         If the node is not a child of this node, raise ValueError.
         """
-        if self.connected:
+        if (self.connected and
+                not _record_children(self, removed=[child])):
             self._remove_child_web(child)
         return self._remove_child(child)
 
@@ -279,9 +577,12 @@ class WdomElement(HTMLElement, WebEventTarget, metaclass=WdomElementMeta):
     def replaceChild(self, new_child: 'WdomElement', old_child: 'WdomElement'
                      ) -> Node:
         """Replace child nodes."""
-        if self.connected:
+        if (self.connected and
+                not _record_children(self, new_child.parentNode,
+                                     removed=[old_child])):
             self._replace_child_web(new_child, old_child)
-        return self._replace_child(new_child, old_child)
+        with _inserting(new_child):
+            return self._replace_child(new_child, old_child)
 
     async def getBoundingClientRect(self) -> None:
         """Get size of this node on browser."""
@@ -294,8 +595,10 @@ class WdomElement(HTMLElement, WebEventTarget, metaclass=WdomElementMeta):
     @HTMLElement.textContent.setter  # type: ignore
     def textContent(self, text: str) -> None:  # type: ignore
         """Set textContent both on this node and related browser node."""
+        send = (self.connected and
+                not _record_children(self, removed=self.childNodes))
         self._set_text_content(text)
-        if self.connected:
+        if send:
             self._set_text_content_web(text)
 
     def _set_inner_html_web(self, html: str) -> None:
@@ -305,7 +608,8 @@ class WdomElement(HTMLElement, WebEventTarget, metaclass=WdomElementMeta):
     def innerHTML(self, html: str) -> None:  # type: ignore
         """Set innerHTML both on this node and related browser node."""
         df = self._parse_html(html)
-        if self.connected:
+        if (self.connected and
+                not _record_children(self, removed=self.childNodes)):
             self._set_inner_html_web(df.html)
         self._empty()
         self._append_child(df)
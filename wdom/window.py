@@ -130,4 +130,3 @@ class Window(WebEventTarget):
         super().__init__()
         self._document = document
         self._custom_elements = customElements
-        self.addEventListener('mount', self._on_mount)